@@ -0,0 +1,61 @@
+"""Boot the app in-process against a throwaway SQLite database.
+
+Import this module before anything from `src`, the settings are read
+from the environment on import.
+"""
+import os
+import tempfile
+import time
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="itam-bench-"), "bench.db")
+
+# concurrent writers wait on SQLite's file lock by polling, unfairly: give
+# them longer than the 5 s default before "database is locked"
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}?timeout=60")
+os.environ.setdefault("POSTGRES_USER", "bench")
+os.environ.setdefault("POSTGRES_PASSWORD", "bench")
+os.environ.setdefault("POSTGRES_DB", "bench")
+os.environ.setdefault("SECRET_KEY", "bench-secret")
+os.environ.setdefault("DB_SCHEMA", "create_all")
+# all load comes from one address, benchmarks measure throughput, not the limits
+os.environ.setdefault("AUTH_IP_BURST", "1000000000")
+os.environ.setdefault("AUTH_EMAIL_BURST", "1000000000")
+
+from contextlib import asynccontextmanager  # noqa: E402
+from typing import AsyncIterator  # noqa: E402
+
+import httpx  # noqa: E402
+from src.app import create_app  # noqa: E402
+
+
+@asynccontextmanager
+async def client(app=None) -> AsyncIterator[httpx.AsyncClient]:
+    """In-process client, the app's lifespan runs around it like under uvicorn"""
+    app = app or create_app()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench"
+        ) as http:
+            yield http
+
+
+def percentile(samples: list[float], p: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+
+def report(name: str, latencies: list[float], elapsed: float) -> dict:
+    return {
+        "name": name,
+        "requests": len(latencies),
+        "rps": round(len(latencies) / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def timed(coro) -> float:
+    start = time.perf_counter()
+    await coro
+    return time.perf_counter() - start
@@ -0,0 +1,121 @@
+"""Memory of the streaming hackathon export against loading everything.
+
+    python -m benchmarks.export_memory --rows 1000000
+
+Seeds `--rows` hackathons, downloads /api/v1/hackathons/export as CSV
+(plain and gzip) and finally runs the old get_all() path. Reports
+rows/s and the peak growth of the resident set over the phase, sampled
+from /proc (Linux).
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+
+from benchmarks.common import client
+from benchmarks.harness import seed
+from src.auth.jwt import create_access_jwt
+from src.data.sql import SQLManager
+from src.hackathon.repository import HackathonRepository
+
+PAGE = os.sysconf("SC_PAGE_SIZE")
+
+
+def rss() -> int:
+    with open("/proc/self/statm") as f:
+        return int(f.read().split()[1]) * PAGE
+
+
+async def measure(name: str, run) -> dict:
+    """Peak RSS above the level at the start of the phase"""
+    gc.collect()
+    base = peak = rss()
+    done = asyncio.Event()
+
+    async def sample():
+        nonlocal peak
+        while not done.is_set():
+            peak = max(peak, rss())
+            await asyncio.sleep(0.02)
+
+    sampler = asyncio.create_task(sample())
+    start = time.perf_counter()
+    rows, size = await run()
+    elapsed = time.perf_counter() - start
+    done.set()
+    await sampler
+    return {
+        "name": name,
+        "rows": rows,
+        "mb": round(size / 2**20, 1),
+        "seconds": round(elapsed, 2),
+        "rows_per_s": round(rows / elapsed),
+        "peak_rss_growth_mb": round((max(peak, rss()) - base) / 2**20, 1),
+    }
+
+
+async def main(args) -> dict:
+    await seed(1, args.rows)
+    admin = {"Authorization": f"Bearer {create_access_jwt(1)}"}
+    results = []
+
+    async with client() as http:
+        app = http._transport.app
+
+        async def download(encoding: str):
+            """Straight through ASGI, httpx's transport would keep the whole body"""
+            size = 0
+            scope = {
+                "type": "http",
+                "asgi": {"version": "3.0"},
+                "http_version": "1.1",
+                "method": "GET",
+                "scheme": "http",
+                "path": "/api/v1/hackathons/export",
+                "raw_path": b"/api/v1/hackathons/export",
+                "query_string": b"",
+                "root_path": "",
+                "headers": [
+                    (b"authorization", admin["Authorization"].encode()),
+                    (b"accept-encoding", encoding.encode()),
+                ],
+                "client": ("127.0.0.1", 4000),
+                "server": ("bench", 80),
+            }
+
+            requested = asyncio.Event()
+
+            async def receive():
+                if requested.is_set():
+                    # StreamingResponse listens for a disconnect that never comes
+                    await asyncio.Future()
+                requested.set()
+                return {"type": "http.request", "body": b"", "more_body": False}
+
+            async def send(message):
+                nonlocal size
+                if message["type"] == "http.response.body":
+                    size += len(message.get("body", b""))
+
+            await app(scope, receive, send)
+            return args.rows, size
+
+        results.append(await measure("stream_csv", lambda: download("identity")))
+        results.append(await measure("stream_csv_gzip", lambda: download("gzip")))
+
+    async def materialise():
+        async with SQLManager().session() as session:
+            hackathons = await HackathonRepository(session).get_all()
+            return len(hackathons), 0
+
+    results.append(await measure("get_all", materialise))
+    return {"rows": args.rows, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
@@ -0,0 +1,95 @@
+"""Local stand-in for the Telegram Bot API sendMessage method.
+
+    python -m benchmarks.fake_telegram --port 8081 --error-rate 0.05
+    TELEGRAM_API_URL=http://127.0.0.1:8081 TELEGRAM_BOT_TOKEN=x python -m src.notifications
+
+Answers like Telegram does: 200 with the message, 429 with
+parameters.retry_after, 500 for a share of the calls and 403 for chats
+that blocked the bot. Records every delivered message and the
+messages sent to one chat faster than `--chat-interval`.
+"""
+import argparse
+import asyncio
+import random
+import time
+from collections import defaultdict
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+
+class FakeTelegram:
+    def __init__(
+        self,
+        latency: float = 0.02,
+        error_rate: float = 0.0,
+        throttle_rate: float = 0.0,
+        blocked: set[int] = frozenset(),
+        chat_interval: float = 1.0,
+        seed: int = 1,
+    ) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.blocked = set(blocked)
+        self.chat_interval = chat_interval
+        self.rng = random.Random(seed)
+        self.delivered: dict[int, list[str]] = defaultdict(list)
+        self.last_at: dict[int, float] = {}
+        self.too_fast = 0
+        self.calls = 0
+        self.app = Starlette(
+            routes=[Route("/bot{token}/sendMessage", self.send_message, methods=["POST"])]
+        )
+
+    async def send_message(self, request: Request) -> JSONResponse:
+        self.calls += 1
+        body = await request.json()
+        chat_id = int(body["chat_id"])
+        await asyncio.sleep(self.latency)
+        if chat_id in self.blocked:
+            return JSONResponse(
+                {
+                    "ok": False,
+                    "error_code": 403,
+                    "description": "Forbidden: bot was blocked by the user",
+                },
+                status_code=403,
+            )
+        draw = self.rng.random()
+        if draw < self.throttle_rate:
+            return JSONResponse(
+                {
+                    "ok": False,
+                    "error_code": 429,
+                    "description": "Too Many Requests: retry after 1",
+                    "parameters": {"retry_after": 1},
+                },
+                status_code=429,
+            )
+        if draw < self.throttle_rate + self.error_rate:
+            return JSONResponse(
+                {"ok": False, "error_code": 500, "description": "Internal Server Error"},
+                status_code=500,
+            )
+        now = time.monotonic()
+        if now - self.last_at.get(chat_id, -1e9) < self.chat_interval:
+            self.too_fast += 1
+        self.last_at[chat_id] = now
+        self.delivered[chat_id].append(body["text"])
+        message = {"message_id": self.calls, "chat": {"id": chat_id}, "text": body["text"]}
+        return JSONResponse({"ok": True, "result": message})
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    args = parser.parse_args()
+    fake = FakeTelegram(args.latency, args.error_rate, args.throttle_rate)
+    uvicorn.run(fake.app, host="127.0.0.1", port=args.port, log_level="warning")
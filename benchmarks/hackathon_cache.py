@@ -0,0 +1,91 @@
+"""Hackathon list latency with the response cache cold, warm and conditional.
+
+    python -m benchmarks.hackathon_cache --rows 20000 --requests 500
+    python -m benchmarks.hackathon_cache --store fake-redis
+
+`cold` bumps the cache version before every request, `warm` serves the
+stored bytes, `conditional` sends the ETag back and gets 304s.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import client, report, timed
+from benchmarks.hackathon_listing import seed
+from src.utils.response_cache import RedisStore, response_cache
+
+
+class FakeRedis:
+    """get/set/incr with redis-py semantics, enough for RedisStore"""
+
+    def __init__(self) -> None:
+        self.data: dict[str, bytes] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        return self.data.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> bool:
+        self.data[key] = value
+        return True
+
+    async def incr(self, key: str) -> int:
+        value = int(self.data.get(key, b"0")) + 1
+        self.data[key] = str(value).encode()
+        return value
+
+
+QUERIES = [
+    {"limit": 20},
+    {"limit": 50},
+    {"limit": 20, "registration_open": "true"},
+    {"limit": 20, "prize_type": 0},
+    {"limit": 20, "tag": "ML"},
+]
+
+
+async def run(http, name: str, requests: int, cold: bool = False, etags=None) -> dict:
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        params = random.choice(QUERIES)
+        if cold:
+            await response_cache.bump("hackathons")
+        headers = {}
+        if etags is not None:
+            headers["If-None-Match"] = etags[json.dumps(params, sort_keys=True)]
+        latencies.append(
+            await timed(http.get("/api/v1/hackathons", params=params, headers=headers))
+        )
+    return report(name, latencies, time.perf_counter() - start)
+
+
+async def main(rows: int, requests: int, store: str) -> dict:
+    if store == "fake-redis":
+        response_cache.store = RedisStore(FakeRedis())
+    await seed(rows)
+    async with client() as http:
+        cold = await run(http, "cold", requests, cold=True)
+        etags = {}
+        for params in QUERIES:
+            response = await http.get("/api/v1/hackathons", params=params)
+            etags[json.dumps(params, sort_keys=True)] = response.headers["etag"]
+        hits_before = response_cache.hits
+        warm = await run(http, "warm", requests)
+        conditional = await run(http, "conditional", requests, etags=etags)
+    return {
+        "rows": rows,
+        "store": store,
+        "results": [cold, warm, conditional],
+        "warm_hit_ratio": round((response_cache.hits - hits_before) / (2 * requests), 3),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--store", choices=["memory", "fake-redis"], default="memory")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.rows, args.requests, args.store)), indent=2))
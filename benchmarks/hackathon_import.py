@@ -0,0 +1,78 @@
+"""Rows/second of HackathonRepository.add against the old per-object ORM loop.
+
+    python -m benchmarks.hackathon_import --rows 10000
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+from benchmarks.common import client  # noqa: F401  configures the environment
+from src.data.sql import SQLManager
+from src.hackathon.domain import HackathonCreate
+from src.hackathon.model import Hackathon, HackathonTag
+from src.hackathon.repository import HackathonRepository
+
+TAGS = ["Веб-разработка", "Мобильная разработка", "ML", "GameDev", "Design"]
+
+
+def make_hackathons(rows: int, prefix: str) -> list[HackathonCreate]:
+    return [
+        HackathonCreate(
+            title=f"{prefix} {i}",
+            registration_finish=datetime.now() + timedelta(days=i % 90),
+            team_minimum_size=1,
+            team_maximum_size=5,
+            prize_type=i % 3,
+            money_prize=100_000,
+            tags=[{"tag": TAGS[i % 5]}, {"tag": TAGS[(i + 1) % 5]}],
+        )
+        for i in range(rows)
+    ]
+
+
+def orm_loop(session, hackathon_data: list[HackathonCreate]) -> None:
+    """The previous implementation: one ORM object per row, flushed one by one
+    (tags looked up per name, the unique constraint forbids the old duplicates)"""
+    tags: dict[str, HackathonTag] = {}
+    for hackathon in hackathon_data:
+        hackathon_db = Hackathon(**hackathon.model_dump(exclude={"tags"}))
+        for tag in hackathon.tags:
+            if tag.tag not in tags:
+                tags[tag.tag] = session.query(HackathonTag).filter_by(
+                    tag=tag.tag
+                ).first() or HackathonTag(tag=tag.tag)
+            hackathon_db.tags.append(tags[tag.tag])
+        session.add(hackathon_db)
+    session.commit()
+
+
+async def main(rows: int) -> dict:
+    db = SQLManager()
+    await db.prepare()
+    results = {}
+
+    async with db.session() as session:
+        data = make_hackathons(rows, "orm")
+        start = time.perf_counter()
+        await HackathonRepository(session)._run_sync(orm_loop, data)
+        results["orm_loop_rows_per_s"] = round(rows / (time.perf_counter() - start))
+
+    async with db.session() as session:
+        data = make_hackathons(rows, "bulk")
+        start = time.perf_counter()
+        await HackathonRepository(session).add(data)
+        results["bulk_rows_per_s"] = round(rows / (time.perf_counter() - start))
+
+    results["speedup"] = round(
+        results["bulk_rows_per_s"] / results["orm_loop_rows_per_s"], 2
+    )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=10_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.rows))))
@@ -0,0 +1,51 @@
+"""Page latency of GET /api/v1/hackathons from the first page to deep pages.
+
+    python -m benchmarks.hackathon_listing --rows 100000 --limit 50
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import client
+from benchmarks.hackathon_import import make_hackathons
+from src.data.sql import SQLManager
+from src.hackathon.repository import HackathonRepository
+
+
+async def seed(rows: int, batch: int = 5000) -> None:
+    db = SQLManager()
+    await db.prepare()
+    for offset in range(0, rows, batch):
+        async with db.session() as session:
+            await HackathonRepository(session).add(
+                make_hackathons(min(batch, rows - offset), f"seed {offset}")
+            )
+
+
+async def main(rows: int, limit: int) -> dict:
+    await seed(rows)
+    checkpoints = {1, 10, 100, 1000, 10_000}
+    latencies = {}
+    async with client() as http:
+        cursor, page = None, 0
+        while True:
+            page += 1
+            params = {"limit": limit, **({"cursor": cursor} if cursor else {})}
+            start = time.perf_counter()
+            response = await http.get("/api/v1/hackathons", params=params)
+            elapsed = time.perf_counter() - start
+            if page in checkpoints:
+                latencies[f"page_{page}_ms"] = round(elapsed * 1000, 2)
+            cursor = response.json()["next_cursor"]
+            if cursor is None:
+                latencies[f"last_page_{page}_ms"] = round(elapsed * 1000, 2)
+                return {"rows": rows, "limit": limit, **latencies}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.rows, args.limit))))
@@ -0,0 +1,226 @@
+"""Hot path load test: seeds data, drives concurrent load, compares to a baseline.
+
+    python -m benchmarks.harness --users 10000 --hackathons 20000 --duration 5
+    python -m benchmarks.harness --save-baseline           # overwrite baseline.json
+    python -m benchmarks.harness --fail-on-regression      # exit 1 on a regression
+
+Every scenario runs `--concurrency` closed-loop clients for `--duration`
+seconds against the in-process app. The JSON report has throughput and
+p50/p95/p99 per endpoint plus the relative change against the baseline.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+
+from benchmarks.common import client, report
+from benchmarks.hackathon_import import make_hackathons
+from sqlalchemy import insert
+from src.auth.jwt import create_access_jwt, pwd_context
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.hackathon.repository import HackathonRepository
+from src.user.model import Skill, StudentInfo, User, user_skills
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+PASSWORD = "bench123456"
+FACULTIES = ["ИТКН", "ИНМиН", "ЭкоТех", "ИБО"]
+MAJORS = ["Прикладная информатика", "Бизнес-информатика", "Математика", "Физика"]
+SKILLS = ["Python", "FastAPI", "React", "Go", "ML", "Figma", "SQL", "Docker"]
+
+
+def seed_users(session, users: int) -> None:
+    """Users with student info and skills, one bcrypt hash shared by all"""
+    password = pwd_context().hash(PASSWORD)
+    rng = random.Random(42)
+    user_ids = session.scalars(
+        insert(User).returning(User.id, sort_by_parameter_order=True),
+        [
+            {
+                "first_name": f"Имя{i}",
+                "last_name": f"Фамилия{i}",
+                "email": f"user{i}@bench.test",
+                "internal_role": "admin" if i == 0 else "student",
+                "password": password,
+            }
+            for i in range(users)
+        ],
+    ).all()
+    session.execute(
+        insert(StudentInfo),
+        [
+            {
+                "user_id": user_id,
+                "graduation_year": 2024 + user_id % 4,
+                "major": rng.choice(MAJORS),
+                "faculty": rng.choice(FACULTIES),
+                "about": "Люблю хакатоны",
+            }
+            for user_id in user_ids
+        ],
+    )
+    skill_ids = session.scalars(
+        insert(Skill).returning(Skill.id, sort_by_parameter_order=True),
+        [{"skill_name": name} for name in SKILLS],
+    ).all()
+    session.execute(
+        insert(user_skills),
+        [
+            {"user_id": user_id, "skill_id": skill_id}
+            for user_id in user_ids
+            for skill_id in rng.sample(skill_ids, 3)
+        ],
+    )
+
+
+async def seed(users: int, hackathons: int, batch: int = 5000) -> None:
+    db = SQLManager()
+    await db.prepare()
+    async with db.session() as session:
+        repository = BaseRepository(session)
+        await repository._run_sync(seed_users, users)
+        await repository._commit()
+    for offset in range(0, hackathons, batch):
+        async with db.session() as session:
+            await HackathonRepository(session).add(
+                make_hackathons(min(batch, hackathons - offset), f"seed {offset}")
+            )
+
+
+async def drive(
+    name: str, request, concurrency: int, duration: float, warmup: float
+) -> dict:
+    """`concurrency` clients issuing `request()` back to back for `duration` s,
+    after `warmup` s of unrecorded load (pool connections, statement cache)"""
+    if warmup > 0:
+        await drive(name, request, concurrency, warmup, 0)
+    latencies: list[float] = []
+    errors = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker():
+        nonlocal errors
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - start)
+            if response.status_code >= 400:
+                errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return {**report(name, latencies, time.perf_counter() - start), "errors": errors}
+
+
+def compare(results: list[dict], baseline: dict, tolerance: float) -> dict:
+    """Relative change per endpoint, slower than `tolerance` is a regression"""
+    comparison = {}
+    for result in results:
+        before = baseline.get(result["name"])
+        if before is None:
+            continue
+        rps = result["rps"] / before["rps"] - 1 if before["rps"] else 0.0
+        p99 = result["p99_ms"] / before["p99_ms"] - 1 if before["p99_ms"] else 0.0
+        comparison[result["name"]] = {
+            "rps_change": round(rps, 3),
+            "p99_change": round(p99, 3),
+            "regression": rps < -tolerance or p99 > tolerance,
+        }
+    return comparison
+
+
+async def main(args) -> dict:
+    await seed(args.users, args.hackathons)
+    rng = random.Random(7)
+    tokens = [
+        {"Authorization": f"Bearer {create_access_jwt(user_id)}"}
+        for user_id in range(1, min(args.users, 1000) + 1)
+    ]
+    admin = tokens[0]
+    created = 0
+
+    def login():
+        email = f"user{rng.randrange(args.users)}@bench.test"
+        return http.post("/auth/login", json={"email": email, "password": PASSWORD})
+
+    def users_me():
+        return http.get("/api/v1/users/me", headers=rng.choice(tokens))
+
+    def hackathons_list():
+        return http.get("/api/v1/hackathons", params={"limit": 20})
+
+    def hackathons_create():
+        nonlocal created
+        created += 1
+        body = make_hackathons(1, f"load {created}")[0].model_dump_json()
+        return http.post(
+            "/api/v1/hackathons/create",
+            content=f"[{body}]",
+            headers={**admin, "Content-Type": "application/json"},
+        )
+
+    scenarios = {
+        "login": login,
+        "users_me": users_me,
+        "hackathons_list": hackathons_list,
+        "hackathons_create": hackathons_create,
+    }
+    async with client() as http:
+        results = [
+            await drive(
+                name, scenarios[name], args.concurrency, args.duration, args.warmup
+            )
+            for name in args.endpoints
+        ]
+
+    output = {
+        "config": {
+            "users": args.users,
+            "hackathons": args.hackathons,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "db_async": os.environ.get("DB_ASYNC", "true"),
+        },
+        "results": results,
+    }
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(output, f, indent=2, ensure_ascii=False)
+    elif os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # numbers are only comparable when the configs (and machines) match
+        output["baseline_config"] = baseline["config"]
+        output["comparison"] = compare(
+            results, {r["name"]: r for r in baseline["results"]}, args.tolerance
+        )
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--hackathons", type=int, default=20_000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--warmup", type=float, default=1)
+    parser.add_argument(
+        "--endpoints",
+        nargs="+",
+        default=["login", "users_me", "hackathons_list", "hackathons_create"],
+    )
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args()
+    output = asyncio.run(main(args))
+    print(json.dumps(output, indent=2, ensure_ascii=False))
+    if args.fail_on_regression and any(
+        c["regression"] for c in output.get("comparison", {}).values()
+    ):
+        sys.exit(1)
@@ -0,0 +1,148 @@
+"""Retried writes with and without an Idempotency-Key.
+
+    python -m benchmarks.idempotent_retries --requests 200 --duplicates 3
+
+Sends `--requests` signups and hackathon creations, each one
+`--duplicates` times at once (a client retrying on timeout while the
+first attempt still runs) and once more afterwards. With keys every
+write must happen exactly once and the retries get the first response;
+without keys the duplicates are counted. Reports the latency of the
+executed attempts against coalesced duplicates and later retries.
+Signup responses carry tokens and are never stored: only the duplicates
+racing the first attempt share it, the later retry runs again (400).
+"""
+import argparse
+import asyncio
+import json
+import time
+import uuid
+
+from benchmarks.common import client, percentile
+from benchmarks.harness import seed
+from sqlalchemy import func, select
+from src.auth.jwt import create_access_jwt
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.hackathon.model import Hackathon
+from src.user.model import User
+
+
+async def count(model) -> int:
+    async with SQLManager().session() as session:
+        return await BaseRepository(session)._run_sync(
+            lambda s: s.scalar(select(func.count()).select_from(model))
+        )
+
+
+def ms(samples: list[float]) -> dict:
+    return {
+        "p50_ms": round(percentile(samples, 50) * 1000, 2),
+        "p99_ms": round(percentile(samples, 99) * 1000, 2),
+    }
+
+
+async def scenario(http, args, name: str, request, model, keys: bool) -> dict:
+    before = await count(model)
+    first, waited, retried, statuses, replayed = [], [], [], {}, 0
+
+    async def send(i: int, key: str | None) -> tuple[float, object]:
+        headers = {"Idempotency-Key": key} if key else {}
+        start = time.perf_counter()
+        response = await request(http, i, headers)
+        return time.perf_counter() - start, response
+
+    async def one(i: int) -> None:
+        nonlocal replayed
+        key = uuid.uuid4().hex if keys else None
+        attempts = await asyncio.gather(*(send(i, key) for _ in range(args.duplicates)))
+        attempts.append(await send(i, key))
+        for n, (elapsed, response) in enumerate(attempts):
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if not response.headers.get("idempotent-replayed"):
+                first.append(elapsed)
+                continue
+            replayed += 1
+            (retried if n == args.duplicates else waited).append(elapsed)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(i: int) -> None:
+        async with semaphore:
+            await one(i)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(bounded(i) for i in range(args.requests)))
+    elapsed = time.perf_counter() - start
+    created = await count(model) - before
+    result = {
+        "name": name,
+        "keys": keys,
+        "requests": args.requests,
+        "sent": args.requests * (args.duplicates + 1),
+        "seconds": round(elapsed, 2),
+        "created": created,
+        "duplicates_created": created - args.requests,
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "replayed": replayed,
+        "executed": ms(first),
+    }
+    if waited:
+        # duplicates sent alongside the first attempt wait for its response
+        result["coalesced"] = ms(waited)
+    if retried:
+        result["retried"] = ms(retried)
+    return result
+
+
+async def main(args) -> dict:
+    await seed(1, 0)
+    admin = {"Authorization": f"Bearer {create_access_jwt(1)}"}
+    run = uuid.uuid4().hex[:8]
+
+    async def signup(http, i: int, headers: dict):
+        return await http.post(
+            "/auth/signup",
+            headers=headers,
+            json={
+                "email": f"retry{i}-{run}-{len(headers)}@bench.test",
+                "password": "bench123456",
+                "first_name": "Имя",
+                "last_name": "Фамилия",
+            },
+        )
+
+    async def create(http, i: int, headers: dict):
+        return await http.post(
+            "/api/v1/hackathons/create",
+            headers={**admin, **headers},
+            json=[
+                {
+                    "title": f"Retry {i}",
+                    "registration_finish": "2030-01-01T00:00:00",
+                    "team_minimum_size": 1,
+                    "team_maximum_size": 5,
+                    "prize_type": 0,
+                    "money_prize": 1000,
+                    "tags": [{"tag": "retry"}],
+                }
+            ],
+        )
+
+    results = []
+    async with client() as http:
+        results.append(await scenario(http, args, "signup", signup, User, True))
+        results.append(await scenario(http, args, "hackathons_create", create, Hackathon, True))
+        results.append(await scenario(http, args, "hackathons_create", create, Hackathon, False))
+    ok = all(r["duplicates_created"] == 0 for r in results if r["keys"])
+    return {"results": results, "ok": ok}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--duplicates", type=int, default=3)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    result = asyncio.run(main(args))
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if result["ok"] else 1)
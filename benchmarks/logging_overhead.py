@@ -0,0 +1,84 @@
+"""Request latency with the old synchronous DEBUG logging vs the queue pipeline.
+
+    python -m benchmarks.logging_overhead --requests 3000 --concurrency 16
+
+Every request misses the user cache so it reaches the database and the
+SQLAlchemy/aiosqlite loggers. Records go to a real file in every mode.
+The pipeline keeps those loggers at WARNING, so at DEBUG only the app's
+own records (none on this path) are written.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import tempfile
+import time
+
+from benchmarks.common import client, report, timed
+from src.auth.cache import user_cache
+from src.utils.logging import setup_logging, shutdown_logging
+
+
+def basic_debug(stream) -> None:
+    """What src/utils/logging.py used to do"""
+    shutdown_logging()
+    logging.basicConfig(
+        level=logging.DEBUG,
+        format="%(asctime)s %(levelname)s %(name)s %(message)s",
+        datefmt="%Y-%m-%d %H:%M:%S",
+        stream=stream,
+        force=True,
+    )
+    for name in ("sqlalchemy", "aiosqlite", "src"):
+        logging.getLogger(name).setLevel(logging.NOTSET)
+
+
+MODES = {
+    "basic_debug": basic_debug,
+    "pipeline_debug": lambda stream: setup_logging("DEBUG", stream),
+    "pipeline_debug_sampled": lambda stream: setup_logging("DEBUG", stream, 0.01),
+    "pipeline_info": lambda stream: setup_logging("INFO", stream),
+}
+
+
+async def main(requests: int, concurrency: int) -> dict:
+    async with client() as http:
+        credentials = {
+            "email": "bench@test.com",
+            "password": "bench123456",
+            "first_name": "Bench",
+            "last_name": "Bench",
+        }
+        response = await http.post("/auth/signup", json=credentials)
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+        results = []
+        for name, configure in MODES.items():
+            with tempfile.TemporaryFile("w+") as stream:
+                configure(stream)
+                semaphore = asyncio.Semaphore(concurrency)
+                latencies: list[float] = []
+
+                async def one():
+                    async with semaphore:
+                        user_cache.clear()
+                        latencies.append(
+                            await timed(http.get("/api/v1/users/me", headers=headers))
+                        )
+
+                start = time.perf_counter()
+                await asyncio.gather(*(one() for _ in range(requests)))
+                elapsed = time.perf_counter() - start
+                shutdown_logging()
+                stream.seek(0)
+                lines = sum(1 for _ in stream)
+            results.append({**report(name, latencies, elapsed), "log_lines": lines})
+        return {"requests": requests, "concurrency": concurrency, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.requests, args.concurrency)), indent=2))
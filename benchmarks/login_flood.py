@@ -0,0 +1,133 @@
+"""Latency of the rest of the API while /auth/login is flooded.
+
+    python -m benchmarks.login_flood --attackers 50 --flood-rps 500 --duration 10
+    python -m benchmarks.login_flood --unprotected   # rate limits/admission off
+
+Probes read /api/v1/hackathons and /api/v1/users/me at a fixed rate, alone
+and then while `--attackers` addresses send `--flood-rps` logins per
+second with wrong passwords. Reports the probe latencies of
+both phases and what the flood got back (401 wrong password, 429 rate
+limited or hasher full, 503 shed).
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+
+if "--unprotected" in sys.argv:
+    os.environ["AUTH_IP_BURST"] = os.environ["AUTH_EMAIL_BURST"] = "1000000000"
+    os.environ["ADMISSION_MAX_CONCURRENCY"] = "1000000"
+else:
+    os.environ.setdefault("AUTH_IP_BURST", "20")
+    os.environ.setdefault("AUTH_EMAIL_BURST", "5")
+
+import httpx  # noqa: E402
+from benchmarks.common import client, report  # noqa: E402
+from benchmarks.harness import PASSWORD, seed  # noqa: E402
+from src.auth.jwt import create_access_jwt  # noqa: E402
+
+
+async def probe(
+    http: httpx.AsyncClient, tokens: list[dict], rate: float, duration: float
+) -> list[float]:
+    """Open loop: requests are due at a fixed rate and their latency counts
+    from when they were due, time spent waiting for a busy loop included"""
+    rng = random.Random(1)
+    start = time.perf_counter()
+
+    async def one(due: float) -> float:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        if rng.random() < 0.5:
+            await http.get("/api/v1/hackathons", params={"limit": 20})
+        else:
+            await http.get("/api/v1/users/me", headers=rng.choice(tokens))
+        return time.perf_counter() - due
+
+    return await asyncio.gather(
+        *(one(start + i / rate) for i in range(int(rate * duration)))
+    )
+
+
+async def flood(
+    attackers: list[httpx.AsyncClient], users: int, rate: float, stop: asyncio.Event
+) -> Counter:
+    """Logins arriving at `rate` per second whatever the responses, spread
+    over the attacker addresses"""
+    rng = random.Random()
+    statuses: Counter = Counter()
+    start = time.perf_counter()
+
+    async def one(http: httpx.AsyncClient) -> None:
+        email = f"user{rng.randrange(users)}@bench.test"
+        response = await http.post(
+            "/auth/login", json={"email": email, "password": PASSWORD + "wrong"}
+        )
+        statuses[response.status_code] += 1
+
+    pending = set()
+    sent = 0
+    while not stop.is_set():
+        await asyncio.sleep(max(0.0, start + sent / rate - time.perf_counter()))
+        task = asyncio.create_task(one(attackers[sent % len(attackers)]))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        sent += 1
+    await asyncio.gather(*pending)
+    return statuses
+
+
+async def phase(http, tokens, args, attackers: list[httpx.AsyncClient]) -> dict:
+    stop = asyncio.Event()
+    flooding = attackers and asyncio.create_task(
+        flood(attackers, args.users, args.flood_rps, stop)
+    )
+    latencies = await probe(http, tokens, args.probe_rps, args.duration)
+    stop.set()
+    result = report("probe", latencies, args.duration)
+    if flooding:
+        statuses = await flooding
+        result["flood"] = {str(code): count for code, count in sorted(statuses.items())}
+    return result
+
+
+async def main(args) -> dict:
+    await seed(args.users, 200)
+    tokens = [
+        {"Authorization": f"Bearer {create_access_jwt(user_id)}"}
+        for user_id in range(1, args.users + 1)
+    ]
+    async with client() as http:
+        app = http._transport.app
+        attackers = [
+            httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app, client=(f"10.0.0.{i}", 4000)),
+                base_url="http://bench",
+            )
+            for i in range(args.attackers)
+        ]
+        baseline = await phase(http, tokens, args, [])
+        flooded = await phase(http, tokens, args, attackers)
+        for attacker in attackers:
+            await attacker.aclose()
+    return {
+        "protected": not args.unprotected,
+        "attackers": args.attackers,
+        "baseline": baseline,
+        "under_flood": flooded,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--attackers", type=int, default=50, choices=range(1, 256))
+    parser.add_argument("--flood-rps", type=float, default=500)
+    parser.add_argument("--probe-rps", type=float, default=50)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--unprotected", action="store_true")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args)), indent=2))
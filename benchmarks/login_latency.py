@@ -0,0 +1,65 @@
+"""p99 latency of GET /api/v1/users/me while a login flood is running.
+
+    python -m benchmarks.login_latency --logins 32 --duration 5
+    python -m benchmarks.login_latency --inline   # bcrypt on the event loop
+"""
+import argparse
+import asyncio
+import json
+import time
+from concurrent.futures import Executor, Future
+
+from benchmarks.common import client, report, timed
+from src.auth.hashing import hasher
+
+
+class InlineExecutor(Executor):
+    """Runs jobs on the calling thread, i.e. the old blocking behaviour"""
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        future.set_result(fn(*args, **kwargs))
+        return future
+
+
+async def main(logins: int, duration: float) -> dict:
+    async with client() as http:
+        credentials = {"email": "bench@test.com", "password": "bench123456"}
+        response = await http.post(
+            "/auth/signup", json={**credentials, "first_name": "Bench", "last_name": "Bench"}
+        )
+        headers = {"Authorization": f"Bearer {response.json()['access_token']}"}
+        deadline = time.perf_counter() + duration
+
+        async def login_flood():
+            while time.perf_counter() < deadline:
+                await http.post("/auth/login", json=credentials)
+
+        async def probe(latencies: list[float]):
+            while time.perf_counter() < deadline:
+                latencies.append(await timed(http.get("/api/v1/users/me", headers=headers)))
+                await asyncio.sleep(0.01)
+
+        idle: list[float] = []
+        deadline = time.perf_counter() + duration
+        await probe(idle)
+
+        loaded: list[float] = []
+        deadline = time.perf_counter() + duration
+        start = time.perf_counter()
+        await asyncio.gather(probe(loaded), *(login_flood() for _ in range(logins)))
+        return {
+            "idle": report("users_me_idle", idle, duration),
+            "under_login_load": report("users_me_loaded", loaded, time.perf_counter() - start),
+        }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--logins", type=int, default=32, help="concurrent login clients")
+    parser.add_argument("--duration", type=float, default=5)
+    parser.add_argument("--inline", action="store_true")
+    args = parser.parse_args()
+    if args.inline:
+        hasher._executor = InlineExecutor()
+    print(json.dumps(asyncio.run(main(args.logins, args.duration)), indent=2))
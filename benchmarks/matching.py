@@ -0,0 +1,59 @@
+"""Teammate scoring kernel: build, top-k and incremental update latency.
+
+Pure in-memory, no database: 50k students x 300 skills x 12 roles.
+
+    python -m benchmarks.matching --students 50000 --skills 300
+"""
+import argparse
+import json
+import random
+import time
+
+from src.matching.engine import MatchingEngine
+
+
+def timed_ms(fn, rounds: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(rounds):
+        fn()
+    return round((time.perf_counter() - start) * 1000 / rounds, 3)
+
+
+def main(students: int, skills: int, roles: int, per_user: int, rounds: int) -> dict:
+    rng = random.Random(42)
+    skill_pool = [(i, f"skill {i}") for i in range(skills)]
+    role_pool = [(i, f"role {i}") for i in range(roles)]
+    engine = MatchingEngine(capacity=students)
+
+    def build():
+        for user_id in range(students):
+            engine.upsert(
+                user_id, "Имя", "Фамилия",
+                rng.sample(skill_pool, per_user), rng.sample(role_pool, 1),
+            )
+
+    result = {"students": students, "skills": skills, "build_ms": timed_ms(build)}
+    result["scores_ms"] = timed_ms(lambda: engine.scores([1]), rounds)
+    result["top_10_ms"] = timed_ms(lambda: engine.top_k([1], 10), rounds)
+    result["top_10_team_of_4_ms"] = timed_ms(lambda: engine.top_k([1, 2, 3, 4], 10), rounds)
+    result["top_100_ms"] = timed_ms(lambda: engine.top_k([1], 100), rounds)
+    result["upsert_ms"] = timed_ms(
+        lambda: engine.upsert(
+            rng.randrange(students), "Имя", "Фамилия",
+            rng.sample(skill_pool, per_user), rng.sample(role_pool, 1),
+        ),
+        rounds,
+    )
+    result["matrix_bytes"] = engine.skills.data.nbytes + engine.roles.data.nbytes
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=50_000)
+    parser.add_argument("--skills", type=int, default=300)
+    parser.add_argument("--roles", type=int, default=12)
+    parser.add_argument("--per-user", type=int, default=8)
+    parser.add_argument("--rounds", type=int, default=50)
+    args = parser.parse_args()
+    print(json.dumps(main(args.students, args.skills, args.roles, args.per_user, args.rounds)))
@@ -0,0 +1,187 @@
+"""Registration reminder fan-out against a fake Telegram, with a crash.
+
+    python -m benchmarks.notifications --students 20000
+
+Links every student to a Telegram chat, puts some of them in a team
+(they get no reminder) and lets a hackathon's reminder fire. The fake
+Telegram answers 5% of the calls with 500, 2% with 429 and has
+`--blocked` chats that blocked the bot. The worker is killed half way
+and a new one started, it has to pick up the claimed and pending
+messages from the outbox. Exits 1 when a chat got no message or the
+outbox disagrees with what was delivered.
+
+NOTIFY_RATE is lifted to measure the worker, Telegram itself allows a
+bot about 30 messages per second for broadcasts.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+
+os.environ.setdefault("TELEGRAM_BOT_TOKEN", "bench")
+os.environ.setdefault("NOTIFY_RATE", "1000000")
+os.environ.setdefault("NOTIFY_LEASE", "2")
+os.environ.setdefault("NOTIFY_REMINDER_HOURS", "1")
+
+import httpx  # noqa: E402
+from benchmarks.common import DB_PATH  # noqa: E402, F401  (settings defaults)
+from benchmarks.fake_telegram import FakeTelegram  # noqa: E402
+from benchmarks.hackathon_import import make_hackathons  # noqa: E402
+from benchmarks.harness import seed  # noqa: E402
+from sqlalchemy import func, insert, select, update  # noqa: E402
+from src.data.repository import BaseRepository  # noqa: E402
+from src.data.sql import SQLManager  # noqa: E402
+from src.hackathon.model import Hackathon  # noqa: E402
+from src.hackathon.repository import HackathonRepository  # noqa: E402
+from src.notifications.model import Notification  # noqa: E402
+from src.notifications.worker import NotificationWorker, create_sender  # noqa: E402
+from src.team.model import Registration, Team  # noqa: E402
+from src.user.model import TgUser  # noqa: E402
+
+CHAT_BASE = 5_000_000_000
+
+
+async def prepare(args) -> tuple[int, set[int]]:
+    """Returns the hackathon id and the chats that should be reminded"""
+    await seed(args.students + 1, 0)
+    db = SQLManager()
+    async with db.session() as session:
+        await HackathonRepository(session).add(make_hackathons(1, "reminded"))
+    students = list(range(2, args.students + 2))
+    in_team = set(random.Random(3).sample(students, args.students // 10))
+    async with db.session() as session:
+        repository = BaseRepository(session)
+        result = await repository._execute(select(func.max(Hackathon.id)))
+        hackathon_id = result.scalar()
+
+        def fill(s) -> None:
+            s.execute(
+                insert(TgUser),
+                [
+                    {"user_id": u, "tg_id": u, "first_name": f"tg{u}"}
+                    for u in students
+                ],
+            )
+            team_id = s.execute(
+                insert(Team)
+                .values(
+                    hackathon_id=hackathon_id,
+                    name="full",
+                    capacity=len(in_team),
+                    members_count=len(in_team),
+                )
+                .returning(Team.id)
+            ).scalar()
+            s.execute(
+                insert(Registration),
+                [
+                    {"hackathon_id": hackathon_id, "user_id": u, "team_id": team_id}
+                    for u in in_team
+                ],
+            )
+            # the 1h reminder comes due in `--delay` seconds
+            s.execute(
+                update(Hackathon)
+                .where(Hackathon.id == hackathon_id)
+                .values(
+                    registration_finish=datetime.now()
+                    + timedelta(hours=1, seconds=args.delay)
+                )
+            )
+
+        await repository._run_sync(fill)
+        await repository._commit()
+    return hackathon_id, {u for u in students if u not in in_team}
+
+
+async def outbox() -> dict[str, int]:
+    async with SQLManager().session() as session:
+        rows = (
+            await BaseRepository(session)._execute(
+                select(Notification.status, func.count()).group_by(Notification.status)
+            )
+        ).all()
+    return {status.value: count for status, count in rows}
+
+
+async def main(args) -> dict:
+    _, expected = await prepare(args)
+    blocked = set(random.Random(5).sample(sorted(expected), args.blocked))
+    fake = FakeTelegram(
+        latency=args.latency, error_rate=0.05, throttle_rate=0.02, blocked=blocked
+    )
+    db = SQLManager()
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake.app), base_url="http://telegram"
+    ) as http:
+
+        def delivered() -> int:
+            return sum(len(texts) for texts in fake.delivered.values())
+
+        # first worker, killed without warning half way through
+        worker = NotificationWorker(db, create_sender(http))
+        task = asyncio.create_task(worker.run())
+        while delivered() == 0:
+            await asyncio.sleep(0.01)
+        start = time.perf_counter()
+        while delivered() < len(expected) // 2:
+            await asyncio.sleep(0.01)
+        first = delivered()
+        first_rate = first / (time.perf_counter() - start) * 60
+        task.cancel()
+        await asyncio.gather(task, return_exceptions=True)
+        crashed_at = time.perf_counter()
+
+        worker = NotificationWorker(db, create_sender(http))
+        task = asyncio.create_task(worker.run())
+        while (await outbox()).get("pending", 0):
+            await asyncio.sleep(0.2)
+        elapsed = time.perf_counter() - start
+        worker.stop()
+        await task
+
+    chats = {chat_id: len(texts) for chat_id, texts in fake.delivered.items()}
+    missing = sorted(expected - blocked - set(chats))
+    statuses = await outbox()
+    ok = (
+        not missing
+        and statuses.get("sent", 0) == len(expected) - len(blocked)
+        and statuses.get("failed", 0) == len(blocked)
+    )
+    return {
+        "config": {
+            "students": args.students,
+            "reminded": len(expected),
+            "blocked": len(blocked),
+            "telegram_latency_ms": args.latency * 1000,
+        },
+        "messages_per_minute": round(first_rate),
+        "messages_per_minute_with_restart": round(delivered() / elapsed * 60),
+        "seconds": round(elapsed, 1),
+        "restart_after": first,
+        "restart_seconds": round(time.perf_counter() - crashed_at, 1),
+        "telegram_calls": fake.calls,
+        "delivered": delivered(),
+        "duplicates": sum(count - 1 for count in chats.values()),
+        "per_chat_rate_violations": fake.too_fast,
+        "missing": missing[:10],
+        "outbox": statuses,
+        "ok": ok,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=20_000)
+    parser.add_argument("--blocked", type=int, default=100)
+    parser.add_argument("--latency", type=float, default=0.02)
+    parser.add_argument("--delay", type=float, default=2)
+    args = parser.parse_args()
+    output = asyncio.run(main(args))
+    print(json.dumps(output, indent=2))
+    if not output["ok"]:
+        sys.exit(1)
@@ -0,0 +1,85 @@
+"""Statements per profile fetch, eager loading against lazy relationships.
+
+    python -m benchmarks.profile_queries --sizes 1 10 100
+
+Fails (exit 1) when the number of statements of UserRepository.profiles
+grows with the number of users, the lazy variant shows what it saves.
+"""
+import argparse
+import asyncio
+import json
+import sys
+import time
+
+from benchmarks.common import client  # noqa: F401  configures the environment
+from benchmarks.user_import import make_rows
+from sqlalchemy import select
+from src.auth.jwt import pwd_context
+from src.data.sql import SQLManager
+from src.monitoring.profiling import RequestProfile, current_profile
+from src.user.domain import UserImport, UserProfile
+from src.user.model import User
+from src.user.repository import UserRepository
+
+
+def lazy_profiles(session, user_ids: list[int]) -> list[UserProfile]:
+    """Plain query, each relationship loaded on first access"""
+    users = session.scalars(select(User).where(User.id.in_(user_ids))).all()
+    return [UserProfile.model_validate(user) for user in users]
+
+
+async def measure(fetch) -> tuple[int, float]:
+    profile = RequestProfile()
+    token = current_profile.set(profile)
+    try:
+        start = time.perf_counter()
+        await fetch()
+        return profile.queries, time.perf_counter() - start
+    finally:
+        current_profile.reset(token)
+
+
+async def main(sizes: list[int]) -> dict:
+    db = SQLManager()
+    await db.prepare()
+    password_hash = pwd_context().hash("profile123")
+    async with db.session() as session:
+        rows = make_rows(max(sizes), "profile", password_hash)
+        user_ids = await UserRepository(session).add_many(
+            [UserImport.model_validate(row) for row in rows]
+        )
+
+    results = []
+    for size in sizes:
+        ids = user_ids[:size]
+        async with db.session() as session:
+            repository = UserRepository(session)
+            eager, eager_time = await measure(lambda: repository.profiles(ids))
+        async with db.session() as session:
+            repository = UserRepository(session)
+            lazy, lazy_time = await measure(
+                lambda: repository._run_sync(lazy_profiles, ids)
+            )
+        results.append(
+            {
+                "users": size,
+                "eager_queries": eager,
+                "eager_ms": round(eager_time * 1000, 2),
+                "lazy_queries": lazy,
+                "lazy_ms": round(lazy_time * 1000, 2),
+            }
+        )
+    return {
+        "constant": len({result["eager_queries"] for result in results}) == 1,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 100])
+    args = parser.parse_args()
+    output = asyncio.run(main(args.sizes))
+    print(json.dumps(output, indent=2))
+    if not output["constant"]:
+        sys.exit(1)
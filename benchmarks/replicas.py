@@ -0,0 +1,72 @@
+"""Read routing with SQLite files standing in for replicas.
+
+    python -m benchmarks.replicas --replicas 2 --users 2000 --hackathons 5000
+
+Seeds the primary, copies it to `--replicas` files and drives the read
+endpoints. Shows where statements went (db_routed_statements_total) and
+the routing overhead against `--replicas 0`. SQLite on one box does not
+get faster with copies of itself, real gains need separate servers.
+"""
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+
+
+async def main(args) -> dict:
+    from benchmarks.common import DB_PATH, client
+    from benchmarks.harness import drive, seed
+    from src.auth.jwt import create_access_jwt
+    from src.data.replicas import routed_statements
+    from src.data.sql import SQLManager
+
+    await seed(args.users, args.hackathons)
+    for path in args.paths:
+        shutil.copy(DB_PATH, path)
+    tokens = [
+        {"Authorization": f"Bearer {create_access_jwt(user_id)}"}
+        for user_id in range(1, min(args.users, 1000) + 1)
+    ]
+    served = 0
+
+    def hackathons_list():
+        nonlocal served
+        served += 1
+        return http.get("/api/v1/hackathons", params={"limit": 1 + served % 50})
+
+    def users_me():
+        nonlocal served
+        served += 1
+        return http.get("/api/v1/users/me", headers=tokens[served % len(tokens)])
+
+    async with client() as http:
+        results = [
+            await drive("hackathons_list", hackathons_list, args.concurrency, args.duration, 1),
+            await drive("users_me", users_me, args.concurrency, args.duration, 1),
+        ]
+        healthy = len(SQLManager().replicas.healthy)
+    return {
+        "replicas": args.replicas,
+        "healthy": healthy,
+        "routed": {dict(key)["target"]: value for key, value in routed_statements.values.items()},
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--replicas", type=int, default=2)
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--hackathons", type=int, default=5000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=5)
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp(prefix="itam-replicas-")
+    args.paths = [os.path.join(directory, f"replica{i}.db") for i in range(args.replicas)]
+    # read by the settings on import, the caches would keep reads off the database
+    os.environ["DATABASE_REPLICA_URLS"] = ",".join(f"sqlite:///{path}" for path in args.paths)
+    os.environ["RESPONSE_CACHE_SIZE"] = "1"
+    os.environ["AUTH_CACHE_SIZE"] = "1"
+    print(json.dumps(asyncio.run(main(args)), indent=2))
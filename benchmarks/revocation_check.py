@@ -0,0 +1,130 @@
+"""Cost of the access token revocation check on the authenticated hot path.
+
+    python -m benchmarks.revocation_check --revoked 100000 --calls 1000000
+
+Times RevocationList.revoked() for a token that isn't revoked with 0 to
+`--revoked` entries in memory, get_access_claims() on a cached token
+with and without the check, the memory per revoked token, and how long
+a worker takes to load `--revoked` rows from the table (startup) and a
+sync with nothing new (every REVOCATION_SYNC_INTERVAL).
+"""
+import argparse
+import asyncio
+import gc
+import json
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from benchmarks.common import client
+from benchmarks.harness import seed
+from sqlalchemy import insert
+from src.auth.cache import token_cache
+from src.auth.jwt import create_access_jwt, decode_jwt
+from src.auth.model import TokenRevocation
+from src.auth.revocation import RevocationList
+from src.data import dependencies
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+
+
+def ns_per_call(fn, calls: int) -> float:
+    start = time.perf_counter_ns()
+    for _ in range(calls):
+        fn()
+    return (time.perf_counter_ns() - start) / calls
+
+
+async def us_per_await(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for _ in range(calls):
+        await fn()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def filled(size: int) -> RevocationList:
+    revocations = RevocationList(1)
+    expires = datetime.utcnow() + timedelta(minutes=15)
+    for i in range(size):
+        revocations.add(TokenRevocation(user_id=i, jti=f"{i:032x}", expires_at=expires))
+        if i % 10 == 0:
+            revocations.add(
+                TokenRevocation(user_id=i, token_version=1, expires_at=expires)
+            )
+    return revocations
+
+
+async def main(args) -> dict:
+    token = create_access_jwt(1)
+    claims = decode_jwt(token)
+    result: dict = {"calls": args.calls, "revoked_ns": {}}
+
+    for size in sorted({0, 1000, args.revoked}):
+        revocations = filled(size)
+        result["revoked_ns"][size] = round(
+            ns_per_call(lambda: revocations.revoked(claims), args.calls), 1
+        )
+
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    revocations = filled(args.revoked)
+    result["bytes_per_revoked_token"] = round(
+        (tracemalloc.get_traced_memory()[0] - before) / args.revoked
+    )
+    tracemalloc.stop()
+
+    # the whole dependency on a cached token, with the check and without
+    dependencies.revocations = revocations
+    token_cache.set(token, claims)
+    with_check = await us_per_await(
+        lambda: dependencies.get_access_claims(token), args.calls // 10
+    )
+    dependencies.revocations = RevocationList(1)
+    dependencies.revocations.revoked = lambda claims: False
+    without_check = await us_per_await(
+        lambda: dependencies.get_access_claims(token), args.calls // 10
+    )
+    result["get_access_claims_us"] = {
+        "with_check": round(with_check, 3),
+        "without_check": round(without_check, 3),
+        "added": round(with_check - without_check, 3),
+    }
+
+    db = SQLManager()
+    expires = datetime.utcnow() + timedelta(minutes=15)
+    rows = [
+        {"user_id": 1 + i % 2, "jti": f"{i:032x}", "expires_at": expires}
+        for i in range(args.revoked)
+    ]
+    async with db.session() as session:
+        repository = BaseRepository(session)
+        await repository._run_sync(lambda s: s.execute(insert(TokenRevocation), rows))
+        await repository._commit()
+    fresh = RevocationList(1)
+    start = time.perf_counter()
+    loaded = await fresh.sync(db)
+    result["initial_sync_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    result["initial_sync_rows"] = loaded
+    gc.collect()
+    syncs = []
+    for _ in range(5):
+        start = time.perf_counter()
+        await fresh.sync(db)
+        syncs.append(time.perf_counter() - start)
+    result["incremental_sync_ms"] = round(sorted(syncs)[2] * 1000, 1)
+    return result
+
+
+async def run(args) -> dict:
+    await seed(2, 0)
+    async with client():
+        return await main(args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--revoked", type=int, default=100_000)
+    parser.add_argument("--calls", type=int, default=1_000_000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(run(args)), indent=2))
@@ -0,0 +1,128 @@
+"""Throughput of the production server (main.py) as workers are added.
+
+    python -m benchmarks.scaling --workers 1 2 4 --clients 4 --duration 10
+    python -m benchmarks.scaling --url http://10.0.0.5:9999   # external server
+
+Starts `main.py --workers N` on a local SQLite database and drives it
+over real sockets from `--clients` load processes. The load generator
+shares the box with the server, on small machines run it from another
+host (`--url`) for a clean per-core number.
+"""
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import signal
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATH = "/api/v1/hackathons?limit=20"
+
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_server(workers: int, port: int, env: dict) -> subprocess.Popen:
+    server = subprocess.Popen(
+        [sys.executable, "main.py", "--workers", str(workers), "--port", str(port)],
+        cwd=ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    deadline = time.monotonic() + 60
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/metrics").status_code == 200:
+                return server
+        except httpx.TransportError:
+            time.sleep(0.2)
+    server.kill()
+    raise RuntimeError("server did not start")
+
+
+def load(url: str, concurrency: int, duration: float) -> list[float]:
+    """One load process: `concurrency` closed-loop clients for `duration` s"""
+
+    async def run() -> list[float]:
+        latencies: list[float] = []
+        limits = httpx.Limits(max_connections=concurrency)
+        async with httpx.AsyncClient(base_url=url, limits=limits) as http:
+            deadline = time.perf_counter() + duration
+
+            async def worker():
+                while time.perf_counter() < deadline:
+                    start = time.perf_counter()
+                    await http.get(PATH)
+                    latencies.append(time.perf_counter() - start)
+
+            await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return latencies
+
+    return asyncio.run(run())
+
+
+def measure(url: str, clients: int, concurrency: int, duration: float) -> dict:
+    from benchmarks.common import report
+
+    with multiprocessing.Pool(clients) as pool:
+        start = time.perf_counter()
+        batches = pool.starmap(load, [(url, concurrency, duration)] * clients)
+        elapsed = time.perf_counter() - start
+    return report("hackathons_list", [x for batch in batches for x in batch], elapsed)
+
+
+def main(args) -> dict:
+    if args.url:
+        return {"url": args.url, "result": measure(args.url, args.clients, args.concurrency, args.duration)}
+
+    directory = tempfile.mkdtemp(prefix="itam-scaling-")
+    env = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite:///{directory}/scaling.db",
+        "POSTGRES_USER": "bench",
+        "POSTGRES_PASSWORD": "bench",
+        "POSTGRES_DB": "bench",
+        "SECRET_KEY": "bench-secret",
+        "DB_SCHEMA": "migrations",
+        "DB_MIGRATE_ON_STARTUP": "true",
+        "LOG_LEVEL": "WARNING",
+    }
+    results = []
+    for workers in args.workers:
+        port = free_port()
+        server = start_server(workers, port, env)
+        try:
+            url = f"http://127.0.0.1:{port}"
+            measure(url, args.clients, args.concurrency, 1)  # warm-up
+            result = measure(url, args.clients, args.concurrency, args.duration)
+        finally:
+            server.send_signal(signal.SIGTERM)
+            server.wait(timeout=60)
+        results.append({"workers": workers, **result})
+
+    single = results[0]["rps"] / results[0]["workers"]
+    for result in results:
+        result["efficiency"] = round(result["rps"] / (single * result["workers"]), 2)
+    return {"cpus": os.cpu_count(), "clients": args.clients, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--clients", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10)
+    parser.add_argument("--url")
+    args = parser.parse_args()
+    print(json.dumps(main(args), indent=2))
@@ -0,0 +1,81 @@
+"""Latency of /api/v1/search/profiles over N seeded student profiles.
+
+Runs against whatever DATABASE_URL points at: Postgres exercises the
+tsvector/pg_trgm path, SQLite the in-process index.
+
+    python -m benchmarks.search --profiles 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from sqlalchemy import insert
+
+from benchmarks.common import client, percentile
+from src.auth.jwt import create_access_jwt
+from src.data.sql import SQLManager
+from src.user.model import StudentInfo, User
+
+MAJORS = ["Прикладная информатика", "Программная инженерия", "Бизнес-информатика",
+          "Математика", "Дизайн", "Физика"]
+FACULTIES = ["ИТКН", "ИНМиН", "ЭУПП", "ИБО"]
+ABOUT = ["Люблю бэкенд разработку на Python", "Пишу мобильные приложения",
+         "Занимаюсь машинным обучением", "Делаю интерфейсы в Figma",
+         "Frontend на React и TypeScript", "Разрабатываю игры на Unity"]
+QUERIES = ["python", "бэкенд", "бекенд", "мобильн", "машинное обучение",
+           "информатика", "figma", "разработчик игр"]
+
+
+async def seed(profiles: int, batch: int = 10_000) -> None:
+    db = SQLManager()
+    await db.prepare()
+
+    def insert_batch(session, offset: int, size: int) -> None:
+        session.execute(insert(User), [
+            {"id": offset + i + 1, "first_name": "Имя", "last_name": "Фамилия",
+             "email": f"user{offset + i}@test.com", "password": "-"}
+            for i in range(size)
+        ])
+        session.execute(insert(StudentInfo), [
+            {"user_id": offset + i + 1, "graduation_year": 2025,
+             "major": random.choice(MAJORS), "faculty": random.choice(FACULTIES),
+             "about": random.choice(ABOUT)}
+            for i in range(size)
+        ])
+        session.commit()
+
+    for offset in range(0, profiles, batch):
+        async with db.session() as session:
+            size = min(batch, profiles - offset)
+            if hasattr(session, "run_sync"):
+                await session.run_sync(insert_batch, offset, size)
+            else:
+                insert_batch(session, offset, size)
+
+
+async def main(profiles: int, rounds: int) -> dict:
+    await seed(profiles)
+    headers = {"Authorization": f"Bearer {create_access_jwt(1)}"}
+    async with client() as http:
+        http.headers.update(headers)
+        start = time.perf_counter()
+        await http.get("/api/v1/search/profiles", params={"q": "python"})
+        result = {"profiles": profiles, "first_query_ms": round((time.perf_counter() - start) * 1000, 2)}
+        for query in QUERIES:
+            latencies = []
+            for _ in range(rounds):
+                start = time.perf_counter()
+                await http.get("/api/v1/search/profiles", params={"q": query, "limit": 20})
+                latencies.append(time.perf_counter() - start)
+            result[f"{query}_p50_ms"] = round(percentile(latencies, 50) * 1000, 2)
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", type=int, default=100_000)
+    parser.add_argument("--rounds", type=int, default=20)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.profiles, args.rounds)), ensure_ascii=False))
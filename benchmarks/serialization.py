@@ -0,0 +1,86 @@
+"""Serialization throughput of a 1k-item hackathon page, default vs fast path.
+
+    python -m benchmarks.serialization --items 1000 --rounds 200
+
+`default` is what FastAPI does for a response_model (validate, dump to
+python, json.dumps), `orjson` swaps in ORJSONResponse, `fast` is the
+FAST_JSON route path: a prebuilt TypeAdapter dumping validated DTOs.
+"""
+import argparse
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta
+
+import benchmarks.common  # noqa: F401
+from fastapi.responses import JSONResponse, ORJSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from pydantic import TypeAdapter
+from src.hackathon.domain import HackathonPage
+
+
+def make_page(items: int) -> HackathonPage:
+    finish = datetime(2030, 1, 1)
+    return HackathonPage(
+        items=[
+            {
+                "id": i,
+                "title": f"Hackathon {i}",
+                "registration_finish": finish + timedelta(hours=i),
+                "team_minimum_size": 1,
+                "team_maximum_size": 5,
+                "prize_type": i % 3,
+                "money_prize": 100_000 * i,
+                "tags": [{"id": 1, "tag": "Веб-разработка"}, {"id": 2, "tag": "ML"}],
+            }
+            for i in range(items)
+        ],
+        next_cursor="abc",
+    )
+
+
+async def measure(name: str, render, rounds: int) -> dict:
+    size = len(await render())
+    start = time.perf_counter()
+    for _ in range(rounds):
+        await render()
+    elapsed = time.perf_counter() - start
+    return {
+        "name": name,
+        "bytes": size,
+        "ms_per_response": round(elapsed / rounds * 1000, 3),
+        "mb_per_s": round(size * rounds / elapsed / 1e6, 1),
+    }
+
+
+async def main(items: int, rounds: int) -> dict:
+    page = make_page(items)
+    field = create_response_field(name="Response_list_hackathons", type_=HackathonPage)
+    adapter = TypeAdapter(HackathonPage)
+
+    async def default() -> bytes:
+        content = await serialize_response(field=field, response_content=page)
+        return JSONResponse(content).body
+
+    async def orjson() -> bytes:
+        content = await serialize_response(field=field, response_content=page)
+        return ORJSONResponse(content).body
+
+    async def fast() -> bytes:
+        return adapter.dump_json(page, by_alias=True)
+
+    results = [
+        await measure("default", default, rounds),
+        await measure("orjson", orjson, rounds),
+        await measure("fast", fast, rounds),
+    ]
+    return {"items": items, "rounds": rounds, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--items", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=200)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.items, args.rounds)), indent=2))
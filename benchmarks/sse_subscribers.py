@@ -0,0 +1,199 @@
+"""Idle hackathon event streams per worker: memory, fan-out, eviction, resume.
+
+    python -m benchmarks.sse_subscribers --subscribers 10000 --events 100
+
+Opens `--subscribers` streams of /api/v1/hackathons/events straight
+through ASGI plus `--stalled` ones that never read, measures the
+resident set with all of them idle through a few heartbeats, then
+creates `--events` hackathons one by one and reports how long each
+event takes to reach every stream. The stalled streams must have been
+evicted, a stream resumed from an earlier Last-Event-ID must get exactly
+the later events, and closing everything must leave no subscriber.
+The client side lives in the same process, the per-stream memory is an
+upper bound of the server's.
+"""
+import argparse
+import asyncio
+import gc
+import json
+import os
+import time
+
+os.environ.setdefault("EVENTS_HEARTBEAT", "0.5")
+os.environ.setdefault("EVENTS_MAX_SUBSCRIBERS", "1000000")
+
+from benchmarks.common import client, percentile  # noqa: E402
+from benchmarks.export_memory import rss  # noqa: E402
+from benchmarks.hackathon_import import make_hackathons  # noqa: E402
+from src.data.sql import SQLManager  # noqa: E402
+from src.hackathon.repository import HackathonRepository  # noqa: E402
+from src.utils.broadcast import broadcaster  # noqa: E402
+
+PATH = "/api/v1/hackathons/events"
+
+
+class Stream:
+    """One client: counts the events it got, `close()` disconnects"""
+
+    def __init__(self, app, received: list[int], last_event_id: str | None = None):
+        self.app = app
+        self.received = received
+        self.last_event_id = last_event_id
+        self.seen = 0
+        self.ids: list[str] = []
+        self.types: list[str] = []
+        self.connected = asyncio.Event()
+        self._closed = asyncio.Event()
+        self._requested = False
+        self.task = asyncio.create_task(self._run())
+
+    async def _receive(self):
+        if self._requested:
+            await self._closed.wait()
+            return {"type": "http.disconnect"}
+        self._requested = True
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def _send(self, message) -> None:
+        if message["type"] != "http.response.body":
+            return
+        body = message.get("body", b"")
+        self.connected.set()
+        for line in body.split(b"\n"):
+            if line.startswith(b"id: "):
+                if self.last_event_id is not None:
+                    self.ids.append(line[4:].decode())
+                elif self.seen < len(self.received):
+                    self.received[self.seen] += 1
+                self.seen += 1
+            elif line.startswith(b"event: ") and self.last_event_id is not None:
+                self.types.append(line[7:].decode())
+
+    async def _run(self) -> None:
+        headers = []
+        if self.last_event_id is not None:
+            headers.append((b"last-event-id", self.last_event_id.encode()))
+        scope = {
+            "type": "http",
+            "asgi": {"version": "3.0"},
+            "http_version": "1.1",
+            "method": "GET",
+            "scheme": "http",
+            "path": PATH,
+            "raw_path": PATH.encode(),
+            "query_string": b"",
+            "root_path": "",
+            "headers": headers,
+            "client": ("127.0.0.1", 4000),
+            "server": ("bench", 80),
+        }
+        await self.app(scope, self._receive, self._send)
+
+    def close(self) -> None:
+        self._closed.set()
+
+
+class Stalled(Stream):
+    """A client whose socket stopped draining: the first write never returns"""
+
+    async def _send(self, message) -> None:
+        if message["type"] == "http.response.body":
+            self.connected.set()
+            await asyncio.Future()
+
+
+def mb(value: float) -> float:
+    return round(value / 2**20, 1)
+
+
+async def main(args) -> dict:
+    received = [0] * args.events
+    async with client() as http:
+        app = http._transport.app
+        gc.collect()
+        base = rss()
+
+        start = time.perf_counter()
+        streams = [Stream(app, received) for _ in range(args.subscribers)]
+        stalled = [Stalled(app, received) for _ in range(args.stalled)]
+        await asyncio.gather(*(s.connected.wait() for s in streams + stalled))
+        connect_seconds = time.perf_counter() - start
+        gc.collect()
+        connected = rss()
+
+        # idle through heartbeats, memory must not move
+        samples = []
+        for _ in range(args.idle_samples):
+            await asyncio.sleep(broadcaster.heartbeat)
+            samples.append(rss())
+
+        latencies = []
+        first_id = None
+        for i, hackathon in enumerate(make_hackathons(args.events, "sse")):
+            published = time.perf_counter()
+            async with SQLManager().session() as session:
+                await HackathonRepository(session).add([hackathon])
+            while received[i] < args.subscribers:
+                await asyncio.sleep(0.001)
+            latencies.append(time.perf_counter() - published)
+            if i == args.resume_from:
+                first_id = broadcaster._history["hackathons"][-1].id
+        gc.collect()
+        after_events = rss()
+        evicted = sum(1 for s in stalled if s not in broadcaster._channels["hackathons"])
+
+        resumed = Stream(app, [], last_event_id=first_id)
+        lost = Stream(app, [], last_event_id="0-0")
+        await asyncio.sleep(0.5)
+        resumed.close()
+        lost.close()
+
+        for s in streams:
+            s.close()
+        await asyncio.gather(*(s.task for s in streams + [resumed, lost]))
+        for s in stalled:
+            s.task.cancel()
+        await asyncio.gather(*(s.task for s in stalled), return_exceptions=True)
+        del streams, stalled
+        gc.collect()
+        closed = rss()
+        left = broadcaster.subscribers
+
+    expected_replay = args.events - args.resume_from - 1
+    result = {
+        "subscribers": args.subscribers,
+        "connect_seconds": round(connect_seconds, 2),
+        "rss_base_mb": mb(base),
+        "rss_connected_mb": mb(connected),
+        "kb_per_subscriber": round((connected - base) / args.subscribers / 1024, 2),
+        "rss_idle_drift_mb": mb(max(samples, default=connected) - connected),
+        "rss_after_events_mb": mb(after_events),
+        "rss_closed_mb": mb(closed),
+        "events": args.events,
+        "fan_out_p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "fan_out_p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "stalled_evicted": f"{evicted}/{args.stalled}",
+        "resume_replayed": f"{len(resumed.ids)}/{expected_replay}",
+        "unknown_id_reset": lost.types[:1] == ["reset"],
+        "subscribers_left": left,
+    }
+    result["ok"] = (
+        evicted == args.stalled
+        and len(resumed.ids) == expected_replay
+        and result["unknown_id_reset"]
+        and left == 0
+    )
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--subscribers", type=int, default=10_000)
+    parser.add_argument("--stalled", type=int, default=10)
+    parser.add_argument("--events", type=int, default=100)
+    parser.add_argument("--resume-from", type=int, default=49)
+    parser.add_argument("--idle-samples", type=int, default=6)
+    args = parser.parse_args()
+    result = asyncio.run(main(args))
+    print(json.dumps(result, indent=2))
+    raise SystemExit(0 if result["ok"] else 1)
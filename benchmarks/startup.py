@@ -0,0 +1,75 @@
+"""Cold start of a worker: process spawn to ready, with the per-phase report.
+
+    python -m benchmarks.startup --runs 5
+
+Each run is a fresh interpreter that builds the app, runs its lifespan
+(mappers, schema, pool prefill) and serves one request.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+CHILD = """
+import asyncio, json, time
+from benchmarks.common import client
+
+async def main():
+    async with client() as http:
+        ready = time.perf_counter()
+        await http.get("/api/v1/hackathons")
+        first_request = time.perf_counter() - ready
+        startup = http._transport.app.state.startup
+    print(json.dumps({**startup, "first_request_ms": round(first_request * 1000, 1)}))
+
+asyncio.run(main())
+"""
+
+
+def run(env: dict) -> dict:
+    start = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-c", CHILD],
+        env={**os.environ, **env},
+        capture_output=True,
+        text=True,
+        check=True,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    ).stdout
+    report = json.loads(output.strip().splitlines()[-1])
+    report["process_ms"] = round((time.perf_counter() - start) * 1000, 1)
+    return report
+
+
+def summarize(name: str, reports: list[dict]) -> dict:
+    return {
+        "name": name,
+        **{key: statistics.median(r[key] for r in reports) for key in reports[0]},
+    }
+
+
+def main(runs: int) -> dict:
+    directory = tempfile.mkdtemp(prefix="itam-startup-")
+    results = []
+    for name, schema in (("create_all", "create_all"), ("migrations", "migrations")):
+        env = {
+            "DATABASE_URL": f"sqlite:///{directory}/{name}.db",
+            "DB_SCHEMA": schema,
+            "DB_MIGRATE_ON_STARTUP": "true",
+            "LOG_LEVEL": "WARNING",
+        }
+        run(env)  # first run creates/migrates the schema
+        env["DB_MIGRATE_ON_STARTUP"] = "false"
+        results.append(summarize(name, [run(env) for _ in range(runs)]))
+    return {"runs": runs, "results": results}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    print(json.dumps(main(args.runs), indent=2))
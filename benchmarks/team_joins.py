@@ -0,0 +1,162 @@
+"""Thousands of students racing to join the same teams.
+
+    python -m benchmarks.team_joins --students 5000 --teams 200 --team-size 5
+    DB_ASYNC=false python -m benchmarks.team_joins   # threadpool sessions
+    DATABASE_URL=postgresql://... python -m benchmarks.team_joins
+
+Registers every student, lets the first `--teams` of them create a team
+and fires the joins of all the others at once (`--concurrency` in
+flight), each at a random team. There are far fewer places than
+students, most joins have to be refused. Exits 1 when a team ended up
+over its capacity or its members_count disagrees with its registrations.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import time
+from collections import Counter
+from datetime import datetime, timedelta
+
+# the whole burst has to reach the database, not be shed with 503
+os.environ.setdefault("ADMISSION_MAX_CONCURRENCY", "1000000")
+
+from benchmarks.common import client, report  # noqa: E402
+from benchmarks.harness import seed  # noqa: E402
+from sqlalchemy import func, select, update  # noqa: E402
+from src.auth.jwt import create_access_jwt  # noqa: E402
+from src.data.repository import BaseRepository  # noqa: E402
+from src.data.sql import SQLManager  # noqa: E402
+from src.hackathon.model import Hackathon  # noqa: E402
+from src.team.model import Registration, Team  # noqa: E402
+
+HACKATHON = 1
+
+
+async def fire(name: str, requests: list, concurrency: int) -> tuple[dict, Counter]:
+    """All requests at once, at most `concurrency` in flight"""
+    slots = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+    statuses: Counter = Counter()
+
+    async def one(request) -> None:
+        async with slots:
+            start = time.perf_counter()
+            response = await request()
+            latencies.append(time.perf_counter() - start)
+            statuses[response.status_code] += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(request) for request in requests))
+    result = report(name, latencies, time.perf_counter() - start)
+    result["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return result, statuses
+
+
+async def check() -> list[dict]:
+    """Teams over capacity or whose counter drifted from their registrations"""
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        members = (
+            select(Registration.team_id, func.count().label("members"))
+            .where(Registration.team_id.is_not(None))
+            .group_by(Registration.team_id)
+            .subquery()
+        )
+        rows = (
+            await repository._execute(
+                select(Team.id, Team.capacity, Team.members_count, members.c.members)
+                .outerjoin(members, members.c.team_id == Team.id)
+                .where(Team.hackathon_id == HACKATHON)
+            )
+        ).all()
+    return [
+        {"team": team_id, "capacity": capacity, "count": count, "members": counted or 0}
+        for team_id, capacity, count, counted in rows
+        if count > capacity or (counted or 0) > capacity or count != (counted or 0)
+    ]
+
+
+async def main(args) -> dict:
+    await seed(args.students + 1, 1)
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        await repository._execute(
+            update(Hackathon)
+            .where(Hackathon.id == HACKATHON)
+            .values(
+                registration_finish=datetime.now() + timedelta(days=1),
+                team_maximum_size=args.team_size,
+            )
+        )
+        await repository._commit()
+
+    # user 1 is the seeded admin
+    students = list(range(2, args.students + 2))
+    headers = {u: {"Authorization": f"Bearer {create_access_jwt(u)}"} for u in students}
+    captains, joiners = students[: args.teams], students[args.teams :]
+    rng = random.Random(1)
+    base = f"/api/v1/hackathons/{HACKATHON}"
+
+    async with client() as http:
+        registered, _ = await fire(
+            "register",
+            [
+                lambda u=u: http.post(f"{base}/registration", headers=headers[u])
+                for u in students
+            ],
+            args.concurrency,
+        )
+        created, _ = await fire(
+            "create_team",
+            [
+                lambda u=u: http.post(
+                    f"{base}/teams", json={"name": f"team {u}"}, headers=headers[u]
+                )
+                for u in captains
+            ],
+            args.concurrency,
+        )
+        teams = await http.get(f"{base}/teams", headers=headers[captains[0]])
+        team_ids = [team["id"] for team in teams.json()]
+        joined, statuses = await fire(
+            "join",
+            [
+                lambda u=u: http.post(
+                    f"{base}/teams/{rng.choice(team_ids)}/members", headers=headers[u]
+                )
+                for u in joiners
+            ],
+            args.concurrency,
+        )
+
+    violations = await check()
+    places = len(team_ids) * (args.team_size - 1)
+    return {
+        "config": {
+            "students": args.students,
+            "teams": len(team_ids),
+            "team_size": args.team_size,
+            "concurrency": args.concurrency,
+        },
+        "results": [registered, created, joined],
+        "joins_per_s": joined["rps"],
+        "places": places,
+        "joined": statuses[200],
+        "violations": violations,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--students", type=int, default=5000)
+    parser.add_argument("--teams", type=int, default=200)
+    parser.add_argument("--team-size", type=int, default=5)
+    parser.add_argument("--concurrency", type=int, default=200)
+    args = parser.parse_args()
+    output = asyncio.run(main(args))
+    print(json.dumps(output, indent=2))
+    if output["violations"]:
+        sys.exit(1)
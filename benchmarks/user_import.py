@@ -0,0 +1,108 @@
+"""Rows/second of the admin user import, POST /api/v1/users/import.
+
+    python -m benchmarks.user_import --rows 100000 --plain-rows 500 --format csv
+
+`--rows` carry an existing bcrypt hash and measure the parsing and the
+batched inserts, `--plain-rows` carry a password and are bounded by
+bcrypt: about PASSWORD_HASH_WORKERS / (0.25 s at BCRYPT_ROUNDS=12) rows/s.
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+
+from benchmarks.common import client
+from benchmarks.harness import FACULTIES, MAJORS, SKILLS, seed
+from src.auth.jwt import create_access_jwt, pwd_context
+
+ROLES = ["backend", "frontend", "design", "ml", "mobile"]
+COLUMNS = [
+    "email", "password", "password_hash", "first_name", "last_name",
+    "graduation_year", "major", "faculty", "tg_id", "skills", "roles",
+]
+
+
+def make_rows(rows: int, prefix: str, password_hash: str | None) -> list[dict]:
+    rng = random.Random(42)
+    return [
+        {
+            "email": f"{prefix}{i}@import.test",
+            "password": None if password_hash else f"password{i}",
+            "password_hash": password_hash,
+            "first_name": f"Имя{i}",
+            "last_name": f"Фамилия{i}",
+            "graduation_year": 2024 + i % 4,
+            "major": rng.choice(MAJORS),
+            "faculty": rng.choice(FACULTIES),
+            "tg_id": hash(prefix) % 1_000_000 * 1_000_000 + i if i % 2 else None,
+            "skills": rng.sample(SKILLS, 3),
+            "roles": rng.sample(ROLES, 1),
+        }
+        for i in range(rows)
+    ]
+
+
+def encode(rows: list[dict], format: str) -> list[bytes]:
+    if format == "ndjson":
+        return [
+            json.dumps({k: v for k, v in row.items() if v is not None}).encode() + b"\n"
+            for row in rows
+        ]
+    lines = [",".join(COLUMNS).encode() + b"\n"]
+    for row in rows:
+        cells = [
+            ";".join(value) if isinstance(value, list) else "" if value is None else str(value)
+            for value in (row[column] for column in COLUMNS)
+        ]
+        lines.append(",".join(cells).encode() + b"\n")
+    return lines
+
+
+async def upload(http, lines: list[bytes], format: str, admin: dict) -> tuple[dict, float]:
+    async def body():
+        for start in range(0, len(lines), 1000):
+            yield b"".join(lines[start : start + 1000])
+
+    content_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    start = time.perf_counter()
+    response = await http.post(
+        "/api/v1/users/import",
+        content=body(),
+        headers={**admin, "Content-Type": content_type},
+        timeout=None,
+    )
+    return response.json(), time.perf_counter() - start
+
+
+async def main(args) -> dict:
+    await seed(1, 0)
+    admin = {"Authorization": f"Bearer {create_access_jwt(1)}"}
+    password_hash = pwd_context().hash("imported123")
+    results = {"format": args.format}
+    async with client() as http:
+        for name, rows, hashed in (
+            ("prehashed", args.rows, password_hash),
+            ("plain", args.plain_rows, None),
+        ):
+            if not rows:
+                continue
+            lines = encode(make_rows(rows, name, hashed), args.format)
+            result, elapsed = await upload(http, lines, args.format, admin)
+            results[name] = {
+                "rows": rows,
+                "imported": result["imported"],
+                "errors": len(result["errors"]),
+                "seconds": round(elapsed, 2),
+                "rows_per_s": round(rows / elapsed),
+            }
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--plain-rows", type=int, default=200)
+    parser.add_argument("--format", choices=["csv", "ndjson"], default="csv")
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args))))
@@ -0,0 +1,47 @@
+"""Throughput of GET /api/v1/users/me under parallel load.
+
+    python -m benchmarks.users_me --concurrency 200 --requests 5000
+    DB_ASYNC=false python -m benchmarks.users_me   # sync driver baseline
+"""
+import argparse
+import asyncio
+import json
+import time
+
+from benchmarks.common import client, report, timed
+from src.auth.cache import user_cache
+
+
+async def main(concurrency: int, requests: int) -> dict:
+    async with client() as http:
+        credentials = {
+            "email": "bench@test.com",
+            "password": "bench123456",
+            "first_name": "Bench",
+            "last_name": "Bench",
+        }
+        response = await http.post("/auth/signup", json=credentials)
+        token = response.json()["access_token"]
+        headers = {"Authorization": f"Bearer {token}"}
+
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies: list[float] = []
+
+        async def one():
+            async with semaphore:
+                latencies.append(await timed(http.get("/api/v1/users/me", headers=headers)))
+
+        start = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        result = report("users_me", latencies, time.perf_counter() - start)
+        result["auth_cache_hits"] = user_cache.hits
+        result["auth_cache_misses"] = user_cache.misses
+        return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+    print(json.dumps(asyncio.run(main(args.concurrency, args.requests))))
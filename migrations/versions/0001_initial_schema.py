@@ -0,0 +1,209 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2026-10-18 18:47:31.252899
+
+Databases set up before migrations existed already have the tables,
+made by `Base.metadata.create_all` at startup. Upgrading one of them
+(`alembic upgrade head` or DB_MIGRATE_ON_STARTUP=true) brings those
+tables to this revision instead of creating them. Duplicate tags are
+merged before `hackathon_tags.tag` becomes unique, and duplicate tag
+links are dropped before `hackathons_to_tags` gets its primary key.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0001'
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+POSTGRES_INDEXES = [
+    ("ix_hackathon_tags_tag_trgm", "hackathon_tags", "tag gin_trgm_ops"),
+    (
+        "ix_hackathons_title_fts",
+        "hackathons",
+        "to_tsvector('russian'::regconfig, coalesce(title, ''))",
+    ),
+    ("ix_hackathons_title_trgm", "hackathons", "title gin_trgm_ops"),
+    ("ix_skills_skill_name_trgm", "skills", "skill_name gin_trgm_ops"),
+    ("ix_students_info_major_trgm", "students_info", "major gin_trgm_ops"),
+    ("ix_students_info_faculty_trgm", "students_info", "faculty gin_trgm_ops"),
+    (
+        "ix_students_info_fts",
+        "students_info",
+        "to_tsvector('russian'::regconfig, (((coalesce(major, '') || ' ') "
+        "|| coalesce(faculty, '')) || ' ') || coalesce(about, ''))",
+    ),
+]
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    if sa.inspect(op.get_bind()).has_table("users"):
+        adopt_create_all_schema()
+    else:
+        create_schema()
+
+    # search indexes (src/search/sql.py), Postgres only like in the models
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        for name, table, expression in POSTGRES_INDEXES:
+            op.execute(
+                f"CREATE INDEX IF NOT EXISTS {name} ON {table} USING gin ({expression})"
+            )
+
+
+def adopt_create_all_schema() -> None:
+    """Tables made by create_all from the models before this revision"""
+    # keep the lowest id of every tag, point the links of the others at it
+    op.execute(
+        "UPDATE hackathons_to_tags SET tag_id = ("
+        " SELECT min(kept.id) FROM hackathon_tags kept"
+        " JOIN hackathon_tags linked ON linked.tag = kept.tag"
+        " WHERE linked.id = hackathons_to_tags.tag_id)"
+    )
+    op.execute(
+        "DELETE FROM hackathon_tags WHERE id NOT IN"
+        " (SELECT min(id) FROM hackathon_tags GROUP BY tag)"
+    )
+    with op.batch_alter_table("hackathon_tags") as batch_op:
+        batch_op.create_unique_constraint("hackathon_tags_tag_key", ["tag"])
+
+    # no primary key to dedupe by, copy the distinct links into a new table
+    op.rename_table("hackathons_to_tags", "hackathons_to_tags_create_all")
+    create_hackathons_to_tags()
+    op.execute(
+        "INSERT INTO hackathons_to_tags (hackathon_id, tag_id)"
+        " SELECT DISTINCT hackathon_id, tag_id FROM hackathons_to_tags_create_all"
+        " WHERE hackathon_id IS NOT NULL AND tag_id IS NOT NULL"
+    )
+    op.drop_table("hackathons_to_tags_create_all")
+
+    create_hackathon_indexes()
+
+
+def create_hackathon_indexes() -> None:
+    op.create_index('ix_hackathons_prize_type_registration_finish_id', 'hackathons', ['prize_type', 'registration_finish', 'id'], unique=False)
+    op.create_index('ix_hackathons_registration_finish_id', 'hackathons', ['registration_finish', 'id'], unique=False)
+
+
+def create_hackathons_to_tags() -> None:
+    op.create_table('hackathons_to_tags',
+    sa.Column('hackathon_id', sa.Integer(), nullable=False),
+    sa.Column('tag_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['hackathon_id'], ['hackathons.id'], ),
+    sa.ForeignKeyConstraint(['tag_id'], ['hackathon_tags.id'], ),
+    sa.PrimaryKeyConstraint('hackathon_id', 'tag_id')
+    )
+    op.create_index('ix_hackathons_to_tags_tag_id_hackathon_id', 'hackathons_to_tags', ['tag_id', 'hackathon_id'], unique=False)
+
+
+def create_schema() -> None:
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('hackathon_tags',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('tag', sa.String(length=50), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('tag')
+    )
+    op.create_table('hackathons',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('title', sa.String(length=80), nullable=False),
+    sa.Column('registration_finish', sa.DateTime(), nullable=False),
+    sa.Column('team_minimum_size', sa.Integer(), nullable=False),
+    sa.Column('team_maximum_size', sa.Integer(), nullable=False),
+    sa.Column('prize_type', sa.Enum('money', 'merchandise', 'other', name='prizetype'), nullable=False),
+    sa.Column('money_prize', sa.Integer(), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    create_hackathon_indexes()
+    op.create_table('roles',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('role_name', sa.String(length=80), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_roles_role_name'), 'roles', ['role_name'], unique=False)
+    op.create_table('skills',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('skill_name', sa.String(length=80), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_skills_skill_name'), 'skills', ['skill_name'], unique=False)
+    op.create_table('users',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=30), nullable=False),
+    sa.Column('last_name', sa.String(length=30), nullable=False),
+    sa.Column('email', sa.String(length=50), nullable=False),
+    sa.Column('internal_role', sa.Enum('admin', 'student', name='userrole'), nullable=False),
+    sa.Column('password', sa.String(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_users_email'), 'users', ['email'], unique=True)
+    create_hackathons_to_tags()
+    op.create_table('students_info',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('graduation_year', sa.Integer(), nullable=False),
+    sa.Column('major', sa.String(length=30), nullable=False),
+    sa.Column('faculty', sa.String(length=30), nullable=False),
+    sa.Column('portfolio_url', sa.String(), nullable=True),
+    sa.Column('about', sa.String(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_table('tg_users',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('first_name', sa.String(length=30), nullable=False),
+    sa.Column('tg_id', sa.Integer(), nullable=False),
+    sa.Column('last_name', sa.String(length=30), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+    op.create_index(op.f('ix_tg_users_tg_id'), 'tg_users', ['tg_id'], unique=True)
+    op.create_table('user_roles',
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('role_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['role_id'], ['roles.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], )
+    )
+    op.create_table('user_skills',
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('skill_id', sa.Integer(), nullable=True),
+    sa.ForeignKeyConstraint(['skill_id'], ['skills.id'], ),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], )
+    )
+    # ### end Alembic commands ###
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        for name, _, _ in POSTGRES_INDEXES:
+            op.execute(f"DROP INDEX IF EXISTS {name}")
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.drop_table('user_skills')
+    op.drop_table('user_roles')
+    op.drop_index(op.f('ix_tg_users_tg_id'), table_name='tg_users')
+    op.drop_table('tg_users')
+    op.drop_table('students_info')
+    op.drop_index('ix_hackathons_to_tags_tag_id_hackathon_id', table_name='hackathons_to_tags')
+    op.drop_table('hackathons_to_tags')
+    op.drop_index(op.f('ix_users_email'), table_name='users')
+    op.drop_table('users')
+    op.drop_index(op.f('ix_skills_skill_name'), table_name='skills')
+    op.drop_table('skills')
+    op.drop_index(op.f('ix_roles_role_name'), table_name='roles')
+    op.drop_table('roles')
+    op.drop_index('ix_hackathons_registration_finish_id', table_name='hackathons')
+    op.drop_index('ix_hackathons_prize_type_registration_finish_id', table_name='hackathons')
+    op.drop_table('hackathons')
+    op.drop_table('hackathon_tags')
+    # ### end Alembic commands ###
+    sa.Enum(name="prizetype").drop(op.get_bind(), checkfirst=True)
+    sa.Enum(name="userrole").drop(op.get_bind(), checkfirst=True)
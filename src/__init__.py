@@ -0,0 +1,4 @@
+import time
+
+# startup reports measure from the first import of the package
+IMPORTED_AT = time.perf_counter()
@@ -1,8 +1,14 @@
 from fastapi import APIRouter
 from src.user.endpoints import router as user_router
 from src.hackathon.endpoints import router as hackathon_router
+from src.search.endpoints import router as search_router
+from src.matching.endpoints import router as matching_router
+from src.team.endpoints import router as team_router
 
 api_router = APIRouter(prefix="/api/v1")
 
 api_router.include_router(user_router)
 api_router.include_router(hackathon_router)
+api_router.include_router(search_router)
+api_router.include_router(matching_router)
+api_router.include_router(team_router)
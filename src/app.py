@@ -1,13 +1,75 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse, ORJSONResponse
+from sqlalchemy.orm import configure_mappers
+from starlette.concurrency import run_in_threadpool
+from src import IMPORTED_AT
 from src.api import api_router
 from src.auth.endpoints import router as auth_router
+from src.auth.hashing import hasher
+from src.auth.revocation import revocations
+from src.data.replicas import StickyPrimaryMiddleware
+from src.data.sql import SQLManager
+from src.idempotency.middleware import IdempotencyMiddleware, idempotency
+from src.monitoring.endpoints import router as monitoring_router
+from src.monitoring.profiling import TimingMiddleware
+from src.monitoring.startup import StartupReport
+from src.utils.admission import AdmissionMiddleware
+from src.utils.broadcast import broadcaster
+from src.utils.logging import RequestIdMiddleware, get_logger, setup_logging
+from src.utils.serialization import use_fast_serialization
+from src.utils.settings import settings
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Everything a worker needs before its first request, done once"""
+    report = StartupReport(IMPORTED_AT)
+    report.phases["import"] = report.total
+    with report.phase("mappers"):
+        configure_mappers()
+    db = SQLManager(get_logger("db"))
+    with report.phase("schema"):
+        await db.prepare()
+    with report.phase("prefill"):
+        await db.prefill(settings.db_pool_prefill)
+    with report.phase("replicas"):
+        await db.replicas.check()
+    db.replicas.start()
+    with report.phase("revocations"):
+        await revocations.start(db)
+    with report.phase("events"):
+        await broadcaster.start()
+    idempotency.start(db)
+    app.state.startup = report.finish()
+    yield
+    # uvicorn has drained in-flight requests by now, event streams are
+    # cut at WEB_GRACEFUL_TIMEOUT and resume on another worker
+    await broadcaster.stop()
+    await revocations.stop()
+    await idempotency.stop()
+    await db.close()
+    await run_in_threadpool(hasher.shutdown)
 
 
 def create_app():
+    setup_logging()
     _app = FastAPI(
         name="Itam Hacks",
         description="Itam Hacks API",
+        default_response_class=ORJSONResponse if settings.fast_json else JSONResponse,
+        lifespan=lifespan,
     )
     _app.include_router(api_router)
     _app.include_router(auth_router)
+    _app.include_router(monitoring_router)
+    # innermost, the headers the others add are per request and not stored
+    _app.add_middleware(IdempotencyMiddleware)
+    if settings.database_replica_urls.strip():
+        _app.add_middleware(StickyPrimaryMiddleware)
+    _app.add_middleware(TimingMiddleware)
+    _app.add_middleware(AdmissionMiddleware)
+    _app.add_middleware(RequestIdMiddleware)
+    if settings.fast_json:
+        use_fast_serialization(_app)
     return _app
@@ -0,0 +1,13 @@
+from src.utils.cache import TTLCache
+from src.utils.settings import settings
+
+
+# access token -> AccessClaims, saves decoding and verifying the JWT
+token_cache = TTLCache("auth_tokens", settings.auth_cache_size, settings.auth_cache_ttl)
+
+# user id -> UserDto, saves the database round-trip in get_current_user
+user_cache = TTLCache("auth_users", settings.auth_cache_size, settings.auth_cache_ttl)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.pop(user_id)
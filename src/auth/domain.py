@@ -21,4 +21,16 @@ class Login(AuthBase):
 
 class AccessToken(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str = "Bearer"
+    expires_in: int = Field(..., description="Seconds the access token is valid")
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str = Field(..., max_length=100)
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: str | None = Field(
+        None, max_length=100, description="Also revoked with its rotations"
+    )
@@ -1,47 +1,132 @@
-from fastapi import APIRouter, HTTPException, Depends, status
-from src.auth.domain import Signup, Login, AccessToken
-from src.data.dependencies import get_user_repository
+from fastapi import APIRouter, HTTPException, Depends, Response, status
+from src.auth.domain import (
+    AccessToken,
+    Login,
+    LogoutRequest,
+    RefreshRequest,
+    Signup,
+)
+from src.auth.repository import IssuedTokens, TokenRepository
+from src.auth.revocation import revocations
+from src.data.dependencies import (
+    get_access_claims,
+    get_token_repository,
+    get_user_repository,
+)
 from src.user.repository import UserRepository
 from src.utils.logging import get_logger
-from .jwt import create_access_jwt, get_password_hash, verify_password
+from src.utils.rate_limit import auth_email_limit, limit_auth_ip, rate_limiter
+from src.utils.settings import settings
+from .hashing import hasher
+from .jwt import AccessClaims, create_access_jwt
 
 router = APIRouter(prefix="/auth", tags=["auth"])
 
 log = get_logger(__name__)
 
 
-@router.post("/signup", response_model=AccessToken, status_code=status.HTTP_201_CREATED)
+def _tokens(response: Response, issued: IssuedTokens) -> AccessToken:
+    # no cache keeps credentials, the idempotency keys included
+    response.headers["Cache-Control"] = "no-store"
+    return AccessToken(
+        access_token=create_access_jwt(issued.user_id, version=issued.token_version),
+        refresh_token=issued.refresh_token,
+        expires_in=settings.access_token_expire_minutes * 60,
+    )
+
+
+@router.post(
+    "/signup",
+    response_model=AccessToken,
+    status_code=status.HTTP_201_CREATED,
+    dependencies=[Depends(limit_auth_ip)],
+)
 async def signup(
     signup_data: Signup,
+    response: Response,
     repository: UserRepository = Depends(get_user_repository),
+    tokens: TokenRepository = Depends(get_token_repository),
 ) -> AccessToken:
     try:
-        signup_data.password = get_password_hash(signup_data.password)
-        user = repository.add(signup_data)
-        return AccessToken(access_token=create_access_jwt(user.id))
+        signup_data.password = await hasher.hash(signup_data.password)
+        user = await repository.add(signup_data)
+        return _tokens(response, await tokens.issue(user.id))
+    except HTTPException:
+        raise
     except Exception as e:
         log.debug(str(e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
 
-@router.post("/login", response_model=AccessToken, status_code=status.HTTP_200_OK)
+@router.post(
+    "/login",
+    response_model=AccessToken,
+    status_code=status.HTTP_200_OK,
+    dependencies=[Depends(limit_auth_ip)],
+)
 async def login(
     login_data: Login,
+    response: Response,
     repository: UserRepository = Depends(get_user_repository),
+    tokens: TokenRepository = Depends(get_token_repository),
 ) -> AccessToken:
     try:
-        user = repository.get(email=login_data.email)
+        await rate_limiter.check(auth_email_limit, login_data.email.lower())
+        user = await repository.get(email=login_data.email)
         if not user:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="User with this email does not exist",
             )
-        if not verify_password(login_data.password, user.password):
+        await repository.release()
+        verified, new_hash = await hasher.verify_and_update(
+            login_data.password, user.password
+        )
+        if not verified:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Incorrect password",
             )
-        return AccessToken(access_token=create_access_jwt(user.id))
+        if new_hash:
+            # bcrypt cost changed since the hash was stored
+            user.password = new_hash
+            await repository.update(user)
+        return _tokens(response, await tokens.issue(user.id))
+    except HTTPException:
+        raise
     except Exception as e:
         log.debug(str(e))
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.post("/refresh", response_model=AccessToken, status_code=status.HTTP_200_OK)
+async def refresh(
+    refresh_data: RefreshRequest,
+    response: Response,
+    tokens: TokenRepository = Depends(get_token_repository),
+) -> AccessToken:
+    """Single use, the response carries the refresh token to send next time.
+    Sending a spent one again logs out every token descended from it."""
+    return _tokens(response, await tokens.rotate(refresh_data.refresh_token))
+
+
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    logout_data: LogoutRequest | None = None,
+    claims: AccessClaims = Depends(get_access_claims),
+    tokens: TokenRepository = Depends(get_token_repository),
+) -> Response:
+    """Revokes the access token, and the refresh token if sent"""
+    refresh_token = logout_data.refresh_token if logout_data else None
+    revocations.add(await tokens.revoke_access(claims, refresh_token))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
+
+
+@router.post("/logout/all", status_code=status.HTTP_204_NO_CONTENT)
+async def logout_everywhere(
+    claims: AccessClaims = Depends(get_access_claims),
+    tokens: TokenRepository = Depends(get_token_repository),
+) -> Response:
+    """Revokes every access and refresh token of the user issued so far"""
+    revocations.add(await tokens.revoke_user(claims.user_id))
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
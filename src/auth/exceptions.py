@@ -6,3 +6,13 @@ CredentialException = HTTPException(
     detail="Could not validate credentials",
     headers={"WWW-Authenticate": "Bearer"},
 )
+
+HashingBusyException = HTTPException(
+    status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+    detail="Too many authentication requests, retry later",
+    headers={"Retry-After": "1"},
+)
+
+InvalidRefreshToken = HTTPException(
+    status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid refresh token"
+)
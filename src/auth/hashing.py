@@ -0,0 +1,82 @@
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable
+from src.auth.exceptions import HashingBusyException
+from src.auth.jwt import get_password_hash, verify_and_update_password
+from src.monitoring.profiling import span
+from src.utils.settings import settings
+
+
+class PasswordHasher:
+    """bcrypt on a bounded worker pool so it never runs on the event loop.
+
+    At most `workers + queue_size` jobs are accepted at once, anything
+    above that is rejected with 429 instead of queueing without limit.
+    """
+
+    def __init__(
+        self,
+        workers: int = settings.password_hash_workers,
+        queue_size: int = settings.password_hash_queue_size,
+        kind: str = settings.password_hash_executor,
+    ) -> None:
+        self.workers = workers
+        self.capacity = workers + queue_size
+        self.kind = kind
+        self.pending = 0
+        self._executor: Executor | None = None
+
+    @property
+    def executor(self) -> Executor:
+        if self._executor is None:
+            if self.kind == "process":
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            else:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="bcrypt"
+                )
+        return self._executor
+
+    async def _submit(self, fn: Callable[..., Any], *args) -> Any:
+        if self.pending >= self.capacity:
+            raise HashingBusyException
+        return await self._run(fn, *args)
+
+    async def _run(self, fn: Callable[..., Any], *args) -> Any:
+        self.pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            with span("bcrypt"):
+                return await loop.run_in_executor(self.executor, fn, *args)
+        finally:
+            self.pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(get_password_hash, password)
+
+    async def verify_and_update(
+        self, password: str, hashed_password: str
+    ) -> tuple[bool, str | None]:
+        return await self._submit(verify_and_update_password, password, hashed_password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        """Hashes for a bulk import, in order.
+
+        Waits instead of failing with 429, and keeps at most `workers` jobs
+        in flight so logins queue behind one round of it, not the whole batch.
+        """
+        slots = asyncio.Semaphore(self.workers)
+
+        async def one(password: str) -> str:
+            async with slots:
+                return await self._run(get_password_hash, password)
+
+        return await asyncio.gather(*(one(password) for password in passwords))
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+hasher = PasswordHasher()
@@ -1,53 +1,93 @@
-from datetime import timedelta, datetime
+import secrets
+import time
+from datetime import timedelta
+from functools import cache
+from typing import NamedTuple
 from fastapi.security import OAuth2PasswordBearer
 from jose import JWTError, jwt
-from passlib.context import CryptContext
 from .exceptions import CredentialException
 from src.utils.settings import settings
 
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="access_token")
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+@cache
+def pwd_context():
+    """Built on first use, passlib is only needed once someone logs in"""
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"],
+        deprecated="auto",
+        bcrypt__default_rounds=settings.bcrypt_rounds,
+        bcrypt__min_rounds=settings.bcrypt_rounds,
+        bcrypt__max_rounds=settings.bcrypt_rounds,
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
+
+
+def verify_and_update_password(
+    plain_password: str, hashed_password: str
+) -> tuple[bool, str | None]:
+    """Verify the password, returns a new hash if the stored one uses another cost"""
+    return pwd_context().verify_and_update(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    hashed_password = pwd_context.hash(password)
+    hashed_password = pwd_context().hash(password)
     return hashed_password
 
 
-def create_access_jwt(user_id: int, expires_delta: timedelta | None = None) -> str:
-    """Creating access JWT token Creating access JWT token for user with id"""
-    to_encode = {"sub": str(user_id)}
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.access_token_expire_minutes
-        )
-    to_encode["exp"] = expire
-    encoded_jwt = jwt.encode(
-        to_encode, settings.secret_key, algorithm=settings.algorithm
-    )
-    return encoded_jwt
+class AccessClaims(NamedTuple):
+    user_id: int
+    jti: str
+    issued_at: float
+    expires_at: float
+    # User.token_version when issued
+    version: int = 0
+
+
+def create_access_jwt(
+    user_id: int, expires_delta: timedelta | None = None, version: int = 0
+) -> str:
+    """Short-lived access JWT of the user, `jti` identifies it for revocation,
+    `ver` is the user's token version (logging out everywhere bumps it)"""
+    if expires_delta is None:
+        expires_delta = timedelta(minutes=settings.access_token_expire_minutes)
+    issued_at = time.time()
+    to_encode = {
+        "sub": str(user_id),
+        "jti": secrets.token_hex(16),
+        "iat": issued_at,
+        "exp": issued_at + expires_delta.total_seconds(),
+        "ver": version,
+    }
+    return jwt.encode(to_encode, settings.secret_key, algorithm=settings.algorithm)
 
 
-def decode_jwt(token: str | None = None) -> int:
+def decode_jwt(token: str | None = None) -> AccessClaims:
+    """Tokens without a jti predate revocation and are refused"""
     if token is None:
-        return CredentialException
+        raise CredentialException
     try:
         payload = jwt.decode(
             str(token), settings.secret_key, algorithms=[settings.algorithm]
         )
         user_id: str = payload.get("sub")
-        expire_time: str = payload.get("exp")
+        jti: str = payload.get("jti")
 
-        if user_id is None:
+        if user_id is None or jti is None:
             raise CredentialException
-        return int(user_id)
+        return AccessClaims(
+            int(user_id),
+            jti,
+            payload.get("iat", 0),
+            payload["exp"],
+            int(payload.get("ver", 0)),
+        )
     except JWTError:
         raise CredentialException
@@ -0,0 +1,53 @@
+from datetime import datetime
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from src.data import Base
+
+
+class RefreshToken(Base):
+    """Single use: refreshing marks the row used and issues the next one
+    of the same family, presenting a used token again revokes the family"""
+
+    __tablename__ = "refresh_tokens"
+
+    id: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    family_id: Mapped[str] = mapped_column(String(32), index=True)
+    # sha256 of the secret half, the token itself is never stored
+    secret_hash: Mapped[str] = mapped_column(String(64))
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    used_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+
+    __table_args__ = (Index("ix_refresh_tokens_user_id", "user_id"),)
+
+
+class TokenRevocation(Base):
+    """Revoked access tokens: one token by `jti`, or every token of the
+    user with a version below `token_version`. Workers keep them in memory
+    and read the rows with new ids, rows are dropped once the tokens they
+    revoke have expired anyway."""
+
+    __tablename__ = "token_revocations"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    jti: Mapped[str] = mapped_column(String(32), nullable=True)
+    token_version: Mapped[int] = mapped_column(Integer, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+    created_at: Mapped[datetime] = mapped_column(DateTime, server_default=func.now())
+
+    __table_args__ = (
+        CheckConstraint(
+            "jti IS NOT NULL OR token_version IS NOT NULL",
+            name="ck_token_revocations_target",
+        ),
+    )
@@ -0,0 +1,204 @@
+import hashlib
+import secrets
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from sqlalchemy import Row, delete, or_, select, update
+from sqlalchemy.orm import Session
+from src.auth.exceptions import InvalidRefreshToken
+from src.auth.jwt import AccessClaims
+from src.auth.model import RefreshToken, TokenRevocation
+from src.data.repository import BaseRepository
+from src.monitoring.metrics import Counter
+from src.user.model import User
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+
+refresh_reused = Counter(
+    "auth_refresh_reused_total", "Spent refresh tokens presented again, families revoked"
+)
+
+log = get_logger("TokenRepository")
+
+# revocation rows outlive the tokens they revoke by this much, for workers
+# whose clocks run ahead of the one that wrote the row
+CLOCK_SKEW = timedelta(minutes=1)
+
+
+class IssuedTokens(NamedTuple):
+    user_id: int
+    refresh_token: str
+    # for the access token issued with it
+    token_version: int
+
+
+def _secret_hash(secret: str) -> str:
+    return hashlib.sha256(secret.encode()).hexdigest()
+
+
+def _new_refresh(user_id: int, family_id: str | None, now: datetime) -> tuple[str, RefreshToken]:
+    """`<id>.<secret>` and its row, a new family unless rotating"""
+    token_id, secret = secrets.token_hex(16), secrets.token_urlsafe(32)
+    row = RefreshToken(
+        id=token_id,
+        user_id=user_id,
+        family_id=family_id or token_id,
+        secret_hash=_secret_hash(secret),
+        expires_at=now + timedelta(days=settings.refresh_token_expire_days),
+    )
+    return f"{token_id}.{secret}", row
+
+
+def _utc(timestamp: float) -> datetime:
+    return datetime.utcfromtimestamp(timestamp)
+
+
+def _token_version(session: Session, user_id: int) -> int:
+    return session.scalar(select(User.token_version).where(User.id == user_id)) or 0
+
+
+class TokenRepository(BaseRepository):
+    """Refresh tokens and revoked access tokens, times are naive UTC like the JWTs"""
+
+    async def issue(self, user_id: int) -> IssuedTokens:
+        return await self._run_sync(self._issue, user_id)
+
+    @staticmethod
+    def _issue(session: Session, user_id: int) -> IssuedTokens:
+        token, row = _new_refresh(user_id, None, datetime.utcnow())
+        session.add(row)
+        version = _token_version(session, user_id)
+        session.commit()
+        return IssuedTokens(user_id, token, version)
+
+    async def rotate(self, token: str) -> IssuedTokens:
+        """Spend a refresh token for the next token of its family"""
+        token_id, _, secret = token.partition(".")
+        return await self._run_sync(self._rotate, token_id, _secret_hash(secret))
+
+    @staticmethod
+    def _rotate(session: Session, token_id: str, secret_hash: str) -> IssuedTokens:
+        """A conditional UPDATE spends the token, of two concurrent uses one
+        matches nothing and is treated as a replay of a stolen token"""
+        now = datetime.utcnow()
+        spent = session.execute(
+            update(RefreshToken)
+            .where(
+                RefreshToken.id == token_id,
+                RefreshToken.secret_hash == secret_hash,
+                RefreshToken.used_at.is_(None),
+                RefreshToken.revoked_at.is_(None),
+                RefreshToken.expires_at > now,
+            )
+            .values(used_at=now)
+            .returning(RefreshToken.user_id, RefreshToken.family_id)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if spent is None:
+            session.rollback()
+            family_id = session.scalar(
+                select(RefreshToken.family_id).where(
+                    RefreshToken.id == token_id,
+                    RefreshToken.secret_hash == secret_hash,
+                    RefreshToken.used_at.is_not(None),
+                    RefreshToken.revoked_at.is_(None),
+                )
+            )
+            if family_id is not None:
+                _revoke_refresh(session, RefreshToken.family_id == family_id, now)
+                session.commit()
+                refresh_reused.inc()
+                log.warning("Refresh token %s reused, family revoked", token_id)
+            raise InvalidRefreshToken
+        token, row = _new_refresh(spent.user_id, spent.family_id, now)
+        session.add(row)
+        version = _token_version(session, spent.user_id)
+        session.commit()
+        return IssuedTokens(spent.user_id, token, version)
+
+    async def revoke_access(
+        self, claims: AccessClaims, refresh_token: str | None = None
+    ) -> TokenRevocation:
+        """Logout: the access token and the family of `refresh_token`"""
+        row = TokenRevocation(
+            user_id=claims.user_id,
+            jti=claims.jti,
+            expires_at=_utc(claims.expires_at) + CLOCK_SKEW,
+        )
+        self.session.add(row)
+        if refresh_token is not None:
+            family = (
+                select(RefreshToken.family_id)
+                .where(
+                    RefreshToken.id == refresh_token.partition(".")[0],
+                    RefreshToken.user_id == claims.user_id,
+                )
+                .scalar_subquery()
+            )
+            await self._run_sync(
+                _revoke_refresh, RefreshToken.family_id == family, datetime.utcnow()
+            )
+        await self._commit()
+        return row
+
+    async def revoke_user(self, user_id: int) -> TokenRevocation:
+        """Every token of the user issued so far.
+
+        Bumps the user's token version instead of comparing issue times,
+        which come from the clocks of whichever workers issued the tokens.
+        A login racing this reads the old version and is revoked with it.
+        """
+        return await self._run_sync(self._revoke_user, user_id)
+
+    @staticmethod
+    def _revoke_user(session: Session, user_id: int) -> TokenRevocation:
+        now = datetime.utcnow()
+        version = session.scalar(
+            update(User)
+            .where(User.id == user_id)
+            .values(token_version=User.token_version + 1)
+            .returning(User.token_version)
+            .execution_options(synchronize_session=False)
+        )
+        row = TokenRevocation(
+            user_id=user_id,
+            token_version=version,
+            expires_at=now
+            + timedelta(minutes=settings.access_token_expire_minutes)
+            + CLOCK_SKEW,
+        )
+        session.add(row)
+        _revoke_refresh(session, RefreshToken.user_id == user_id, now)
+        session.commit()
+        return row
+
+    async def revocations(self, after: int, missing: list[int]) -> list[Row]:
+        """Rows of tokens not expired yet with an id above `after` or in
+        `missing`, plain rows: a worker starting may load a lot of them"""
+        statement = select(
+            TokenRevocation.id,
+            TokenRevocation.user_id,
+            TokenRevocation.jti,
+            TokenRevocation.token_version,
+            TokenRevocation.expires_at,
+        ).where(
+            TokenRevocation.expires_at > datetime.utcnow(),
+            or_(TokenRevocation.id > after, TokenRevocation.id.in_(missing)),
+        )
+        return await self._run_sync(lambda s: s.execute(statement).all())
+
+    async def purge(self) -> None:
+        """Rows whose tokens expired, they can't be presented anymore"""
+        now = datetime.utcnow()
+        await self._execute(delete(TokenRevocation).where(TokenRevocation.expires_at <= now))
+        await self._execute(delete(RefreshToken).where(RefreshToken.expires_at <= now))
+        await self._commit()
+
+
+def _revoke_refresh(session: Session, condition, now: datetime) -> None:
+    session.execute(
+        update(RefreshToken)
+        .where(condition, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=now)
+        .execution_options(synchronize_session=False)
+    )
@@ -0,0 +1,126 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+from sqlalchemy import Row
+from src.auth.jwt import AccessClaims
+from src.auth.model import TokenRevocation
+from src.auth.repository import TokenRepository
+from src.data.sql import SQLManager
+from src.monitoring.metrics import Gauge
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+
+log = get_logger("Revocations")
+
+# ids skipped by the sync are asked for again this long: an insert still
+# uncommitted when a later one was read, or one that rolled back
+GAP_TIMEOUT = 10
+PURGE_INTERVAL = 600
+
+
+def _timestamp(value: datetime) -> float:
+    return value.replace(tzinfo=timezone.utc).timestamp()
+
+
+class RevocationList:
+    """Revoked access tokens, checked on every request without the database.
+
+    Token ids and per-user token versions, each dropped once the tokens it
+    revokes have expired: with short-lived access tokens that is only
+    what was revoked in the last ACCESS_TOKEN_EXPIRE_MINUTES, a few
+    entries, a dict lookup per request. Revocations made by this worker
+    apply at once, those of the others after the next sync.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        # jti -> expiry
+        self._tokens: dict[str, float] = {}
+        # user id -> (tokens of lower versions are revoked, expiry)
+        self._users: dict[int, tuple[int, float]] = {}
+        self._next_expiry = float("inf")
+        self._last_id = 0
+        # skipped id -> monotonic time it stops being asked for
+        self._gaps: dict[int, float] = {}
+        self._purged = 0.0
+        self._sync: asyncio.Task | None = None
+        Gauge(
+            "auth_revocations",
+            "Revoked tokens and users kept in memory",
+            lambda: len(self._tokens) + len(self._users),
+        )
+
+    def revoked(self, claims: AccessClaims) -> bool:
+        if claims.jti in self._tokens:
+            return True
+        user = self._users.get(claims.user_id)
+        return user is not None and claims.version < user[0]
+
+    def add(self, revocation: TokenRevocation | Row) -> None:
+        expires = _timestamp(revocation.expires_at)
+        self._next_expiry = min(self._next_expiry, expires)
+        if revocation.jti is not None:
+            self._tokens[revocation.jti] = expires
+            return
+        version = revocation.token_version
+        user = self._users.get(revocation.user_id)
+        if user is None or user[0] < version:
+            self._users[revocation.user_id] = (version, expires)
+
+    def expire(self, now: float) -> None:
+        if now < self._next_expiry:
+            return
+        self._tokens = {jti: exp for jti, exp in self._tokens.items() if exp > now}
+        self._users = {
+            user_id: entry for user_id, entry in self._users.items() if entry[1] > now
+        }
+        self._next_expiry = min(
+            [*self._tokens.values(), *(entry[1] for entry in self._users.values())],
+            default=float("inf"),
+        )
+
+    async def sync(self, db: SQLManager) -> int:
+        """Rows added since the last sync, all unexpired ones the first time"""
+        async with db.session() as session:
+            repository = TokenRepository(session)
+            rows = await repository.revocations(self._last_id, list(self._gaps))
+            if time.monotonic() - self._purged > PURGE_INTERVAL:
+                await repository.purge()
+                self._purged = time.monotonic()
+        now = time.monotonic()
+        ids = set()
+        for row in rows:
+            self.add(row)
+            ids.add(row.id)
+            self._gaps.pop(row.id, None)
+        latest = max(ids, default=0)
+        if self._last_id and latest > self._last_id:
+            for gap in range(self._last_id + 1, latest):
+                if gap not in ids:
+                    self._gaps[gap] = now + GAP_TIMEOUT
+        self._last_id = max(self._last_id, latest)
+        self._gaps = {gap: until for gap, until in self._gaps.items() if until > now}
+        self.expire(time.time())
+        return len(rows)
+
+    async def _run(self, db: SQLManager) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.sync(db)
+            except Exception as e:
+                log.warning("Revocation sync failed: %s", e)
+
+    async def start(self, db: SQLManager) -> None:
+        await self.sync(db)
+        self._sync = asyncio.create_task(self._run(db))
+
+    async def stop(self) -> None:
+        if self._sync is not None:
+            self._sync.cancel()
+            await asyncio.gather(self._sync, return_exceptions=True)
+            self._sync = None
+
+
+revocations = RevocationList(settings.revocation_sync_interval)
@@ -1,35 +1,120 @@
+import time
+from typing import AsyncIterator
 from fastapi import Depends, HTTPException, status
-from src.auth.jwt import decode_jwt, oauth2_scheme
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.auth.cache import token_cache, user_cache
+from src.auth.exceptions import CredentialException
+from src.auth.jwt import AccessClaims, decode_jwt, oauth2_scheme
+from src.auth.repository import TokenRepository
+from src.auth.revocation import revocations
 from src.data.sql import SQLManager
-from src.user.domain import UserDto
+from src.monitoring.profiling import span
+from src.user.domain import UserDto, UserRole
 from src.user.repository import UserRepository
 from src.hackathon.repository import HackathonRepository
-from src.utils.logging import get_logger
+from src.matching.repository import MatchingRepository
+from src.search.repository import SearchRepository
+from src.team.repository import TeamRepository
+from src.utils.logging import get_logger, user_id as current_user_id
 
 
-async def get_db() -> SQLManager:
-    """Get the database connection"""
+async def get_sql_manager() -> SQLManager:
+    """Connected and schema-checked by the app lifespan, never per request"""
     return SQLManager(get_logger("db"))
 
 
-async def get_user_repository(db: SQLManager = Depends(get_db)) -> UserRepository:
-    return UserRepository(db)
+async def get_db(
+    db: SQLManager = Depends(get_sql_manager),
+) -> AsyncIterator[Session | AsyncSession]:
+    """Get a database session scoped to the request"""
+    async with db.session() as session:
+        yield session
+
+
+async def get_user_repository(
+    session: Session | AsyncSession = Depends(get_db),
+) -> UserRepository:
+    return UserRepository(session)
 
 
 async def get_hackathon_repository(
-    db: SQLManager = Depends(get_db),
+    session: Session | AsyncSession = Depends(get_db),
 ) -> HackathonRepository:
-    return HackathonRepository(db)
+    return HackathonRepository(session)
 
 
-async def get_current_user(
+async def get_search_repository(
+    session: Session | AsyncSession = Depends(get_db),
+) -> SearchRepository:
+    return SearchRepository(session)
+
+
+async def get_matching_repository(
+    session: Session | AsyncSession = Depends(get_db),
+) -> MatchingRepository:
+    return MatchingRepository(session)
+
+
+async def get_team_repository(
+    session: Session | AsyncSession = Depends(get_db),
+) -> TeamRepository:
+    return TeamRepository(session)
+
+
+async def get_token_repository(
+    session: Session | AsyncSession = Depends(get_db),
+) -> TokenRepository:
+    return TokenRepository(session)
+
+
+async def get_access_claims(
     access_token: str | None = Depends(oauth2_scheme),
-    user_repository: UserRepository = Depends(get_user_repository),
-) -> UserDto | None:
+) -> AccessClaims:
+    """Verified claims of an unrevoked token, both checks stay in memory"""
     if not access_token:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated (current_user)",
         )
-    user_id = decode_jwt(access_token)
-    return UserDto.model_validate(user_repository.get(user_id=user_id))
+    claims = token_cache.get(access_token)
+    if claims is None:
+        with span("jwt"):
+            claims = decode_jwt(access_token)
+        token_cache.set(access_token, claims, ttl=claims.expires_at - time.time())
+    if revocations.revoked(claims):
+        raise CredentialException
+    return claims
+
+
+async def get_current_user(
+    claims: AccessClaims = Depends(get_access_claims),
+    db: SQLManager = Depends(get_sql_manager),
+) -> UserDto | None:
+    """Resolve the token owner, served from memory unless the caches miss.
+
+    Requests missing the cache for one user at once (a client's burst
+    after the entry expired) share a single query.
+    """
+    user_id = claims.user_id
+    current_user_id.set(user_id)
+
+    async def load() -> UserDto:
+        async with db.session() as session:
+            user_db = await UserRepository(session).get(user_id=user_id)
+        if user_db is None:
+            raise CredentialException
+        return UserDto.model_validate(user_db)
+
+    return await user_cache.get_or_load(user_id, load)
+
+
+async def get_current_admin(
+    current_user: UserDto = Depends(get_current_user),
+) -> UserDto:
+    if current_user.internal_role != UserRole.admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Not enough permissions",
+        )
+    return current_user
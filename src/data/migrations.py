@@ -0,0 +1,64 @@
+import os
+from sqlalchemy import Connection, inspect
+
+
+ALEMBIC_INI = os.path.join(os.path.dirname(__file__), "..", "..", "alembic.ini")
+
+
+class SchemaOutdated(RuntimeError):
+    pass
+
+
+def _config(conn: Connection | None = None):
+    # alembic is only needed at startup, keep it out of the import graph
+    from alembic.config import Config
+
+    config = Config(os.path.normpath(ALEMBIC_INI))
+    if conn is not None:
+        config.attributes["connection"] = conn
+    return config
+
+
+def heads() -> set[str]:
+    from alembic.script import ScriptDirectory
+
+    return set(ScriptDirectory.from_config(_config()).get_heads())
+
+
+def current(conn: Connection) -> set[str]:
+    from alembic.runtime.migration import MigrationContext
+
+    return set(MigrationContext.configure(conn).get_current_heads())
+
+
+def check(conn: Connection) -> None:
+    """Refuse to serve a database the code's migrations don't match"""
+    expected, actual = heads(), current(conn)
+    if expected != actual:
+        revision = sorted(actual)
+        if not actual and inspect(conn).has_table("users"):
+            # upgrading adopts the tables, see migration 0001
+            revision = "no revision (tables made by create_all)"
+        raise SchemaOutdated(
+            f"Database schema is at {revision or 'no revision'}, "
+            f"code expects {sorted(expected)}: run `alembic upgrade head`"
+        )
+
+
+def upgrade(conn: Connection) -> None:
+    from alembic import command
+
+    command.upgrade(_config(conn), "head")
+
+
+def upgrade_database() -> None:
+    """Apply pending migrations over a throwaway connection (server supervisor)"""
+    from sqlalchemy import create_engine, pool
+    from src.data.sql import database_url
+
+    engine = create_engine(database_url(is_async=False), poolclass=pool.NullPool)
+    try:
+        with engine.begin() as conn:
+            upgrade(conn)
+    finally:
+        engine.dispose()
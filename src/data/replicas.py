@@ -0,0 +1,244 @@
+import asyncio
+import hashlib
+import hmac
+import itertools
+import time
+from contextvars import ContextVar
+from sqlalchemy import Connection, Engine, event
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import cookie_parser
+from src.monitoring.metrics import Counter
+from src.utils.cache import TTLCache
+from src.utils.logging import get_logger, user_id
+from src.utils.settings import settings
+
+
+routed_statements = Counter(
+    "db_routed_statements_total", "Statements of read-only methods per target"
+)
+
+log = get_logger("replicas")
+
+# users who committed a write recently, their reads stay on the primary
+recent_writers = TTLCache("replica_sticky", 100_000, settings.db_replica_sticky_seconds)
+
+STICKY_COOKIE = "db_primary_until"
+
+
+class Stickiness:
+    """Primary reads of the current request, a mutable object so commits
+    in threadpool sessions (a copied context) can mark it"""
+
+    __slots__ = ("until", "wrote")
+
+    def __init__(self, until: float) -> None:
+        self.until = until
+        self.wrote = False
+
+
+sticky: ContextVar[Stickiness | None] = ContextVar("replica_sticky", default=None)
+
+# 0 when the replica has replayed everything it received (an idle primary
+# leaves pg_last_xact_replay_timestamp behind), NULL on a non-replica
+POSTGRES_LAG = """
+SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0) END
+"""
+
+
+def replication_lag(conn: Connection) -> float:
+    if conn.dialect.name != "postgresql":
+        conn.exec_driver_sql("SELECT 1")
+        return 0.0
+    return float(conn.exec_driver_sql(POSTGRES_LAG).scalar() or 0)
+
+
+class Replica:
+    def __init__(self, engine: Engine, async_engine: AsyncEngine | None = None) -> None:
+        self.engine = engine
+        self.async_engine = async_engine
+        self.healthy = True
+        self.lag = 0.0
+
+    @property
+    def name(self) -> str:
+        return self.engine.url.render_as_string(hide_password=True)
+
+    async def check(self) -> None:
+        try:
+            if self.async_engine is not None:
+                async with self.async_engine.connect() as conn:
+                    lag = await conn.run_sync(replication_lag)
+            else:
+
+                def measure() -> float:
+                    with self.engine.connect() as conn:
+                        return replication_lag(conn)
+
+                lag = await run_in_threadpool(measure)
+        except Exception as e:
+            self.mark(False, f"check failed: {e}")
+            return
+        self.lag = lag
+        self.mark(lag <= settings.db_replica_max_lag, f"lag {lag:.1f}s")
+
+    def mark(self, healthy: bool, reason: str) -> None:
+        if healthy != self.healthy:
+            level = log.info if healthy else log.warning
+            level("Replica %s %s: %s", self.name, "up" if healthy else "down", reason)
+        self.healthy = healthy
+
+
+class ReplicaSet:
+    """Read replicas handed out round-robin, unhealthy ones are skipped"""
+
+    def __init__(self, replicas: list[Replica]) -> None:
+        self.replicas = replicas
+        self._counter = itertools.count()
+        self._checks: asyncio.Task | None = None
+
+    def __bool__(self) -> bool:
+        return bool(self.replicas)
+
+    @property
+    def healthy(self) -> list[Replica]:
+        return [replica for replica in self.replicas if replica.healthy]
+
+    def next(self) -> Replica | None:
+        healthy = self.healthy
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self) -> None:
+        await asyncio.gather(
+            *(
+                asyncio.wait_for(replica.check(), settings.db_replica_check_interval)
+                for replica in self.replicas
+            ),
+            return_exceptions=True,
+        )
+
+    async def _run_checks(self) -> None:
+        while True:
+            await self.check()
+            await asyncio.sleep(settings.db_replica_check_interval)
+
+    def start(self) -> None:
+        if self.replicas and self._checks is None:
+            self._checks = asyncio.create_task(self._run_checks())
+
+    async def stop(self) -> None:
+        if self._checks is not None:
+            self._checks.cancel()
+            await asyncio.gather(self._checks, return_exceptions=True)
+            self._checks = None
+
+
+def _sign(until: str) -> str:
+    key = settings.secret_key.encode()
+    return hmac.new(key, until.encode(), hashlib.sha256).hexdigest()[:32]
+
+
+def _cookie_until(scope) -> float:
+    """Expiry of a valid stickiness cookie, 0 without one"""
+    header = dict(scope["headers"]).get(b"cookie")
+    if header is None:
+        return 0.0
+    until, _, signature = cookie_parser(header.decode("latin-1")).get(
+        STICKY_COOKIE, ""
+    ).rpartition(".")
+    if not hmac.compare_digest(signature, _sign(until)):
+        return 0.0
+    try:
+        return float(until)
+    except ValueError:
+        return 0.0
+
+
+class StickyPrimaryMiddleware:
+    """Read-your-writes across workers.
+
+    recent_writers only covers the worker that served the write. After a
+    request commits one, a signed cookie sends the client's requests to
+    the primary on every worker until DB_REPLICA_STICKY_SECONDS pass.
+    Clients that drop cookies keep the per-worker guarantee only.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        state = Stickiness(_cookie_until(scope))
+        token = sticky.set(state)
+
+        async def send_with_cookie(message) -> None:
+            if message["type"] == "http.response.start" and state.wrote:
+                seconds = settings.db_replica_sticky_seconds
+                until = f"{time.time() + seconds:.3f}"
+                cookie = (
+                    f"{STICKY_COOKIE}={until}.{_sign(until)}; Max-Age={int(seconds) + 1}; "
+                    "Path=/; HttpOnly; SameSite=Lax"
+                )
+                message.setdefault("headers", []).append((b"set-cookie", cookie.encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_cookie)
+        finally:
+            sticky.reset(token)
+
+
+def _pinned_to_primary() -> bool:
+    state = sticky.get()
+    if state is not None and state.until > time.time():
+        return True
+    user = user_id.get()
+    return user is not None and bool(recent_writers.get(user))
+
+
+class RoutingSession(Session):
+    """Sends reads of `read_only` repository methods to a replica.
+
+    A session sticks to one replica and goes back to the primary for good
+    once it wrote. Clients who committed within DB_REPLICA_STICKY_SECONDS
+    read from the primary too (StickyPrimaryMiddleware), so their next
+    request sees their own writes even when the replicas lag.
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        primary = super().get_bind(mapper, clause=clause, **kwargs)
+        if self._flushing or getattr(clause, "is_dml", False):
+            self.info["wrote"] = True
+        replicas: ReplicaSet | None = self.info.get("replicas")
+        if not replicas or not self.info.get("read_only"):
+            return primary
+        if self.info.get("wrote") or _pinned_to_primary():
+            target = None
+        else:
+            target = self.info.get("replica") or replicas.next()
+            self.info["replica"] = target
+        if clause is not None:
+            routed_statements.inc(target="primary" if target is None else "replica")
+        return primary if target is None else target.engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session: Session) -> None:
+    if not session.info.get("wrote"):
+        return
+    if user_id.get() is not None:
+        recent_writers.set(user_id.get(), True)
+    state = sticky.get()
+    if state is not None:
+        state.wrote = True
@@ -1,24 +1,157 @@
 import abc
+import functools
+import inspect
+from typing import Any, AsyncIterator, Callable
 from pydantic import BaseModel
+from sqlalchemy import Executable, Insert, Table, insert
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.exc import InterfaceError, OperationalError
+from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
 
 
-class AbstractRepository(abc.ABC):
+def insert_ignore(session: Session, table: Table, *conflict_columns: str) -> Insert:
+    """INSERT that silently skips rows clashing on a unique constraint"""
+    dialect = session.get_bind().dialect.name
+    if dialect == "postgresql":
+        return postgresql.insert(table).on_conflict_do_nothing(
+            index_elements=conflict_columns
+        )
+    if dialect == "sqlite":
+        return sqlite.insert(table).on_conflict_do_nothing(
+            index_elements=conflict_columns
+        )
+    return insert(table)
+
+
+def read_only(method: Callable | None = None, *, retry_missing: bool = False):
+    """Let the statements of a repository method run on a read replica.
+
+    A replica that fails mid-call is marked down and the call repeats on
+    the primary. With `retry_missing` a None result from a replica is
+    double-checked on the primary, for lookups of rows that may have just
+    been written (signup, then login) and not replicated yet.
+    Async generators (exports) stay on their replica, they can't be repeated.
+    """
+    if method is None:
+        return functools.partial(read_only, retry_missing=retry_missing)
+
+    if inspect.isasyncgenfunction(method):
+
+        @functools.wraps(method)
+        async def stream(self: "BaseRepository", *args, **kwargs):
+            previous = self.session.info.get("read_only", False)
+            self.session.info["read_only"] = True
+            try:
+                async for item in method(self, *args, **kwargs):
+                    yield item
+            finally:
+                self.session.info["read_only"] = previous
+
+        return stream
+
+    @functools.wraps(method)
+    async def wrapper(self: "BaseRepository", *args, **kwargs):
+        info = self.session.info
+        if not info.get("replicas") or info.get("read_only"):
+            return await method(self, *args, **kwargs)
+        info["read_only"] = True
+        try:
+            result = await method(self, *args, **kwargs)
+        except (OperationalError, InterfaceError) as e:
+            replica = info.pop("replica", None)
+            if replica is None:
+                raise
+            replica.mark(False, f"query failed: {e.orig}")
+            await self._run_sync(lambda s: s.rollback())
+        else:
+            if result is not None or not retry_missing or info.get("replica") is None:
+                return result
+        finally:
+            info["read_only"] = False
+        return await method(self, *args, **kwargs)
+
+    return wrapper
+
+
+class BaseRepository:
+    """Runs statements on a sync or async session without blocking the loop"""
+
+    def __init__(self, session: Session | AsyncSession) -> None:
+        self.session = session
+
+    @property
+    def dialect(self) -> str:
+        return self.session.get_bind().dialect.name
+
+    async def _run_sync(self, fn: Callable[..., Any], *args) -> Any:
+        """Run fn(sync_session, *args) without blocking the event loop.
+
+        AsyncSession runs it on the async driver, a plain Session is
+        offloaded to the threadpool.
+        """
+        if isinstance(self.session, AsyncSession):
+            return await self.session.run_sync(fn, *args)
+        return await run_in_threadpool(fn, self.session, *args)
+
+    async def _execute(self, statement: Executable) -> Any:
+        return await self._run_sync(lambda s: s.execute(statement))
+
+    async def _first(self, statement: Executable) -> Any:
+        return await self._run_sync(lambda s: s.scalars(statement).first())
+
+    async def _all(self, statement: Executable) -> list:
+        return await self._run_sync(lambda s: s.scalars(statement).all())
+
+    async def _stream(
+        self, statement: Executable, batch_size: int
+    ) -> AsyncIterator[list]:
+        """Results in lists of `batch_size` from a server-side cursor, the
+        full result is never in memory"""
+        statement = statement.execution_options(yield_per=batch_size)
+        if isinstance(self.session, AsyncSession):
+            result = await self.session.stream_scalars(statement)
+            async for partition in result.partitions():
+                yield partition
+            return
+        result = await run_in_threadpool(self.session.scalars, statement)
+        partitions = result.partitions()
+        while True:
+            partition = await run_in_threadpool(next, partitions, None)
+            if partition is None:
+                return
+            yield partition
+
+    async def _commit(self) -> None:
+        await self._run_sync(lambda s: s.commit())
+
+    async def release(self) -> None:
+        """End the transaction and give the connection back to the pool.
+
+        Loaded objects stay usable (sessions don't expire on commit), call
+        it before slow non-database work inside a request.
+        """
+        await self._commit()
+
+
+class AbstractRepository(BaseRepository, abc.ABC):
     @abc.abstractmethod
-    def add(self, obj: BaseModel) -> BaseModel:
+    async def add(self, obj: BaseModel) -> BaseModel:
         raise NotImplementedError
 
-    @abc.abstractclassmethod
-    def get(self, **kwargs) -> BaseModel:
+    @abc.abstractmethod
+    async def get(self, **kwargs) -> BaseModel:
         raise NotImplementedError
 
-    @abc.abstractclassmethod
-    def delete(self, obj: BaseModel) -> None:
+    @abc.abstractmethod
+    async def delete(self, obj: BaseModel) -> None:
         raise NotImplementedError
 
-    @abc.abstractclassmethod
-    def update(self, obj: BaseModel) -> BaseModel:
+    @abc.abstractmethod
+    async def update(self, obj: BaseModel) -> BaseModel:
         raise NotImplementedError
 
-    @abc.abstractclassmethod
-    def get_all(self, **kwargs) -> list:
+    @abc.abstractmethod
+    async def get_all(self, **kwargs) -> list:
         raise NotImplementedError
@@ -1,34 +1,106 @@
-from time import sleep
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import create_engine
+import asyncio
+import time
+from contextlib import AsyncExitStack, ExitStack, asynccontextmanager, nullcontext
+from typing import AsyncIterator, Callable
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy import Connection, create_engine, URL, make_url
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from sqlalchemy.exc import OperationalError as sqlalchemyOpError
-from psycopg2 import OperationalError as psycopg2OpError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from starlette.concurrency import run_in_threadpool
 from logging import Logger
-from . import Base
+from . import Base, migrations
+from .replicas import Replica, ReplicaSet, RoutingSession
+from src.monitoring.metrics import Gauge, Histogram
+from src.monitoring.profiling import instrument_engine
 from src.utils.settings import settings
 from src.utils.logging import get_logger
 
 
+SYNC_DRIVERS = {"postgresql": "postgresql+psycopg2", "sqlite": "sqlite"}
+ASYNC_DRIVERS = {"postgresql": "postgresql+asyncpg", "sqlite": "sqlite+aiosqlite"}
+
+checkout_wait = Histogram(
+    "db_pool_checkout_wait_seconds", "Time spent waiting for a pooled connection"
+)
+session_wait = Histogram(
+    "db_session_wait_seconds", "Time a request waited for a session (sync mode)"
+)
+
+
+class TimedQueuePool(QueuePool):
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            checkout_wait.observe(time.perf_counter() - start)
+
+
+class TimedAsyncQueuePool(AsyncAdaptedQueuePool, TimedQueuePool):
+    pass
+
+
+def pool_limits() -> tuple[int, int]:
+    """(pool_size, max_overflow) of this worker's pool.
+
+    With DB_CONNECTION_BUDGET set the budget is split evenly between the
+    WEB_WORKERS processes and nothing overflows, all workers together
+    never open more connections than the database was sized for.
+    """
+    if settings.db_connection_budget is None:
+        return settings.db_pool_size, settings.db_max_overflow
+    return max(1, settings.db_connection_budget // settings.web_workers), 0
+
+
+def database_url(is_async: bool) -> URL:
+    """Database url with the driver matching the selected (sync/async) mode"""
+    if settings.database_url:
+        url = make_url(settings.database_url)
+    else:
+        url = URL.create(
+            "postgresql",
+            username=settings.postgres_user,
+            password=settings.postgres_password,
+            host=settings.postgres_host,
+            port=settings.postgres_port_number,
+            database=settings.postgres_db,
+        )
+    return with_driver(url, is_async)
+
+
+def replica_urls(is_async: bool) -> list[URL]:
+    return [
+        with_driver(make_url(url.strip()), is_async)
+        for url in settings.database_replica_urls.split(",")
+        if url.strip()
+    ]
+
+
+def with_driver(url: URL, is_async: bool) -> URL:
+    drivers = ASYNC_DRIVERS if is_async else SYNC_DRIVERS
+    return url.set(drivername=drivers[url.get_backend_name()])
+
+
 class SQLManager:
     instance = None
 
     def __init__(self, log: Logger = get_logger("__sql_manager__")):
-        self.pg_user = settings.postgres_user
-        self.pg_pass = settings.postgres_password
-        self.pg_host = settings.postgres_host
-        self.pg_port = settings.postgres_port_number
-        self.pg_db = settings.postgres_db
+        if getattr(self, "initialized", False):
+            return
+        self.is_async = settings.db_async
         self.log = log
-        connected = False
-        while not connected:
-            try:
-                self._connect()
-            except (sqlalchemyOpError, psycopg2OpError):
-                self.log.warning("Database connection failed, retrying...")
-                sleep(2)
-            else:
-                connected = True
-        self._update_db()
+        self.ready = False
+        self._ready_lock = asyncio.Lock()
+        # Sync sessions block a threadpool worker on checkout while holders
+        # wait for a worker to commit, never open more than the pool serves
+        self._session_slots = (
+            nullcontext()
+            if self.is_async
+            else asyncio.Semaphore(sum(pool_limits()))
+        )
+        self._connect()
+        self.initialized = True
 
     def __new__(cls, *args, **kwargs):
         """Singleton pattern"""
@@ -36,26 +108,173 @@ class SQLManager:
             cls.instance = super(SQLManager, cls).__new__(cls)
         return cls.instance
 
-    def __del__(self):
-        """Close the database connection when the object is destroyed"""
-        self._close()
+    @property
+    def url(self) -> URL:
+        return database_url(self.is_async)
 
     def _connect(self) -> None:
-        """Connect to the postgresql database"""
-        self.engine = create_engine(
-            f"postgresql+psycopg2://{self.pg_user}:{self.pg_pass}@{self.pg_host}:{self.pg_port}\
-/{self.pg_db}",
-            pool_pre_ping=True,
+        """Create the engines and the session factory, no connection is opened yet"""
+        self.replicas = ReplicaSet(
+            [self._replica(url) for url in replica_urls(self.is_async)]
         )
+        info = {"replicas": self.replicas}
+        if self.is_async:
+            self.async_engine = create_async_engine(
+                self.url, poolclass=TimedAsyncQueuePool, **self._pool_options()
+            )
+            self.engine = self.async_engine.sync_engine
+            self.session_factory = async_sessionmaker(
+                self.async_engine,
+                sync_session_class=RoutingSession,
+                expire_on_commit=False,
+                info=info,
+            )
+        else:
+            self.engine = create_engine(
+                self.url, poolclass=TimedQueuePool, **self._pool_options()
+            )
+            self.session_factory = sessionmaker(
+                bind=self.engine, class_=RoutingSession, expire_on_commit=False, info=info
+            )
         Base.metadata.bind = self.engine
-        db_session = sessionmaker(bind=self.engine)
-        self.session = db_session()
+        instrument_engine(self.engine)
+        self._register_pool_metrics()
+
+    def _replica(self, url: URL) -> Replica:
+        """Replicas get a pool of the primary's size each"""
+        if self.is_async:
+            async_engine = create_async_engine(
+                url, poolclass=TimedAsyncQueuePool, **self._pool_options()
+            )
+            replica = Replica(async_engine.sync_engine, async_engine)
+        else:
+            replica = Replica(
+                create_engine(url, poolclass=TimedQueuePool, **self._pool_options())
+            )
+        instrument_engine(replica.engine)
+        return replica
+
+    def _pool_options(self) -> dict:
+        return dict(
+            pool_pre_ping=True,
+            pool_size=pool_limits()[0],
+            max_overflow=pool_limits()[1],
+            pool_recycle=settings.db_pool_recycle,
+            pool_timeout=settings.db_pool_timeout,
+        )
+
+    def _register_pool_metrics(self) -> None:
+        pool = self.engine.pool
+        if not isinstance(pool, QueuePool):
+            return
+        Gauge("db_pool_size", "Configured pool size", pool.size)
+        Gauge("db_pool_checked_out", "Connections in use", pool.checkedout)
+        Gauge(
+            "db_pool_overflow",
+            "Connections opened above pool size",
+            lambda: max(pool.overflow(), 0),
+        )
+        Gauge("db_pool_checked_in", "Idle connections in the pool", pool.checkedin)
+        Gauge(
+            "db_replicas_healthy",
+            "Read replicas currently receiving reads",
+            lambda: len(self.replicas.healthy),
+        )
 
-    def _close(self) -> None:
-        """Closes the database connection"""
-        self.session.close_all()
+    async def prepare(self) -> None:
+        """Wait for the database, then create or check the schema, once per process"""
+        if self.ready:
+            return
+        async with self._ready_lock:
+            deadline = time.monotonic() + settings.db_connect_timeout
+            delay = 0.1
+            while not self.ready:
+                try:
+                    await self._run_in_transaction(self._prepare_schema)
+                except (sqlalchemyOpError, OSError):
+                    if time.monotonic() + delay > deadline:
+                        raise
+                    self.log.warning("Database connection failed, retrying...")
+                    await asyncio.sleep(delay)
+                    delay = min(delay * 2, 2)
+                else:
+                    self.ready = True
+
+    async def _run_in_transaction(self, fn: Callable[[Connection], None]) -> None:
+        if self.is_async:
+            async with self.async_engine.begin() as conn:
+                await conn.run_sync(fn)
+        else:
+
+            def run() -> None:
+                with self.engine.begin() as conn:
+                    fn(conn)
+
+            await run_in_threadpool(run)
+
+    def _prepare_schema(self, conn: Connection) -> None:
+        if settings.db_schema == "create_all":
+            Base.metadata.create_all(conn)
+        elif settings.db_migrate_on_startup:
+            migrations.upgrade(conn)
+        else:
+            migrations.check(conn)
+
+    async def prefill(self, connections: int) -> None:
+        """Open pool connections ahead of the first requests"""
+        connections = min(connections, pool_limits()[0])
+        if connections <= 0:
+            return
+        if self.is_async:
+            async with AsyncExitStack() as stack:
+                opened = [
+                    await stack.enter_async_context(self.async_engine.connect())
+                    for _ in range(connections)
+                ]
+                for conn in opened:
+                    await conn.exec_driver_sql("SELECT 1")
+        else:
+
+            def fill() -> None:
+                with ExitStack() as stack:
+                    for _ in range(connections):
+                        stack.enter_context(self.engine.connect()).exec_driver_sql(
+                            "SELECT 1"
+                        )
+
+            await run_in_threadpool(fill)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[Session | AsyncSession]:
+        """New session bound to the engine, one per request"""
+        start = time.perf_counter()
+        async with self._session_slots:
+            if not self.is_async:
+                session_wait.observe(time.perf_counter() - start)
+            session = self.session_factory()
+            try:
+                yield session
+            except Exception:
+                # Never hand a failed transaction back to the pool
+                if isinstance(session, AsyncSession):
+                    await session.rollback()
+                else:
+                    await run_in_threadpool(session.rollback)
+                raise
+            finally:
+                if isinstance(session, AsyncSession):
+                    await session.close()
+                else:
+                    await run_in_threadpool(session.close)
 
-    def _update_db(self) -> None:
-        """Create the database structure if it doesn't exist (update)"""
-        # Create the tables if they don't exist
-        Base.metadata.create_all(self.engine)
\ No newline at end of file
+    async def close(self) -> None:
+        """Close all pooled connections, the app lifespan calls it on shutdown"""
+        await self.replicas.stop()
+        if self.is_async:
+            await self.async_engine.dispose()
+            for replica in self.replicas.replicas:
+                await replica.async_engine.dispose()
+        else:
+            await run_in_threadpool(self.engine.dispose)
+            for replica in self.replicas.replicas:
+                await run_in_threadpool(replica.engine.dispose)
@@ -41,9 +41,10 @@ class HackathonCreate(HackathonBase):
     )
 
 
-class HackathonDto(BaseModel):
+class HackathonDto(HackathonBase):
     model_config = ConfigDict(from_attributes=True)
 
+    id: int = Field(...)
     tags: list[HackathonTagDto] = Field(
         ...,
         min_items=1,
@@ -53,3 +54,10 @@ class HackathonDto(BaseModel):
             {"id": 2, "tag": "Мобильная разработка"},
         ],
     )
+
+
+class HackathonPage(BaseModel):
+    items: list[HackathonDto] = Field(...)
+    next_cursor: Optional[str] = Field(
+        None, description="Pass as `cursor` to get the next page, null on the last one"
+    )
@@ -1,26 +1,183 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from src.data.dependencies import get_current_user, get_hackathon_repository
-from src.hackathon.domain import HackathonCreate
+import math
+from datetime import datetime
+from fastapi import (
+    APIRouter,
+    Depends,
+    Header,
+    HTTPException,
+    Query,
+    Request,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from src.data.dependencies import (
+    get_current_admin,
+    get_hackathon_repository,
+    get_sql_manager,
+)
+from src.data.sql import SQLManager
+from src.hackathon.domain import HackathonCreate, HackathonPage, PrizeType
+from src.hackathon.model import Hackathon
 from src.hackathon.repository import HackathonRepository
-from src.user.domain import UserDto, UserRole
+from src.user.domain import UserDto
+from src.monitoring.profiling import batched
+from src.utils.broadcast import broadcaster, event_stream_response
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
 from src.utils.logging import get_logger
+from src.utils.ndjson import ImportResult, RowError, iter_lines
+from src.utils.pagination import decode_cursor, encode_cursor
+from src.utils.response_cache import response_cache
+from src.utils.settings import settings
 
 
 router = APIRouter(prefix="/hackathons", tags=["hackathons"])
 
 log = get_logger("HackathonEndpoints")
 
+IMPORT_BATCH_SIZE = 1000
+EXPORT_COLUMNS = [
+    "id", "title", "registration_finish", "team_minimum_size",
+    "team_maximum_size", "prize_type", "money_prize", "tags",
+]
+
+
+@router.get("", response_model=HackathonPage, status_code=status.HTTP_200_OK)
+async def list_hackathons(
+    request: Request,
+    limit: int = Query(20, ge=1, le=100),
+    cursor: str | None = Query(None),
+    tag: str | None = Query(None, max_length=50),
+    prize_type: PrizeType | None = Query(None),
+    registration_open: bool | None = Query(None),
+    repository: HackathonRepository = Depends(get_hackathon_repository),
+) -> Response:
+    """Served from the response cache, 304 when If-None-Match is still current"""
+    key = await response_cache.key("hackathons", request)
+    cached = await response_cache.get(key)
+    if cached is not None:
+        return cached.response(request, settings.hackathon_cache_max_age)
+
+    after = None
+    if cursor is not None:
+        try:
+            finish, hackathon_id = decode_cursor(cursor)
+            after = (datetime.fromisoformat(finish), int(hackathon_id))
+        except (ValueError, TypeError):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor"
+            )
+    # one extra row tells whether there is a next page
+    hackathons = await repository.get_all(
+        limit=limit + 1,
+        after=after,
+        tag=tag,
+        prize_type=prize_type,
+        registration_open=registration_open,
+    )
+    page = hackathons[:limit]
+    next_cursor = None
+    if len(hackathons) > limit:
+        next_cursor = encode_cursor(page[-1].registration_finish, page[-1].id)
+    body = HackathonPage(items=page, next_cursor=next_cursor).model_dump_json()
+    ttl = _page_ttl(page, registration_open, next_cursor)
+    cached = await response_cache.set(key, body.encode(), ttl)
+    return cached.response(request, settings.hackathon_cache_max_age)
+
+
+def _page_ttl(
+    page: list[Hackathon], registration_open: bool | None, next_cursor: str | None
+) -> int | None:
+    """Seconds the page stays right without writes, None: no limit, 0: at once.
+
+    Open registration pages change when their first hackathon closes, the
+    hackathons closing meanwhile are appended after the last closed page.
+    """
+    if registration_open is True and page:
+        return math.ceil((page[0].registration_finish - datetime.now()).total_seconds())
+    if registration_open is False and next_cursor is None:
+        return 0
+    return None
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def hackathon_events(
+    last_event_id: str | None = Header(None),
+) -> StreamingResponse:
+    """Server-sent `created`, `updated` and `deleted` events, data is
+    {"ids": [...]} of the hackathons, read them from the list as usual"""
+    return event_stream_response(broadcaster, "hackathons", last_event_id)
+
 
 # TODO: какой сакральный смысл try except?
 @router.post("/create", response_model=int, status_code=status.HTTP_201_CREATED)
 async def create_hackathons(
     hackathons: list[HackathonCreate],
     repository: HackathonRepository = Depends(get_hackathon_repository),
-    current_user: UserDto = Depends(get_current_user),
+    current_user: UserDto = Depends(get_current_admin),
 ) -> int:
-    if current_user.internal_role != UserRole.admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Not enough permissions",
-        )
-    return repository.add(hackathons)
+    return await repository.add(hackathons)
+
+
+@router.post(
+    "/import", response_model=ImportResult, status_code=status.HTTP_201_CREATED
+)
+async def import_hackathons(
+    request: Request,
+    repository: HackathonRepository = Depends(get_hackathon_repository),
+    current_user: UserDto = Depends(get_current_admin),
+) -> ImportResult:
+    """Streamed NDJSON upload, one HackathonCreate per line, committed in batches.
+
+    A line over 64 KiB is refused with 413.
+    """
+    batched()
+    result = ImportResult()
+    batch: list[HackathonCreate] = []
+    async for line_no, line in iter_lines(request.stream()):
+        try:
+            batch.append(HackathonCreate.model_validate_json(line))
+        except ValidationError as e:
+            result.errors.append(RowError(line=line_no, error=str(e)))
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            result.imported += await repository.add(batch)
+            batch = []
+    if batch:
+        result.imported += await repository.add(batch)
+    return result
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_hackathons(
+    request: Request,
+    format: ExportFormat = Query("csv"),
+    db: SQLManager = Depends(get_sql_manager),
+    current_user: UserDto = Depends(get_current_admin),
+) -> StreamingResponse:
+    """Every hackathon with its tags, streamed"""
+    batched()
+
+    async def batches():
+        # own session, it has to outlive the endpoint while the body streams
+        async with db.session() as session:
+            async for hackathons in HackathonRepository(session).export(
+                EXPORT_BATCH_SIZE
+            ):
+                yield [_export_row(hackathon) for hackathon in hackathons]
+
+    return export_response(request, "hackathons", format, EXPORT_COLUMNS, batches())
+
+
+def _export_row(hackathon: Hackathon) -> dict:
+    return {
+        "id": hackathon.id,
+        "title": hackathon.title,
+        "registration_finish": hackathon.registration_finish.isoformat(),
+        "team_minimum_size": hackathon.team_minimum_size,
+        "team_maximum_size": hackathon.team_maximum_size,
+        "prize_type": hackathon.prize_type.value,
+        "money_prize": hackathon.money_prize,
+        "tags": [tag.tag for tag in hackathon.tags],
+    }
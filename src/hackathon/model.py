@@ -1,8 +1,18 @@
 from datetime import datetime
-from sqlalchemy import Integer, String, ForeignKey, Table, Column, DateTime, Enum
+from sqlalchemy import (
+    Integer,
+    String,
+    ForeignKey,
+    Table,
+    Column,
+    DateTime,
+    Enum,
+    Index,
+)
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.data import Base
 from src.hackathon.domain import PrizeType
+from src.search.sql import fts_index, trigram_index
 
 
 class Hackathon(Base):
@@ -20,12 +30,24 @@ class Hackathon(Base):
         "HackathonTag", secondary="hackathons_to_tags", back_populates="hackathons"
     )
 
+    __table_args__ = (
+        # keyset pagination order, optionally narrowed by prize type
+        Index("ix_hackathons_registration_finish_id", "registration_finish", "id"),
+        Index(
+            "ix_hackathons_prize_type_registration_finish_id",
+            "prize_type",
+            "registration_finish",
+            "id",
+        ),
+    )
+
 
 hackathons_to_tags = Table(
     "hackathons_to_tags",
     Base.metadata,
-    Column("hackathon_id", Integer, ForeignKey("hackathons.id")),
-    Column("tag_id", Integer, ForeignKey("hackathon_tags.id")),
+    Column("hackathon_id", Integer, ForeignKey("hackathons.id"), primary_key=True),
+    Column("tag_id", Integer, ForeignKey("hackathon_tags.id"), primary_key=True),
+    Index("ix_hackathons_to_tags_tag_id_hackathon_id", "tag_id", "hackathon_id"),
 )
 
 
@@ -33,8 +55,13 @@ class HackathonTag(Base):
     __tablename__ = "hackathon_tags"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    tag: Mapped[str] = mapped_column(String(50), nullable=False)
+    tag: Mapped[str] = mapped_column(String(50), nullable=False, unique=True)
 
     hackathons = relationship(
         "Hackathon", secondary="hackathons_to_tags", back_populates="tags"
     )
+
+
+fts_index("ix_hackathons_title_fts", Hackathon.title)
+trigram_index("ix_hackathons_title_trgm", Hackathon.title)
+trigram_index("ix_hackathon_tags_tag_trgm", HackathonTag.tag)
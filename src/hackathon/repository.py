@@ -1,62 +1,150 @@
-from src.data.repository import AbstractRepository
-from src.data.sql import SQLManager
+from datetime import datetime
+from typing import AsyncIterator
+from sqlalchemy import select, delete, insert, tuple_
+from sqlalchemy.orm import Session, selectinload
+from src.data.repository import AbstractRepository, insert_ignore, read_only
 from src.utils.logging import get_logger
-from src.hackathon.model import Hackathon, HackathonTag
-from src.hackathon.domain import HackathonCreate, HackathonDto, HackathonTagCreate
+from src.hackathon.model import Hackathon, HackathonTag, hackathons_to_tags
+from src.search.index import search_indexes
+from src.utils.broadcast import broadcaster
+from src.utils.response_cache import response_cache
+from src.hackathon.domain import (
+    HackathonCreate,
+    HackathonDto,
+    HackathonTagCreate,
+    PrizeType,
+)
 
+# ids per event, Postgres NOTIFY payloads stay under 8000 bytes
+EVENT_BATCH_SIZE = 500
 
-class HackathonRepository(AbstractRepository):
-    instance = None
 
-    def __init__(self, db_manager: SQLManager) -> None:
-        super().__init__()
-        self.db = db_manager
+class HackathonRepository(AbstractRepository):
+    def __init__(self, session) -> None:
+        super().__init__(session)
         self.logger = get_logger("HackathonRepository")
 
-    def __new__(cls, *args, **kwargs):
-        """Singleton pattern"""
-        if cls.instance is None:
-            cls.instance = super(HackathonRepository, cls).__new__(cls)
-        return cls.instance
-
-    def add(
+    async def add(
         self,
         hackathon_data: list[HackathonCreate],
     ) -> int:
-        hackathons: list[Hackathon] = []
-        for hackathon in hackathon_data:
-            hackathon_db = Hackathon(**hackathon.model_dump(exclude={"tags"}))
-            for tag in hackathon.tags:
-                hackathon_db.tags.append(HackathonTag(**tag.model_dump()))
-            hackathons.append(hackathon_db)
+        if not hackathon_data:
+            return 0
+        hackathon_ids = await self._run_sync(self._bulk_insert, hackathon_data)
+        await self._commit()
+        await self._changed("created", hackathon_ids)
+
+        return len(hackathon_data)
+
+    async def _changed(self, type: str, hackathon_ids: list[int]) -> None:
+        """After a commit: drop derived data and tell the event streams"""
+        search_indexes.invalidate("hackathons")
+        await response_cache.bump("hackathons")
+        for start in range(0, len(hackathon_ids), EVENT_BATCH_SIZE):
+            await broadcaster.publish(
+                "hackathons",
+                type,
+                {"ids": hackathon_ids[start : start + EVENT_BATCH_SIZE]},
+            )
 
-        self.db.session.add_all(hackathons)
-        self.db.session.commit()
+    @staticmethod
+    def _bulk_insert(
+        session: Session, hackathon_data: list[HackathonCreate]
+    ) -> list[int]:
+        """Insert hackathons with a fixed number of batched statements.
 
-        return len(hackathons)
+        Tags are shared between hackathons: existing ones are reused and
+        only the missing names are inserted.
+        """
+        names = {tag.tag for hackathon in hackathon_data for tag in hackathon.tags}
+        session.execute(
+            insert_ignore(session, HackathonTag.__table__, "tag"),
+            [{"tag": name} for name in names],
+        )
+        tag_ids = dict(
+            session.execute(
+                select(HackathonTag.tag, HackathonTag.id).where(
+                    HackathonTag.tag.in_(names)
+                )
+            ).all()
+        )
 
-    def get(self, hackathon_id: int | None = None) -> Hackathon | None:
+        hackathon_ids = session.scalars(
+            insert(Hackathon).returning(Hackathon.id, sort_by_parameter_order=True),
+            [hackathon.model_dump(exclude={"tags"}) for hackathon in hackathon_data],
+        ).all()
+        session.execute(
+            insert(hackathons_to_tags),
+            [
+                {"hackathon_id": hackathon_id, "tag_id": tag_ids[name]}
+                for hackathon_id, hackathon in zip(hackathon_ids, hackathon_data)
+                for name in {tag.tag for tag in hackathon.tags}
+            ],
+        )
+        return list(hackathon_ids)
+
+    @read_only(retry_missing=True)
+    async def get(self, hackathon_id: int | None = None) -> Hackathon | None:
         if hackathon_id:
-            return (
-                self.db.session.query(Hackathon)
-                .filter(Hackathon.id == hackathon_id)
-                .first()
+            return await self._first(
+                select(Hackathon).where(Hackathon.id == hackathon_id)
             )
         else:
             raise ValueError("hackathon_id must be provided")
 
-    def update(self, hackathon: Hackathon):
-        self.db.session.add(hackathon)
-        self.db.session.commit()
+    async def update(self, hackathon: Hackathon):
+        self.session.add(hackathon)
+        await self._commit()
+        await self._changed("updated", [hackathon.id])
 
-    def delete(self, hackathon_id: int | None = None):
+    async def delete(self, hackathon_id: int | None = None):
         if hackathon_id:
-            self.db.session.query(Hackathon).filter(
-                Hackathon.id == hackathon_id
-            ).delete()
+            await self._execute(delete(Hackathon).where(Hackathon.id == hackathon_id))
         else:
             raise ValueError("hackathon_id must be provided")
-        self.db.session.commit()
+        await self._commit()
+        await self._changed("deleted", [hackathon_id])
+
+    @read_only
+    async def export(self, batch_size: int) -> AsyncIterator[list[Hackathon]]:
+        """All hackathons with their tags, streamed in batches"""
+        statement = (
+            select(Hackathon).options(selectinload(Hackathon.tags)).order_by(Hackathon.id)
+        )
+        async for batch in self._stream(statement, batch_size):
+            yield batch
 
-    def get_all(self) -> list[Hackathon]:
-        return self.db.session.query(Hackathon).all()
+    @read_only
+    async def get_all(
+        self,
+        limit: int | None = None,
+        after: tuple[datetime, int] | None = None,
+        tag: str | None = None,
+        prize_type: PrizeType | None = None,
+        registration_open: bool | None = None,
+    ) -> list[Hackathon]:
+        """Hackathons ordered by (registration_finish, id) with tags loaded.
+
+        `after` is the sort key of the last row of the previous page
+        (keyset pagination), so deep pages cost the same as the first one.
+        """
+        statement = (
+            select(Hackathon)
+            .options(selectinload(Hackathon.tags))
+            .order_by(Hackathon.registration_finish, Hackathon.id)
+        )
+        if after is not None:
+            statement = statement.where(
+                tuple_(Hackathon.registration_finish, Hackathon.id) > tuple_(*after)
+            )
+        if tag is not None:
+            statement = statement.where(Hackathon.tags.any(HackathonTag.tag == tag))
+        if prize_type is not None:
+            statement = statement.where(Hackathon.prize_type == prize_type)
+        if registration_open is True:
+            statement = statement.where(Hackathon.registration_finish > datetime.now())
+        elif registration_open is False:
+            statement = statement.where(Hackathon.registration_finish <= datetime.now())
+        if limit is not None:
+            statement = statement.limit(limit)
+        return await self._all(statement)
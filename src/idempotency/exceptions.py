@@ -0,0 +1,23 @@
+from fastapi import HTTPException, status
+
+
+InvalidKey = HTTPException(
+    status_code=status.HTTP_400_BAD_REQUEST,
+    detail="Idempotency-Key must be 1 to 255 characters",
+)
+
+BodyTooLarge = HTTPException(
+    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+    detail="Request body too large to be sent with an Idempotency-Key",
+)
+
+KeyReused = HTTPException(
+    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+    detail="Idempotency-Key already used for a different request",
+)
+
+KeyInProgress = HTTPException(
+    status_code=status.HTTP_409_CONFLICT,
+    detail="A request with this Idempotency-Key is still being processed",
+    headers={"Retry-After": "1"},
+)
@@ -0,0 +1,287 @@
+import asyncio
+import hashlib
+import json
+import time
+from fastapi import HTTPException
+from starlette.requests import ClientDisconnect
+from src.auth.cache import token_cache
+from src.auth.jwt import decode_jwt
+from src.data.sql import SQLManager
+from src.idempotency import exceptions
+from src.idempotency.repository import IdempotencyRepository, StoredResponse
+from src.monitoring.metrics import Counter
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+
+idempotent_requests = Counter(
+    "idempotency_requests_total", "Requests sent with an Idempotency-Key by outcome"
+)
+
+log = get_logger("Idempotency")
+
+WRITE_METHODS = frozenset({"POST", "PUT", "PATCH", "DELETE"})
+# seconds between looks at a key another worker is running
+POLL_INTERVAL = 0.1
+
+
+def _principal(headers: dict[bytes, bytes]) -> str:
+    """Keys are per user, whatever access token the retry carries"""
+    authorization = headers.get(b"authorization", b"").decode("latin-1")
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        return "-"
+    claims = token_cache.get(token)
+    if claims is None:
+        try:
+            claims = decode_jwt(token)
+        except HTTPException:
+            return "-"
+    return str(claims.user_id)
+
+
+async def _read_body(receive, limit: int) -> bytes | None:
+    """The whole body, None past `limit` bytes"""
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            # a cut-off body, not one to fingerprint and run
+            raise ClientDisconnect
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > limit:
+            return None
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    return b"".join(chunks)
+
+
+async def _send_error(send, error: HTTPException) -> None:
+    headers = [(b"content-type", b"application/json")]
+    headers += [
+        (name.lower().encode(), value.encode())
+        for name, value in (error.headers or {}).items()
+    ]
+    await send(
+        {"type": "http.response.start", "status": error.status_code, "headers": headers}
+    )
+    body = json.dumps({"detail": error.detail}).encode()
+    await send({"type": "http.response.body", "body": body})
+
+
+def _no_store(response: StoredResponse) -> bool:
+    return any(
+        name == b"cache-control" and b"no-store" in value.lower()
+        for name, value in response.headers
+    )
+
+
+async def _replay(send, response: StoredResponse) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": response.status,
+            "headers": [*response.headers, (b"idempotent-replayed", b"true")],
+        }
+    )
+    await send({"type": "http.response.body", "body": response.body})
+
+
+class Idempotency:
+    """Runs a write once per Idempotency-Key and replays its response.
+
+    The response is stored for IDEMPOTENCY_TTL seconds unless it is a
+    5xx or a 429 (the retry should run again). Duplicates arriving
+    while the first request runs wait for its response: on the same
+    worker on a future, without touching the database, on other workers
+    by polling the key, up to IDEMPOTENCY_WAIT seconds before 409.
+    `Cache-Control: no-store` responses (tokens) are never written to the
+    database: only duplicates waiting on this worker get them, later
+    retries run the request again.
+    """
+
+    def __init__(
+        self, ttl: float, lock: float, wait: float, cleanup_interval: float
+    ) -> None:
+        self.ttl = ttl
+        self.lock = lock
+        self.wait = wait
+        self.cleanup_interval = cleanup_interval
+        # key id -> (fingerprint, response or None when the key was released)
+        self._running: dict[str, tuple[str, asyncio.Future]] = {}
+        self._cleanup: asyncio.Task | None = None
+
+    async def run(self, key_id: str, fingerprint: str, execute, send) -> None:
+        db = SQLManager()
+        deadline = time.monotonic() + self.wait
+        while True:
+            running = self._running.get(key_id)
+            if running is not None:
+                if running[0] != fingerprint:
+                    raise exceptions.KeyReused
+                try:
+                    response = await asyncio.wait_for(
+                        asyncio.shield(running[1]), max(0, deadline - time.monotonic())
+                    )
+                except asyncio.TimeoutError:
+                    raise exceptions.KeyInProgress
+                if response is not None:
+                    idempotent_requests.inc(outcome="coalesced")
+                    await _replay(send, response)
+                    return
+                continue
+
+            future = asyncio.get_running_loop().create_future()
+            self._running[key_id] = (fingerprint, future)
+            try:
+                async with db.session() as session:
+                    begun = await IdempotencyRepository(session).begin(
+                        key_id, fingerprint, self.lock
+                    )
+                if begun is True:
+                    idempotent_requests.inc(outcome="executed")
+                    future.set_result(await self._execute(db, key_id, execute))
+                    return
+                if begun is not False:
+                    idempotent_requests.inc(outcome="replayed")
+                    future.set_result(begun)
+                    await _replay(send, begun)
+                    return
+            finally:
+                del self._running[key_id]
+                if not future.done():
+                    future.set_result(None)
+            # running on another worker
+            if time.monotonic() >= deadline:
+                raise exceptions.KeyInProgress
+            await asyncio.sleep(POLL_INTERVAL)
+
+    async def _execute(
+        self, db: SQLManager, key_id: str, execute
+    ) -> StoredResponse | None:
+        try:
+            response = await execute()
+        except BaseException:
+            await self._release(db, key_id)
+            raise
+        if response.status >= 500 or response.status == 429:
+            await self._release(db, key_id)
+            return None
+        if _no_store(response):
+            await self._release(db, key_id)
+            return response
+        try:
+            async with db.session() as session:
+                await IdempotencyRepository(session).finish(key_id, response, self.ttl)
+        except Exception as e:
+            # already sent, a retry waits for the lock to time out and runs again
+            log.warning("Response for idempotency key not stored: %s", e)
+        return response
+
+    @staticmethod
+    async def _release(db: SQLManager, key_id: str) -> None:
+        async with db.session() as session:
+            await IdempotencyRepository(session).release(key_id)
+
+    async def _purge(self, db: SQLManager) -> None:
+        while True:
+            await asyncio.sleep(self.cleanup_interval)
+            try:
+                async with db.session() as session:
+                    deleted = await IdempotencyRepository(session).purge()
+                log.debug("Purged %d idempotency keys", deleted)
+            except Exception as e:
+                log.warning("Idempotency key purge failed: %s", e)
+
+    def start(self, db: SQLManager) -> None:
+        if self._cleanup is None:
+            self._cleanup = asyncio.create_task(self._purge(db))
+
+    async def stop(self) -> None:
+        if self._cleanup is not None:
+            self._cleanup.cancel()
+            await asyncio.gather(self._cleanup, return_exceptions=True)
+            self._cleanup = None
+
+
+idempotency = Idempotency(
+    settings.idempotency_ttl,
+    settings.idempotency_lock_timeout,
+    settings.idempotency_wait,
+    settings.idempotency_cleanup_interval,
+)
+
+
+class IdempotencyMiddleware:
+    """Idempotency-Key support for every write endpoint.
+
+    The body is read up front to fingerprint the request (the same key
+    with another body is refused), so it is capped at IDEMPOTENCY_MAX_BODY.
+    Requests without the header pass straight through.
+    """
+
+    def __init__(self, app, max_body: int = settings.idempotency_max_body) -> None:
+        self.app = app
+        self.max_body = max_body
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["method"] not in WRITE_METHODS:
+            await self.app(scope, receive, send)
+            return
+        headers = dict(scope["headers"])
+        key = headers.get(b"idempotency-key")
+        if key is None:
+            await self.app(scope, receive, send)
+            return
+        try:
+            if not 1 <= len(key) <= 255:
+                raise exceptions.InvalidKey
+            body = await _read_body(receive, self.max_body)
+            if body is None:
+                raise exceptions.BodyTooLarge
+            scoped = [_principal(headers).encode(), scope["method"].encode()]
+            scoped += [scope["path"].encode(), key]
+            key_id = hashlib.sha256(b"\0".join(scoped)).hexdigest()
+            fingerprint = hashlib.sha256(
+                scope["query_string"] + b"\0" + body
+            ).hexdigest()
+            await idempotency.run(
+                key_id,
+                fingerprint,
+                lambda: self._call_app(scope, body, receive, send),
+                send,
+            )
+        except ClientDisconnect:
+            idempotent_requests.inc(outcome="disconnected")
+        except HTTPException as e:
+            idempotent_requests.inc(outcome=str(e.status_code))
+            await _send_error(send, e)
+
+    async def _call_app(self, scope, body: bytes, receive, send) -> StoredResponse:
+        """Run the request with the buffered body, capturing the response"""
+        sent = False
+        status = 500
+        headers: list[tuple[bytes, bytes]] = []
+        chunks: list[bytes] = []
+
+        async def replay_body():
+            nonlocal sent
+            if not sent:
+                sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+
+        async def capture(message) -> None:
+            nonlocal status, headers
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                # outer middlewares append their per-request headers to this list
+                headers = list(message.get("headers", []))
+            elif message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+            await send(message)
+
+        await self.app(scope, replay_body, capture)
+        return StoredResponse(status, headers, b"".join(chunks))
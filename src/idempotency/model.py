@@ -0,0 +1,26 @@
+from datetime import datetime
+from sqlalchemy import DateTime, Index, Integer, LargeBinary, String, Text
+from sqlalchemy.orm import Mapped, mapped_column
+from src.data import Base
+
+
+class IdempotencyKey(Base):
+    """Response of a write request stored under its Idempotency-Key.
+
+    `status` is NULL while the first request runs, `expires_at` is then
+    when its lock times out, afterwards when the stored response does.
+    """
+
+    __tablename__ = "idempotency_keys"
+
+    # sha256 of user, method, path and the client's key
+    id: Mapped[str] = mapped_column(String(64), primary_key=True)
+    # sha256 of the query string and body, a reused key must match it
+    fingerprint: Mapped[str] = mapped_column(String(64))
+    status: Mapped[int] = mapped_column(Integer, nullable=True)
+    # JSON list of [name, value] pairs
+    headers: Mapped[str] = mapped_column(Text, nullable=True)
+    body: Mapped[bytes] = mapped_column(LargeBinary, nullable=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime)
+
+    __table_args__ = (Index("ix_idempotency_keys_expires_at", "expires_at"),)
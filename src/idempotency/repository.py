@@ -0,0 +1,103 @@
+import json
+from datetime import datetime, timedelta
+from typing import NamedTuple
+from sqlalchemy import delete, update
+from sqlalchemy.orm import Session
+from src.data.repository import BaseRepository, insert_ignore
+from src.idempotency import exceptions
+from src.idempotency.model import IdempotencyKey
+
+
+class StoredResponse(NamedTuple):
+    status: int
+    headers: list[tuple[bytes, bytes]]
+    body: bytes
+
+
+class IdempotencyRepository(BaseRepository):
+    async def begin(
+        self, key_id: str, fingerprint: str, lock: float
+    ) -> StoredResponse | bool:
+        """True when this request holds the key and runs, False while another
+        one does, the stored response once it is done"""
+        return await self._run_sync(self._begin, key_id, fingerprint, lock)
+
+    @staticmethod
+    def _begin(
+        session: Session, key_id: str, fingerprint: str, lock: float
+    ) -> StoredResponse | bool:
+        now = datetime.utcnow()
+        until = now + timedelta(seconds=lock)
+        inserted = session.execute(
+            insert_ignore(session, IdempotencyKey.__table__, "id").values(
+                id=key_id, fingerprint=fingerprint, expires_at=until
+            )
+        ).rowcount
+        if inserted:
+            session.commit()
+            return True
+        row = session.get(IdempotencyKey, key_id)
+        if row is None:
+            # purged in between
+            session.rollback()
+            return False
+        if row.expires_at <= now:
+            # a stored response past its TTL, or a lock whose holder died
+            taken = session.execute(
+                update(IdempotencyKey)
+                .where(IdempotencyKey.id == key_id, IdempotencyKey.expires_at <= now)
+                .values(
+                    fingerprint=fingerprint,
+                    status=None,
+                    headers=None,
+                    body=None,
+                    expires_at=until,
+                )
+                .execution_options(synchronize_session=False)
+            ).rowcount
+            session.commit()
+            return bool(taken)
+        session.rollback()
+        if row.fingerprint != fingerprint:
+            raise exceptions.KeyReused
+        if row.status is None:
+            return False
+        headers = [
+            (name.encode("latin-1"), value.encode("latin-1"))
+            for name, value in json.loads(row.headers)
+        ]
+        return StoredResponse(row.status, headers, row.body)
+
+    async def finish(self, key_id: str, response: StoredResponse, ttl: float) -> None:
+        headers = [
+            (name.decode("latin-1"), value.decode("latin-1"))
+            for name, value in response.headers
+        ]
+        await self._execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == key_id)
+            .values(
+                status=response.status,
+                headers=json.dumps(headers),
+                body=response.body,
+                expires_at=datetime.utcnow() + timedelta(seconds=ttl),
+            )
+            .execution_options(synchronize_session=False)
+        )
+        await self._commit()
+
+    async def release(self, key_id: str) -> None:
+        """Drop the lock, a retry runs the request again"""
+        await self._execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.id == key_id, IdempotencyKey.status.is_(None)
+            )
+        )
+        await self._commit()
+
+    async def purge(self) -> int:
+        deleted = await self._execute(
+            delete(IdempotencyKey).where(IdempotencyKey.expires_at <= datetime.utcnow())
+        )
+        await self._commit()
+        return deleted.rowcount
@@ -0,0 +1,10 @@
+from pydantic import BaseModel, Field
+
+
+class TeammateCandidate(BaseModel):
+    user_id: int = Field(...)
+    first_name: str = Field(..., example="Роберт")
+    last_name: str = Field(..., example="Ласурия")
+    score: int = Field(..., description="Skills plus weighted roles the candidate adds")
+    complementary_skills: list[str] = Field(..., example=["React", "Figma"])
+    complementary_roles: list[str] = Field(..., example=["frontend"])
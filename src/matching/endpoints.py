@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from src.data.dependencies import (
+    get_current_user,
+    get_hackathon_repository,
+    get_matching_repository,
+)
+from src.hackathon.repository import HackathonRepository
+from src.matching.domain import TeammateCandidate
+from src.matching.repository import MatchingRepository
+from src.user.domain import UserDto
+
+
+router = APIRouter(prefix="/hackathons", tags=["matching"])
+
+
+@router.get(
+    "/{hackathon_id}/teammates",
+    response_model=list[TeammateCandidate],
+    status_code=status.HTTP_200_OK,
+)
+async def teammates(
+    hackathon_id: int,
+    team: list[int] = Query([], description="Ids of teammates already chosen"),
+    limit: int | None = Query(
+        None, ge=1, le=100, description="Defaults to the free places in the team"
+    ),
+    current_user: UserDto = Depends(get_current_user),
+    hackathon_repository: HackathonRepository = Depends(get_hackathon_repository),
+    repository: MatchingRepository = Depends(get_matching_repository),
+) -> list[TeammateCandidate]:
+    """Students ranked by the skills and roles they add to the current team"""
+    hackathon = await hackathon_repository.get(hackathon_id=hackathon_id)
+    if hackathon is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found"
+        )
+    members = list(dict.fromkeys([current_user.id, *team]))
+    free_places = hackathon.team_maximum_size - len(members)
+    if free_places <= 0:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Team is already full"
+        )
+    return await repository.teammates(members, limit or free_places)
@@ -0,0 +1,174 @@
+import numpy as np
+
+
+# bits set in every byte value, popcount of a packed bitset is a table lookup
+POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+ROLE_WEIGHT = 3
+
+
+class BitsetMatrix:
+    """Rows of bitsets packed into bytes, grows in both directions"""
+
+    def __init__(self, rows: int = 1024, bits: int = 64) -> None:
+        self.data = np.zeros((rows, (bits + 7) // 8), dtype=np.uint8)
+
+    @property
+    def bits(self) -> int:
+        return self.data.shape[1] * 8
+
+    def reserve(self, rows: int, bits: int) -> None:
+        new_rows = max(self.data.shape[0], rows)
+        new_bytes = max(self.data.shape[1], (bits + 7) // 8)
+        if (new_rows, new_bytes) != self.data.shape:
+            if new_rows > self.data.shape[0]:
+                new_rows = max(new_rows, self.data.shape[0] * 2)
+            if new_bytes > self.data.shape[1]:
+                new_bytes = max(new_bytes, self.data.shape[1] * 2)
+            grown = np.zeros((new_rows, new_bytes), dtype=np.uint8)
+            grown[: self.data.shape[0], : self.data.shape[1]] = self.data
+            self.data = grown
+
+    def set_row(self, row: int, positions: list[int]) -> None:
+        self.data[row] = self.mask(positions)
+
+    def mask(self, positions: list[int]) -> np.ndarray:
+        mask = np.zeros(self.data.shape[1], dtype=np.uint8)
+        for position in positions:
+            mask[position >> 3] |= 1 << (position & 7)
+        return mask
+
+    def complement_counts(self, covered: np.ndarray, rows: int) -> np.ndarray:
+        """Per row: number of bits set in the row but not in `covered`"""
+        return POPCOUNT[self.data[:rows] & ~covered].sum(axis=1, dtype=np.uint16)
+
+    def positions(self, row: np.ndarray) -> list[int]:
+        return np.flatnonzero(np.unpackbits(row, bitorder="little")).tolist()
+
+
+class Vocabulary:
+    """Database ids (skills, roles) <-> dense bit positions"""
+
+    def __init__(self) -> None:
+        self.positions: dict[int, int] = {}
+        self.names: list[str] = []
+
+    def position(self, item_id: int, name: str) -> int:
+        if item_id not in self.positions:
+            self.positions[item_id] = len(self.names)
+            self.names.append(name)
+        return self.positions[item_id]
+
+
+class MatchingEngine:
+    """User x skill and user x role bitsets scored in one vectorized pass.
+
+    A candidate's score is how many skills and roles they would add to
+    the team (roles weigh ROLE_WEIGHT), users are updated in place.
+    """
+
+    def __init__(self, capacity: int = 1024) -> None:
+        self.skills = BitsetMatrix(capacity)
+        self.roles = BitsetMatrix(capacity)
+        self.skill_vocabulary = Vocabulary()
+        self.role_vocabulary = Vocabulary()
+        self.user_ids = np.full(capacity, -1, dtype=np.int64)
+        self.rows: dict[int, int] = {}
+        self.names: dict[int, tuple[str, str]] = {}
+        self._free: list[int] = []
+        self._size = 0
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def upsert(
+        self,
+        user_id: int,
+        first_name: str,
+        last_name: str,
+        skills: list[tuple[int, str]],
+        roles: list[tuple[int, str]],
+    ) -> None:
+        """Insert or replace a user, skills/roles as (id, name) pairs"""
+        row = self.rows.get(user_id)
+        if row is None:
+            row = self._free.pop() if self._free else self._size
+            self._size = max(self._size, row + 1)
+            self.rows[user_id] = row
+        skill_positions = [self.skill_vocabulary.position(*skill) for skill in skills]
+        role_positions = [self.role_vocabulary.position(*role) for role in roles]
+        self.skills.reserve(row + 1, len(self.skill_vocabulary.names))
+        self.roles.reserve(row + 1, len(self.role_vocabulary.names))
+        if row >= len(self.user_ids):
+            grown = np.full(self.skills.data.shape[0], -1, dtype=np.int64)
+            grown[: len(self.user_ids)] = self.user_ids
+            self.user_ids = grown
+        self.skills.set_row(row, skill_positions)
+        self.roles.set_row(row, role_positions)
+        self.user_ids[row] = user_id
+        self.names[user_id] = (first_name, last_name)
+
+    def remove(self, user_id: int) -> None:
+        row = self.rows.pop(user_id, None)
+        if row is None:
+            return
+        self.skills.data[row] = 0
+        self.roles.data[row] = 0
+        self.user_ids[row] = -1
+        self.names.pop(user_id, None)
+        self._free.append(row)
+
+    def _team_masks(self, team: list[int]) -> tuple[np.ndarray, np.ndarray]:
+        skills = np.zeros(self.skills.data.shape[1], dtype=np.uint8)
+        roles = np.zeros(self.roles.data.shape[1], dtype=np.uint8)
+        for user_id in team:
+            row = self.rows.get(user_id)
+            if row is not None:
+                skills |= self.skills.data[row]
+                roles |= self.roles.data[row]
+        return skills, roles
+
+    def scores(self, team: list[int]) -> np.ndarray:
+        """Score of every row against the team, -1 for team members and empty rows"""
+        skills, roles = self._team_masks(team)
+        new_skills = self.skills.complement_counts(skills, self._size)
+        new_roles = self.roles.complement_counts(roles, self._size)
+        scores = new_skills.astype(np.int32) + ROLE_WEIGHT * new_roles
+        scores[self.user_ids[: self._size] < 0] = -1
+        for user_id in team:
+            row = self.rows.get(user_id)
+            if row is not None:
+                scores[row] = -1
+        return scores
+
+    def top_k(self, team: list[int], k: int) -> list[dict]:
+        """Best k candidates for the team with the skills/roles each adds"""
+        scores = self.scores(team)
+        k = min(k, int((scores > 0).sum()))
+        if k <= 0:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best], kind="stable")]
+
+        team_skills, team_roles = self._team_masks(team)
+        candidates = []
+        for row in best.tolist():
+            user_id = int(self.user_ids[row])
+            first_name, last_name = self.names[user_id]
+            new_skills = self.skills.positions(self.skills.data[row] & ~team_skills)
+            new_roles = self.roles.positions(self.roles.data[row] & ~team_roles)
+            candidates.append(
+                {
+                    "user_id": user_id,
+                    "first_name": first_name,
+                    "last_name": last_name,
+                    "score": int(scores[row]),
+                    "complementary_skills": [
+                        self.skill_vocabulary.names[i] for i in new_skills
+                    ],
+                    "complementary_roles": [
+                        self.role_vocabulary.names[i] for i in new_roles
+                    ],
+                }
+            )
+        return candidates
@@ -0,0 +1,102 @@
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import TYPE_CHECKING
+from sqlalchemy import select
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from src.data.repository import BaseRepository
+from src.matching.domain import TeammateCandidate
+from src.user.domain import UserRole
+from src.user.model import User
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+if TYPE_CHECKING:
+    # numpy is imported with the engine, on the first matching request
+    from src.matching.engine import MatchingEngine
+
+
+class MatchingState:
+    """Process-wide engine plus the users changed since it was built"""
+
+    def __init__(self) -> None:
+        self.engine: MatchingEngine | None = None
+        self.expires_at = 0.0
+        self.dirty: set[int] = set()
+        self.lock = asyncio.Lock()
+
+    def mark_dirty(self, user_id: int) -> None:
+        if self.engine is not None:
+            self.dirty.add(user_id)
+
+
+state = MatchingState()
+
+
+def mark_user_changed(user_id: int) -> None:
+    """Profile hook: the user is reloaded into the engine before the next query"""
+    state.mark_dirty(user_id)
+
+
+class MatchingRepository(BaseRepository):
+    def __init__(self, session) -> None:
+        super().__init__(session)
+        self.logger = get_logger("MatchingRepository")
+
+    async def teammates(self, team: list[int], limit: int) -> list[TeammateCandidate]:
+        engine = await self._engine()
+        return [TeammateCandidate(**c) for c in engine.top_k(team, limit)]
+
+    async def _engine(self) -> MatchingEngine:
+        if state.engine is not None and not state.dirty and state.expires_at > time.monotonic():
+            return state.engine
+        async with state.lock:
+            if state.engine is None or state.expires_at <= time.monotonic():
+                state.dirty.clear()
+                state.engine = await self._build()
+                state.expires_at = time.monotonic() + settings.matching_refresh_ttl
+            elif state.dirty:
+                dirty, state.dirty = state.dirty, set()
+                await self._refresh(state.engine, dirty)
+        return state.engine
+
+    def _students(self):
+        return (
+            select(User)
+            .where(User.internal_role == UserRole.student)
+            .options(selectinload(User.skills), selectinload(User.roles))
+        )
+
+    async def _build(self) -> MatchingEngine:
+        users = await self._all(self._students())
+
+        from src.matching.engine import MatchingEngine
+
+        def build() -> MatchingEngine:
+            engine = MatchingEngine(capacity=max(len(users), 1024))
+            for user in users:
+                self._upsert(engine, user)
+            return engine
+
+        engine = await run_in_threadpool(build)
+        self.logger.info("Matching engine built for %d students", len(engine))
+        return engine
+
+    async def _refresh(self, engine: MatchingEngine, user_ids: set[int]) -> None:
+        users = await self._all(self._students().where(User.id.in_(user_ids)))
+        for user in users:
+            self._upsert(engine, user)
+        for user_id in user_ids - {user.id for user in users}:
+            engine.remove(user_id)
+
+    @staticmethod
+    def _upsert(engine: MatchingEngine, user: User) -> None:
+        engine.upsert(
+            user.id,
+            user.first_name,
+            user.last_name,
+            [(skill.id, skill.skill_name) for skill in user.skills],
+            [(role.id, role.role_name) for role in user.roles],
+        )
@@ -0,0 +1,111 @@
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable
+
+
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def _labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{v}"' for k, v in sorted(labels.items())) + "}"
+
+
+class Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str) -> None:
+        self.name = name
+        self.description = description
+        self.lock = Lock()
+        registry.register(self)
+
+    def samples(self) -> list[tuple[str, dict, float]]:
+        raise NotImplementedError
+
+    def render(self) -> str:
+        lines = [
+            f"# HELP {self.name} {self.description}",
+            f"# TYPE {self.name} {self.kind}",
+        ]
+        for name, labels, value in self.samples():
+            lines.append(f"{name}{_labels(labels)} {value}")
+        return "\n".join(lines)
+
+
+class Counter(Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, description: str) -> None:
+        super().__init__(name, description)
+        self.values: dict[tuple, float] = {}
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def samples(self):
+        return [(self.name, dict(key), value) for key, value in self.values.items()]
+
+
+class Gauge(Metric):
+    """Gauge read from a callback at scrape time"""
+
+    kind = "gauge"
+
+    def __init__(
+        self, name: str, description: str, callback: Callable[[], float]
+    ) -> None:
+        super().__init__(name, description)
+        self.callback = callback
+
+    def samples(self):
+        return [(self.name, {}, self.callback())]
+
+
+class Histogram(Metric):
+    kind = "histogram"
+
+    def __init__(
+        self, name: str, description: str, buckets: tuple = DEFAULT_BUCKETS
+    ) -> None:
+        super().__init__(name, description)
+        self.buckets = buckets
+        self.values: dict[tuple, list] = {}
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(sorted(labels.items()))
+        with self.lock:
+            # [per-bucket counts..., +Inf count, sum]
+            state = self.values.setdefault(key, [0] * (len(self.buckets) + 2))
+            state[bisect_left(self.buckets, value)] += 1
+            state[-1] += value
+
+    def samples(self):
+        result = []
+        for key, state in self.values.items():
+            labels = dict(key)
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), state):
+                cumulative += count
+                result.append((f"{self.name}_bucket", {**labels, "le": bound}, cumulative))
+            result.append((f"{self.name}_count", labels, cumulative))
+            result.append((f"{self.name}_sum", labels, state[-1]))
+        return result
+
+
+class Registry:
+    def __init__(self) -> None:
+        self.metrics: dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> None:
+        self.metrics[metric.name] = metric
+
+    def render(self) -> str:
+        """Prometheus text exposition format"""
+        return "\n".join(m.render() for m in self.metrics.values()) + "\n"
+
+
+registry = Registry()
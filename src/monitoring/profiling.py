@@ -0,0 +1,174 @@
+import re
+import time
+from collections import Counter as Occurrences
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from src.monitoring.metrics import Counter, Histogram
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Wall time of a request per route"
+)
+request_queries = Histogram(
+    "http_request_db_queries", "SQL statements issued per request", QUERY_BUCKETS
+)
+request_db_time = Histogram(
+    "http_request_db_seconds", "Time spent in SQL statements per request"
+)
+stage_duration = Histogram(
+    "http_request_stage_seconds", "Time spent per stage (bcrypt, jwt, db, ...)"
+)
+query_duration = Histogram("db_query_duration_seconds", "Duration of SQL statements")
+n_plus_one = Counter(
+    "db_n_plus_one_total", "Requests repeating a statement above the threshold"
+)
+
+log = get_logger("Profiling")
+
+# literals and placeholder lists that differ between otherwise equal statements
+_LITERALS = re.compile(r"'(?:[^']|'')*'|\b\d+\b|\$\d+|%\(\w+\)s|:\w+|\?")
+_LISTS = re.compile(r"\((?:\s*\?\s*,)+\s*\?\s*\)")
+
+
+def normalize(statement: str) -> str:
+    return _LISTS.sub("(?)", _LITERALS.sub("?", statement))
+
+
+class RequestProfile:
+    def __init__(self) -> None:
+        self.start = time.perf_counter()
+        self.spans: dict[str, float] = {}
+        self.queries = 0
+        self.query_time = 0.0
+        self.statements: Occurrences[str] = Occurrences()
+        self.batched = False
+
+    def add_span(self, name: str, duration: float) -> None:
+        self.spans[name] = self.spans.get(name, 0.0) + duration
+
+    def add_query(self, statement: str, duration: float) -> None:
+        self.queries += 1
+        self.query_time += duration
+        self.statements[statement] += 1
+
+    def server_timing(self) -> str:
+        """Server-Timing header value, durations in milliseconds"""
+        spans = {**self.spans, "db": self.query_time}
+        entries = [f"{name};dur={duration * 1000:.2f}" for name, duration in spans.items()]
+        entries.append(f"total;dur={(time.perf_counter() - self.start) * 1000:.2f}")
+        return ", ".join(entries)
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar(
+    "current_profile", default=None
+)
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a stage of the current request, e.g. `with span("bcrypt"): ...`"""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        profile = current_profile.get()
+        if profile is not None:
+            profile.add_span(name, time.perf_counter() - start)
+
+
+def batched() -> None:
+    """Mark the current request as working in batches (imports, exports),
+    its statements repeat per batch by design and are no N+1"""
+    profile = current_profile.get()
+    if profile is not None:
+        profile.batched = True
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    duration = time.perf_counter() - conn.info["query_start"].pop()
+    query_duration.observe(duration)
+    profile = current_profile.get()
+    if profile is not None:
+        profile.add_query(statement, duration)
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement, attributed to the request running it"""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class TimingMiddleware:
+    """Per-request wall time, stage spans and SQL profile.
+
+    Exported on /metrics per route template, as a Server-Timing header,
+    and a warning when a statement repeats more than the N+1 threshold.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+        self._routes: dict = {}
+
+    def _route(self, scope) -> str:
+        endpoint = scope.get("endpoint")
+        if endpoint is None:
+            return "unmatched"
+        if endpoint not in self._routes:
+            for route in scope["app"].routes:
+                if getattr(route, "endpoint", None) is endpoint:
+                    self._routes[endpoint] = route.path
+        return self._routes.get(endpoint, "unmatched")
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_timing(message) -> None:
+            if message["type"] == "http.response.start" and settings.server_timing:
+                headers = message.setdefault("headers", [])
+                headers.append((b"server-timing", profile.server_timing().encode()))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            self._record(scope, profile)
+
+    def _record(self, scope, profile: RequestProfile) -> None:
+        route = self._route(scope)
+        labels = {"method": scope["method"], "route": route}
+        request_duration.observe(time.perf_counter() - profile.start, **labels)
+        request_queries.observe(profile.queries, **labels)
+        request_db_time.observe(profile.query_time, **labels)
+        for name, duration in profile.spans.items():
+            stage_duration.observe(duration, stage=name, route=route)
+
+        repeated: Occurrences[str] = Occurrences()
+        for statement, count in profile.statements.items():
+            repeated[normalize(statement)] += count
+        if repeated and not profile.batched:
+            statement, count = repeated.most_common(1)[0]
+            if count > settings.n_plus_one_threshold:
+                n_plus_one.inc(**labels)
+                log.warning(
+                    "Possible N+1: %s %s ran %d similar statements: %.200s",
+                    scope["method"],
+                    route,
+                    count,
+                    statement,
+                )
@@ -0,0 +1,38 @@
+import time
+from contextlib import contextmanager
+from typing import Iterator
+from src.monitoring.metrics import Gauge
+from src.utils.logging import get_logger
+
+
+log = get_logger("Startup")
+
+
+class StartupReport:
+    """Wall time of each startup phase, logged once the app is ready"""
+
+    def __init__(self, started: float) -> None:
+        self.started = started
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = time.perf_counter() - start
+
+    @property
+    def total(self) -> float:
+        return time.perf_counter() - self.started
+
+    def finish(self) -> dict:
+        total = self.total
+        Gauge("app_startup_seconds", "Import to ready time of this worker", lambda: total)
+        report = {
+            **{f"{name}_ms": round(value * 1000, 1) for name, value in self.phases.items()},
+            "total_ms": round(total * 1000, 1),
+        }
+        log.info("Ready %s", report)
+        return report
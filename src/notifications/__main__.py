@@ -0,0 +1,3 @@
+from src.notifications.worker import main
+
+main()
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class NotificationStatus(str, Enum):
+    pending = "pending"
+    sent = "sent"
+    failed = "failed"
@@ -0,0 +1,49 @@
+from datetime import datetime
+from sqlalchemy import (
+    BigInteger,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+)
+from sqlalchemy.orm import Mapped, mapped_column
+from src.data import Base
+from src.notifications.domain import NotificationStatus
+
+
+class Notification(Base):
+    """Outbox of Telegram messages, a row is written before it is sent"""
+
+    __tablename__ = "notifications"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    kind: Mapped[str] = mapped_column(String(40))
+    hackathon_id: Mapped[int] = mapped_column(
+        ForeignKey("hackathons.id", ondelete="CASCADE"), nullable=True
+    )
+    user_id: Mapped[int] = mapped_column(ForeignKey("users.id", ondelete="CASCADE"))
+    chat_id: Mapped[int] = mapped_column(BigInteger)
+    text: Mapped[str] = mapped_column(String)
+    status: Mapped[str] = mapped_column(
+        Enum(NotificationStatus), default=NotificationStatus.pending
+    )
+    attempts: Mapped[int] = mapped_column(Integer, default=0)
+    send_at: Mapped[datetime] = mapped_column(DateTime)
+    # claimed by a worker until then, a crashed worker's rows come back after it
+    locked_until: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    sent_at: Mapped[datetime] = mapped_column(DateTime, nullable=True)
+    last_error: Mapped[str] = mapped_column(String, nullable=True)
+
+    __table_args__ = (
+        # a reminder is written once per user whoever schedules it
+        UniqueConstraint(
+            "kind",
+            "hackathon_id",
+            "user_id",
+            name="uq_notifications_kind_hackathon_id_user_id",
+        ),
+        Index("ix_notifications_status_send_at", "status", "send_at"),
+    )
@@ -0,0 +1,141 @@
+from datetime import datetime, timedelta
+from sqlalchemy import bindparam, exists, func, literal, select, update
+from sqlalchemy.orm import Session
+from src.data.repository import BaseRepository, insert_ignore, read_only
+from src.hackathon.model import Hackathon
+from src.notifications.domain import NotificationStatus
+from src.notifications.model import Notification
+from src.team.model import Registration
+from src.user.domain import UserRole
+from src.user.model import TgUser, User
+
+
+class NotificationRepository(BaseRepository):
+    @read_only
+    async def upcoming(self, now: datetime) -> list[tuple[int, str, datetime]]:
+        """(id, title, registration_finish) of hackathons still open"""
+        result = await self._execute(
+            select(Hackathon.id, Hackathon.title, Hackathon.registration_finish).where(
+                Hackathon.registration_finish > now
+            )
+        )
+        return [tuple(row) for row in result.all()]
+
+    async def fan_out(self, kind: str, hackathon_id: int, text: str) -> int:
+        """Outbox rows for every Telegram-linked student not yet in a team.
+
+        One INSERT ... SELECT whatever the number of students. Rows already
+        written for this reminder (another worker, a restart) are skipped.
+        """
+        now = datetime.now()
+        in_team = exists().where(
+            Registration.hackathon_id == hackathon_id,
+            Registration.user_id == TgUser.user_id,
+            Registration.team_id.is_not(None),
+        )
+        recipients = (
+            select(
+                literal(kind),
+                literal(hackathon_id),
+                TgUser.user_id,
+                TgUser.tg_id,
+                literal(text),
+                literal(NotificationStatus.pending, Notification.__table__.c.status.type),
+                literal(0),
+                literal(now),
+            )
+            .join(User, User.id == TgUser.user_id)
+            .where(User.internal_role == UserRole.student, ~in_team)
+        )
+
+        def insert(session: Session) -> int:
+            statement = insert_ignore(
+                session, Notification.__table__, "kind", "hackathon_id", "user_id"
+            ).from_select(
+                [
+                    "kind", "hackathon_id", "user_id", "chat_id", "text",
+                    "status", "attempts", "send_at",
+                ],
+                recipients,
+            )
+            return session.execute(statement).rowcount
+
+        written = await self._run_sync(insert)
+        await self._commit()
+        return written
+
+    async def claim(self, limit: int, lease: float) -> list[Notification]:
+        """Due messages, hidden from other workers for `lease` seconds.
+
+        SKIP LOCKED lets concurrent workers claim different rows on
+        Postgres, SQLite serialises the UPDATE anyway.
+        """
+        now = datetime.now()
+        due = (
+            select(Notification.id)
+            .where(
+                Notification.status == NotificationStatus.pending,
+                Notification.send_at <= now,
+                (Notification.locked_until.is_(None)) | (Notification.locked_until < now),
+            )
+            .order_by(Notification.send_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        )
+        claimed = await self._run_sync(
+            lambda s: s.scalars(
+                update(Notification)
+                .where(Notification.id.in_(due.scalar_subquery()))
+                .values(locked_until=now + timedelta(seconds=lease))
+                .returning(Notification)
+                .execution_options(synchronize_session=False)
+            ).all()
+        )
+        await self._commit()
+        return claimed
+
+    async def finish(self, results: list[dict]) -> None:
+        """Store the outcome of a batch with one executemany.
+
+        Each result has the row's `id`, `status`, `attempts`, `send_at`,
+        `sent_at` and `last_error`, the lease is released.
+        """
+        if not results:
+            return
+        table = Notification.__table__
+        statement = (
+            update(table)
+            .where(table.c.id == bindparam("_id"))
+            .values(
+                status=bindparam("status"),
+                attempts=bindparam("attempts"),
+                send_at=bindparam("send_at"),
+                sent_at=bindparam("sent_at"),
+                last_error=bindparam("last_error"),
+                locked_until=None,
+            )
+        )
+        await self._run_sync(
+            lambda s: s.connection().execute(
+                statement, [{"_id": r.pop("id"), **r} for r in results]
+            )
+        )
+        await self._commit()
+
+    @read_only
+    async def outbox(self) -> tuple[int, datetime | None]:
+        """Pending messages and the send time of the oldest of them"""
+        result = await self._execute(
+            select(func.count(), func.min(Notification.send_at)).where(
+                Notification.status == NotificationStatus.pending
+            )
+        )
+        return tuple(result.one())
+
+    @read_only
+    async def next_due(self) -> datetime | None:
+        return await self._first(
+            select(func.min(Notification.send_at)).where(
+                Notification.status == NotificationStatus.pending
+            )
+        )
@@ -0,0 +1,74 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Awaitable, Callable, Hashable
+from src.utils.logging import get_logger
+
+
+# wall clock timers, re-check at least this often in case the clock jumps
+MAX_SLEEP = 60.0
+
+
+class Scheduler:
+    """Timers kept in a binary heap, one task sleeps until the earliest is due.
+
+    Timers are keyed, scheduling a key again replaces its timer. Replaced
+    and cancelled entries stay in the heap marked dead and are skipped
+    when they surface, O(log n) for every operation.
+    """
+
+    def __init__(self) -> None:
+        self._heap: list[list] = []
+        self._timers: dict[Hashable, list] = {}
+        self._counter = itertools.count()
+        self._changed = asyncio.Event()
+        self.log = get_logger("Scheduler")
+
+    def __len__(self) -> int:
+        return len(self._timers)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._timers
+
+    def keys(self) -> set[Hashable]:
+        return set(self._timers)
+
+    def schedule(
+        self, key: Hashable, when: float, callback: Callable[[], Awaitable[None]]
+    ) -> None:
+        """Run `callback` at `when` (a time.time() timestamp)"""
+        self.cancel(key)
+        timer = [when, next(self._counter), key, callback, True]
+        self._timers[key] = timer
+        heapq.heappush(self._heap, timer)
+        if self._heap[0] is timer:
+            self._changed.set()
+
+    def cancel(self, key: Hashable) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer[-1] = False
+
+    def _next(self) -> list | None:
+        while self._heap and not self._heap[0][-1]:
+            heapq.heappop(self._heap)
+        return self._heap[0] if self._heap else None
+
+    async def run(self) -> None:
+        while True:
+            timer = self._next()
+            delay = MAX_SLEEP if timer is None else timer[0] - time.time()
+            if delay > 0:
+                self._changed.clear()
+                try:
+                    await asyncio.wait_for(self._changed.wait(), min(delay, MAX_SLEEP))
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            heapq.heappop(self._heap)
+            del self._timers[timer[2]]
+            try:
+                await timer[3]()
+            except Exception:
+                self.log.exception("Timer %s failed", timer[2])
@@ -0,0 +1,79 @@
+import asyncio
+import random
+from enum import Enum
+from typing import NamedTuple
+import httpx
+from src.utils.rate_limit import BucketStore, Limit
+
+
+RETRY_BASE = 1.0
+RETRY_CAP = 600.0
+
+
+class Outcome(str, Enum):
+    sent = "sent"
+    # rate limited or a transient error, send again later
+    retry = "retry"
+    # Telegram refused the message for good (chat not found, bot blocked)
+    failed = "failed"
+
+
+class Result(NamedTuple):
+    outcome: Outcome
+    delay: float = 0.0
+    error: str | None = None
+
+
+def backoff(attempt: int) -> float:
+    """Exponential backoff with full jitter, retries of one outage spread out"""
+    return random.uniform(0, min(RETRY_CAP, RETRY_BASE * 2**attempt))
+
+
+class TelegramSender:
+    """sendMessage calls, at most `concurrency` at once and paced by token
+    buckets: one for the bot and one per chat"""
+
+    def __init__(
+        self,
+        client: httpx.AsyncClient,
+        token: str,
+        concurrency: int,
+        buckets: BucketStore,
+        rate: Limit,
+        chat_rate: Limit,
+    ) -> None:
+        self.client = client
+        self.path = f"/bot{token}/sendMessage"
+        self.buckets = buckets
+        self.rate = rate
+        self.chat_rate = chat_rate
+        self._slots = asyncio.Semaphore(concurrency)
+
+    async def send(self, chat_id: int, text: str, attempt: int) -> Result:
+        # a busy chat is not waited for, its message goes back to the outbox
+        wait = await self.buckets.take(f"chat:{chat_id}", self.chat_rate)
+        if wait > 0:
+            return Result(Outcome.retry, wait)
+        async with self._slots:
+            while (wait := await self.buckets.take("bot", self.rate)) > 0:
+                await asyncio.sleep(wait)
+            try:
+                response = await self.client.post(
+                    self.path, json={"chat_id": chat_id, "text": text}
+                )
+            except httpx.HTTPError as e:
+                return Result(Outcome.retry, backoff(attempt), f"{type(e).__name__}: {e}")
+        if response.status_code == 200:
+            return Result(Outcome.sent)
+        try:
+            body = response.json()
+        except ValueError:
+            body = {}
+        error = f"{response.status_code} {body.get('description', '')}".strip()
+        if response.status_code == 429:
+            retry_after = body.get("parameters", {}).get("retry_after", 1)
+            # jitter so the throttled messages don't come back as one burst
+            return Result(Outcome.retry, retry_after + random.uniform(0, 1), error)
+        if response.status_code >= 500:
+            return Result(Outcome.retry, backoff(attempt), error)
+        return Result(Outcome.failed, error=error)
@@ -0,0 +1,294 @@
+"""Telegram reminders before registration closes.
+
+    python -m src.notifications
+
+Runs apart from the web workers, several of them may run at once. The
+scheduler keeps a timer per upcoming reminder; when one fires the
+recipients are written to the notifications outbox in one statement and
+the dispatcher sends them. Every message is in the outbox before it is
+sent, a restarted worker carries on where the last one stopped.
+
+The worker serves its own /metrics on NOTIFY_METRICS_PORT: the send
+outcomes and the depth and lag of the outbox.
+"""
+import asyncio
+import signal
+import time
+from datetime import datetime, timedelta
+import httpx
+import uvicorn
+from fastapi import FastAPI
+from src.data.sql import SQLManager
+from src.monitoring.endpoints import router as monitoring_router
+from src.monitoring.metrics import Counter, Gauge
+from src.notifications.domain import NotificationStatus
+from src.notifications.model import Notification
+from src.notifications.repository import NotificationRepository
+from src.notifications.scheduler import Scheduler
+from src.notifications.sender import Outcome, TelegramSender
+from src.utils.logging import get_logger, setup_logging
+from src.utils.rate_limit import Limit, create_bucket_store
+from src.utils.settings import settings
+
+
+notifications = Counter("notifications_total", "Telegram messages by outcome")
+
+# longest the dispatcher sleeps without looking at the outbox
+IDLE_POLL = 5.0
+
+
+def reminder_hours() -> list[int]:
+    return sorted(
+        {int(hours) for hours in settings.notify_reminder_hours.split(",") if hours.strip()},
+        reverse=True,
+    )
+
+
+def reminder_text(title: str, finish: datetime) -> str:
+    hours = max(1, round((finish - datetime.now()).total_seconds() / 3600))
+    return (
+        f"Регистрация на «{title}» закрывается через {hours} ч. "
+        "Успейте зарегистрироваться и собрать команду!"
+    )
+
+
+class NotificationWorker:
+    def __init__(self, db: SQLManager, sender: TelegramSender) -> None:
+        self.db = db
+        self.sender = sender
+        self.scheduler = Scheduler()
+        self.fired: set[tuple[int, int]] = set()
+        self.log = get_logger("NotificationWorker")
+        self._wake = asyncio.Event()
+        self._stopping = asyncio.Event()
+        self._pending = 0
+        self._oldest: datetime | None = None
+        Gauge(
+            "notifications_outbox_pending",
+            "Messages in the outbox not sent nor failed yet",
+            lambda: self._pending,
+        )
+        Gauge(
+            "notifications_outbox_lag_seconds",
+            "How long the oldest pending message is overdue",
+            self.lag,
+        )
+
+    async def run(self) -> None:
+        """Until stop(), the batch being sent when it is called is finished"""
+        tasks = [
+            asyncio.create_task(self.scheduler.run()),
+            asyncio.create_task(self._rescan()),
+            asyncio.create_task(self._measure()),
+        ]
+        try:
+            await self._dispatch()
+        finally:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def stop(self) -> None:
+        self._stopping.set()
+        self._wake.set()
+
+    async def reload(self) -> None:
+        """Timers for the reminders of every hackathon still open.
+
+        Of the reminders already past only the closest to the deadline is
+        kept: a worker that was down still warns, once. Reminders this
+        worker fired are not scheduled again.
+        """
+        now = datetime.now()
+        async with self.db.session() as session:
+            upcoming = await NotificationRepository(session).upcoming(now)
+        keys = set()
+        for hackathon_id, title, finish in upcoming:
+            due = [(hours, finish - timedelta(hours=hours)) for hours in reminder_hours()]
+            past = [reminder for reminder in due if reminder[1] <= now]
+            for hours, when in [r for r in due if r[1] > now] + past[-1:]:
+                key = (hackathon_id, hours)
+                if key in self.fired:
+                    continue
+                keys.add(key)
+                self.scheduler.schedule(
+                    key,
+                    when.timestamp(),
+                    lambda h=hackathon_id, t=title, f=finish, k=hours: self.remind(h, t, f, k),
+                )
+        for key in self.scheduler.keys() - keys:
+            self.scheduler.cancel(key)
+
+    async def remind(
+        self, hackathon_id: int, title: str, finish: datetime, hours: int
+    ) -> None:
+        self.fired.add((hackathon_id, hours))
+        async with self.db.session() as session:
+            written = await NotificationRepository(session).fan_out(
+                f"registration_finish_{hours}h", hackathon_id, reminder_text(title, finish)
+            )
+        self.log.info(
+            "Reminder %dh for hackathon %d: %d messages", hours, hackathon_id, written
+        )
+        self._wake.set()
+
+    async def _rescan(self) -> None:
+        while True:
+            try:
+                await self.reload()
+            except Exception:
+                self.log.exception("Reloading the reminders failed")
+            await asyncio.sleep(settings.notify_rescan_interval)
+
+    def lag(self) -> float:
+        if self._oldest is None:
+            return 0.0
+        return max(0.0, (datetime.now() - self._oldest).total_seconds())
+
+    async def measure(self) -> None:
+        async with self.db.session() as session:
+            self._pending, self._oldest = await NotificationRepository(session).outbox()
+
+    async def _measure(self) -> None:
+        while True:
+            try:
+                await self.measure()
+            except Exception:
+                self.log.exception("Measuring the outbox failed")
+            await asyncio.sleep(IDLE_POLL)
+
+    async def _dispatch(self) -> None:
+        while not self._stopping.is_set():
+            try:
+                if await self.dispatch_once():
+                    continue
+                delay = await self._idle_delay()
+            except Exception:
+                self.log.exception("Dispatching notifications failed")
+                delay = IDLE_POLL
+            self._wake.clear()
+            try:
+                await asyncio.wait_for(self._wake.wait(), delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _idle_delay(self) -> float:
+        async with self.db.session() as session:
+            next_due = await NotificationRepository(session).next_due()
+        if next_due is None:
+            return IDLE_POLL
+        return min(IDLE_POLL, max(0.0, (next_due - datetime.now()).total_seconds()))
+
+    async def dispatch_once(self) -> int:
+        """Claim a batch, send it and store the outcomes with one statement,
+        returns the batch size.
+
+        Telegram has no idempotency key: a worker dying mid-batch leaves
+        what it sent pending, those messages go out again once its lease
+        runs out. NOTIFY_BATCH_SIZE bounds the duplicates of a crash.
+        """
+        async with self.db.session() as session:
+            repository = NotificationRepository(session)
+            claimed = await repository.claim(
+                settings.notify_batch_size, settings.notify_lease
+            )
+            if not claimed:
+                return 0
+            # claim() committed, no connection is held while the batch sends
+            rows = await asyncio.gather(*(self._send(n) for n in claimed))
+            await repository.finish(rows)
+        return len(claimed)
+
+    async def _send(self, notification: Notification) -> dict:
+        result = await self.sender.send(
+            notification.chat_id, notification.text, notification.attempts
+        )
+        now = datetime.now()
+        attempts = notification.attempts + 1
+        row = {
+            "id": notification.id,
+            "status": NotificationStatus.pending,
+            "attempts": attempts,
+            "send_at": now + timedelta(seconds=result.delay),
+            "sent_at": None,
+            "last_error": result.error,
+        }
+        outcome = result.outcome.value
+        if result.outcome == Outcome.sent:
+            row.update(status=NotificationStatus.sent, sent_at=now)
+        elif result.error is None:
+            # held back by the chat's rate limit, not an attempt
+            row["attempts"] = notification.attempts
+            outcome = "deferred"
+        elif result.outcome == Outcome.failed or attempts >= settings.notify_max_attempts:
+            row["status"] = NotificationStatus.failed
+            outcome = Outcome.failed.value
+        notifications.inc(outcome=outcome)
+        return row
+
+
+def create_sender(client: httpx.AsyncClient) -> TelegramSender:
+    return TelegramSender(
+        client,
+        settings.telegram_bot_token,
+        settings.notify_concurrency,
+        create_bucket_store(),
+        Limit("telegram", max(1, int(settings.notify_rate)), settings.notify_rate),
+        Limit("telegram_chat", 1, settings.notify_chat_rate),
+    )
+
+
+def metrics_app() -> FastAPI:
+    app = FastAPI(openapi_url=None)
+    app.include_router(monitoring_router)
+    return app
+
+
+def metrics_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(
+            metrics_app(),
+            host=settings.web_host,
+            port=port,
+            lifespan="off",
+            access_log=False,
+            log_config=None,
+        )
+    )
+    # SIGTERM stops the worker, which stops the server
+    server.install_signal_handlers = lambda: None
+    return server
+
+
+async def serve() -> None:
+    log = get_logger("NotificationWorker")
+    db = SQLManager(get_logger("db"))
+    await db.prepare()
+    metrics = None
+    if settings.notify_metrics_port:
+        server = metrics_server(settings.notify_metrics_port)
+        metrics = asyncio.create_task(server.serve())
+    async with httpx.AsyncClient(
+        base_url=settings.telegram_api_url,
+        timeout=10,
+        limits=httpx.Limits(max_connections=settings.notify_concurrency),
+    ) as client:
+        worker = NotificationWorker(db, create_sender(client))
+        loop = asyncio.get_running_loop()
+        for sig in (signal.SIGTERM, signal.SIGINT):
+            loop.add_signal_handler(sig, worker.stop)
+        log.info("Notification worker started")
+        start = time.monotonic()
+        await worker.run()
+        log.info("Notification worker stopped after %.0f s", time.monotonic() - start)
+    if metrics is not None:
+        server.should_exit = True
+        await metrics
+    await db.close()
+
+
+def main() -> None:
+    setup_logging()
+    if not settings.telegram_bot_token:
+        raise SystemExit("TELEGRAM_BOT_TOKEN is not set")
+    asyncio.run(serve())
@@ -0,0 +1,21 @@
+from typing import Optional
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class HackathonSearchHit(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(...)
+    title: str = Field(..., example="Кокос Hackathon 2023")
+    rank: float = Field(..., example=0.42)
+
+
+class ProfileSearchHit(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    user_id: int = Field(...)
+    first_name: str = Field(..., example="Роберт")
+    last_name: str = Field(..., example="Ласурия")
+    major: Optional[str] = Field(None, example="Прикладная информатика")
+    faculty: Optional[str] = Field(None, example="ИТКН")
+    rank: float = Field(..., example=0.42)
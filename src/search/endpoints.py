@@ -0,0 +1,36 @@
+from fastapi import APIRouter, Depends, Query, status
+from src.data.dependencies import get_current_user, get_search_repository
+from src.search.domain import HackathonSearchHit, ProfileSearchHit
+from src.search.repository import SearchRepository
+from src.user.domain import UserDto
+
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get(
+    "/hackathons",
+    response_model=list[HackathonSearchHit],
+    status_code=status.HTTP_200_OK,
+)
+async def search_hackathons(
+    q: str = Query(..., min_length=1, max_length=100, example="веб разраб"),
+    limit: int = Query(20, ge=1, le=100),
+    repository: SearchRepository = Depends(get_search_repository),
+) -> list[HackathonSearchHit]:
+    """Public like the hackathon listing itself"""
+    return await repository.hackathons(q, limit)
+
+
+@router.get(
+    "/profiles",
+    response_model=list[ProfileSearchHit],
+    status_code=status.HTTP_200_OK,
+)
+async def search_profiles(
+    q: str = Query(..., min_length=1, max_length=100, example="python бэкенд"),
+    limit: int = Query(20, ge=1, le=100),
+    current_user: UserDto = Depends(get_current_user),
+    repository: SearchRepository = Depends(get_search_repository),
+) -> list[ProfileSearchHit]:
+    return await repository.profiles(q, limit)
@@ -0,0 +1,135 @@
+import asyncio
+import heapq
+import math
+import time
+from bisect import bisect_left
+from collections import Counter
+from typing import Any, Awaitable, Callable
+from starlette.concurrency import run_in_threadpool
+from src.search.text import stem, tokenize, trigrams
+from src.utils.settings import settings
+
+
+PREFIX_WEIGHT = 0.8
+FUZZY_WEIGHT = 0.6
+FUZZY_MIN_SIMILARITY = 0.3  # pg_trgm.similarity_threshold default
+MAX_EXPANSIONS = 50
+K1 = 1.2
+B = 0.75
+
+
+class InvertedIndex:
+    """In-memory BM25 index with prefix and trigram (typo) term expansion.
+
+    Fallback for databases without tsvector/pg_trgm (SQLite test runs).
+    """
+
+    def __init__(self) -> None:
+        self.postings: dict[str, dict[int, float]] = {}
+        self.lengths: dict[int, float] = {}
+        self.payloads: dict[int, Any] = {}
+        self._terms: list[str] = []
+        self._trigrams: dict[str, set[str]] = {}
+
+    def add(self, doc_id: int, fields: list[tuple[str | None, float]], payload: Any):
+        """fields: (text, weight) pairs, e.g. a title weighted above the body"""
+        counts: Counter[str] = Counter()
+        for text, weight in fields:
+            for token in tokenize(text):
+                counts[stem(token)] += weight
+        for term, count in counts.items():
+            self.postings.setdefault(term, {})[doc_id] = count
+        self.lengths[doc_id] = sum(counts.values())
+        self.payloads[doc_id] = payload
+
+    def freeze(self) -> None:
+        """Build the term dictionaries used for prefix and fuzzy lookups"""
+        self._terms = sorted(self.postings)
+        self._trigrams = {}
+        for term in self._terms:
+            for gram in trigrams(term):
+                self._trigrams.setdefault(gram, set()).add(term)
+
+    def _expand(self, token: str) -> dict[str, float]:
+        """Index terms a query token matches, with a weight per kind of match"""
+        term = stem(token)
+        expansions = {term: 1.0} if term in self.postings else {}
+
+        if len(term) >= 2:
+            start = bisect_left(self._terms, term)
+            for candidate in self._terms[start : start + MAX_EXPANSIONS]:
+                if not candidate.startswith(term):
+                    break
+                expansions.setdefault(candidate, PREFIX_WEIGHT)
+
+        if len(term) >= 4:
+            grams = trigrams(term)
+            shared: Counter[str] = Counter()
+            for gram in grams:
+                shared.update(self._trigrams.get(gram, ()))
+            for candidate, common in shared.most_common(MAX_EXPANSIONS):
+                similarity = common / len(grams | trigrams(candidate))
+                if similarity >= FUZZY_MIN_SIMILARITY:
+                    expansions.setdefault(candidate, FUZZY_WEIGHT * similarity)
+        return expansions
+
+    def search(self, query: str, limit: int = 20) -> list[tuple[float, Any]]:
+        """Documents matching every query token, best BM25 score first"""
+        tokens = tokenize(query)
+        if not tokens or not self.lengths:
+            return []
+        total = len(self.lengths)
+        average = sum(self.lengths.values()) / total
+        scores: dict[int, float] | None = None
+        for token in tokens:
+            token_scores: dict[int, float] = {}
+            for term, weight in self._expand(token).items():
+                postings = self.postings[term]
+                idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+                for doc_id, tf in postings.items():
+                    norm = tf + K1 * (1 - B + B * self.lengths[doc_id] / average)
+                    score = weight * idf * tf * (K1 + 1) / norm
+                    if score > token_scores.get(doc_id, 0):
+                        token_scores[doc_id] = score
+            if scores is None:
+                scores = token_scores
+            else:
+                scores = {
+                    doc_id: score + token_scores[doc_id]
+                    for doc_id, score in scores.items()
+                    if doc_id in token_scores
+                }
+            if not scores:
+                return []
+        best = heapq.nlargest(limit, scores.items(), key=lambda item: item[1])
+        return [(round(score, 4), self.payloads[doc_id]) for doc_id, score in best]
+
+
+class IndexRegistry:
+    """Lazily (re)built indexes, rebuilt after invalidation or `ttl` seconds"""
+
+    def __init__(self, ttl: float) -> None:
+        self.ttl = ttl
+        self._indexes: dict[str, tuple[float, InvertedIndex]] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def get(
+        self, name: str, build: Callable[[], Awaitable[InvertedIndex]]
+    ) -> InvertedIndex:
+        entry = self._indexes.get(name)
+        if entry is not None and entry[0] > time.monotonic():
+            return entry[1]
+        async with self._locks.setdefault(name, asyncio.Lock()):
+            entry = self._indexes.get(name)
+            if entry is None or entry[0] <= time.monotonic():
+                index = await build()
+                await run_in_threadpool(index.freeze)
+                entry = (time.monotonic() + self.ttl, index)
+                self._indexes[name] = entry
+        return entry[1]
+
+    def invalidate(self, name: str) -> None:
+        self._indexes.pop(name, None)
+
+
+search_indexes = IndexRegistry(settings.search_index_ttl)
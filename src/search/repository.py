@@ -0,0 +1,158 @@
+from sqlalchemy import Select, desc, func, literal, or_, select
+from sqlalchemy.orm import selectinload
+from starlette.concurrency import run_in_threadpool
+from src.data.repository import BaseRepository, read_only
+from src.hackathon.model import Hackathon, HackathonTag
+from src.search.domain import HackathonSearchHit, ProfileSearchHit
+from src.search.index import InvertedIndex, search_indexes
+from src.search.sql import RUSSIAN, tsvector
+from src.search.text import tokenize
+from src.user.model import Skill, StudentInfo, User
+from src.utils.logging import get_logger
+
+
+def prefix_tsquery(query: str) -> str:
+    """'веб разраб' -> 'веб:* & разраб:*', tokens are [0-9a-zа-я] only"""
+    return " & ".join(f"{token}:*" for token in tokenize(query))
+
+
+class SearchRepository(BaseRepository):
+    """Ranked search, Postgres tsvector + pg_trgm or the in-process index"""
+
+    def __init__(self, session) -> None:
+        super().__init__(session)
+        self.logger = get_logger("SearchRepository")
+
+    @read_only
+    async def hackathons(self, query: str, limit: int = 20) -> list[HackathonSearchHit]:
+        if not tokenize(query):
+            return []
+        if self.dialect != "postgresql":
+            index = await search_indexes.get("hackathons", self._hackathon_index)
+            return [
+                HackathonSearchHit(rank=rank, **payload)
+                for rank, payload in index.search(query, limit)
+            ]
+
+        ts_query = func.to_tsquery(RUSSIAN, prefix_tsquery(query))
+        vector = tsvector(Hackathon.title)
+        rank = func.ts_rank_cd(vector, ts_query) + func.word_similarity(
+            query, Hackathon.title
+        )
+        statement = (
+            select(Hackathon.id, Hackathon.title, rank.label("rank"))
+            .where(
+                or_(
+                    vector.op("@@")(ts_query),
+                    literal(query).op("<%")(Hackathon.title),
+                    Hackathon.tags.any(
+                        or_(
+                            HackathonTag.tag.op("%")(query),
+                            tsvector(HackathonTag.tag).op("@@")(ts_query),
+                        )
+                    ),
+                )
+            )
+            .order_by(desc("rank"))
+            .limit(limit)
+        )
+        return [HackathonSearchHit.model_validate(row) for row in await self._rows(statement)]
+
+    @read_only
+    async def profiles(self, query: str, limit: int = 20) -> list[ProfileSearchHit]:
+        if not tokenize(query):
+            return []
+        if self.dialect != "postgresql":
+            index = await search_indexes.get("profiles", self._profile_index)
+            return [
+                ProfileSearchHit(rank=rank, **payload)
+                for rank, payload in index.search(query, limit)
+            ]
+
+        ts_query = func.to_tsquery(RUSSIAN, prefix_tsquery(query))
+        vector = tsvector(StudentInfo.major, StudentInfo.faculty, StudentInfo.about)
+        rank = func.ts_rank_cd(vector, ts_query) + func.greatest(
+            func.word_similarity(query, StudentInfo.major),
+            func.word_similarity(query, StudentInfo.faculty),
+        )
+        statement = (
+            select(
+                User.id.label("user_id"),
+                User.first_name,
+                User.last_name,
+                StudentInfo.major,
+                StudentInfo.faculty,
+                rank.label("rank"),
+            )
+            .join(StudentInfo, StudentInfo.user_id == User.id)
+            .where(
+                or_(
+                    vector.op("@@")(ts_query),
+                    literal(query).op("<%")(StudentInfo.major),
+                    literal(query).op("<%")(StudentInfo.faculty),
+                    User.skills.any(
+                        or_(
+                            Skill.skill_name.op("%")(query),
+                            tsvector(Skill.skill_name).op("@@")(ts_query),
+                        )
+                    ),
+                )
+            )
+            .order_by(desc("rank"))
+            .limit(limit)
+        )
+        return [ProfileSearchHit.model_validate(row) for row in await self._rows(statement)]
+
+    async def _rows(self, statement: Select) -> list:
+        return await self._run_sync(lambda s: s.execute(statement).all())
+
+    async def _hackathon_index(self) -> InvertedIndex:
+        hackathons = await self._all(
+            select(Hackathon).options(selectinload(Hackathon.tags))
+        )
+
+        def build() -> InvertedIndex:
+            index = InvertedIndex()
+            for hackathon in hackathons:
+                index.add(
+                    hackathon.id,
+                    [
+                        (hackathon.title, 2.0),
+                        (" ".join(tag.tag for tag in hackathon.tags), 1.0),
+                    ],
+                    {"id": hackathon.id, "title": hackathon.title},
+                )
+            return index
+
+        return await run_in_threadpool(build)
+
+    async def _profile_index(self) -> InvertedIndex:
+        users = await self._all(
+            select(User)
+            .join(StudentInfo, StudentInfo.user_id == User.id)
+            .options(selectinload(User.student_info), selectinload(User.skills))
+        )
+
+        def build() -> InvertedIndex:
+            index = InvertedIndex()
+            for user in users:
+                info = user.student_info[0]
+                index.add(
+                    user.id,
+                    [
+                        (info.major, 2.0),
+                        (info.faculty, 2.0),
+                        (" ".join(skill.skill_name for skill in user.skills), 1.5),
+                        (info.about, 1.0),
+                    ],
+                    {
+                        "user_id": user.id,
+                        "first_name": user.first_name,
+                        "last_name": user.last_name,
+                        "major": info.major,
+                        "faculty": info.faculty,
+                    },
+                )
+            return index
+
+        return await run_in_threadpool(build)
@@ -0,0 +1,45 @@
+from sqlalchemy import DDL, ColumnElement, Index, event, func, text
+from sqlalchemy.dialects import postgresql  # noqa: F401  registers to_tsvector & co
+from src.data import Base
+
+
+# Inline (not bound) literals, so queries render the exact expression the
+# indexes below are built on and the planner can use them
+RUSSIAN = text("'russian'::regconfig")
+EMPTY = text("''")
+SPACE = text("' '")
+
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
+
+def document(*columns) -> ColumnElement:
+    """Columns concatenated into one text document, NULLs skipped"""
+    result = func.coalesce(columns[0], EMPTY)
+    for column in columns[1:]:
+        result = result.op("||")(SPACE).op("||")(func.coalesce(column, EMPTY))
+    return result
+
+
+def tsvector(*columns) -> ColumnElement:
+    return func.to_tsvector(RUSSIAN, document(*columns))
+
+
+def fts_index(name: str, *columns) -> Index:
+    """GIN index over the russian tsvector of the columns (Postgres only)"""
+    return Index(name, tsvector(*columns), postgresql_using="gin").ddl_if(
+        dialect="postgresql"
+    )
+
+
+def trigram_index(name: str, column) -> Index:
+    """GIN trigram index for similarity/typo-tolerant matching (Postgres only)"""
+    return Index(
+        name,
+        column,
+        postgresql_using="gin",
+        postgresql_ops={column.key: "gin_trgm_ops"},
+    ).ddl_if(dialect="postgresql")
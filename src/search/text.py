@@ -0,0 +1,126 @@
+import re
+
+
+WORD = re.compile(r"[0-9a-zа-яё]+")
+VOWELS = set("аеиоуыэюя")
+
+
+def _endings(*endings: str) -> tuple[str, ...]:
+    """Longest first, the longest matching ending wins"""
+    return tuple(sorted(endings, key=len, reverse=True))
+
+
+# Snowball Russian stemmer endings, "group 1" endings must follow а or я
+PERFECTIVE_GERUND_1 = _endings("в", "вши", "вшись")
+PERFECTIVE_GERUND_2 = _endings("ив", "ивши", "ившись", "ыв", "ывши", "ывшись")
+ADJECTIVE = _endings(
+    "ее", "ие", "ые", "ое", "ими", "ыми", "ей", "ий", "ый", "ой", "ем", "им",
+    "ым", "ом", "его", "ого", "ему", "ому", "их", "ых", "ую", "юю", "ая", "яя",
+    "ою", "ею",
+)
+PARTICIPLE_1 = _endings("ем", "нн", "вш", "ющ", "щ")
+PARTICIPLE_2 = _endings("ивш", "ывш", "ующ")
+REFLEXIVE = _endings("ся", "сь")
+VERB_1 = _endings(
+    "ла", "на", "ете", "йте", "ли", "й", "л", "ем", "н", "ло", "но", "ет",
+    "ют", "ны", "ть", "ешь", "нно",
+)
+VERB_2 = _endings(
+    "ила", "ыла", "ена", "ейте", "уйте", "ите", "или", "ыли", "ей", "уй",
+    "ил", "ыл", "им", "ым", "ен", "ило", "ыло", "ено", "ят", "ует", "уют",
+    "ит", "ыт", "ены", "ить", "ыть", "ишь", "ую", "ю",
+)
+NOUN = _endings(
+    "а", "ев", "ов", "ие", "ье", "е", "иями", "ями", "ами", "еи", "ии", "и",
+    "ией", "ей", "ой", "ий", "й", "иям", "ям", "ием", "ем", "ам", "ом", "о",
+    "у", "ах", "иях", "ях", "ы", "ь", "ию", "ью", "ю", "ия", "ья", "я",
+)
+SUPERLATIVE = _endings("ейше", "ейш")
+DERIVATIONAL = _endings("ость", "ост")
+
+
+def _strip(word: str, endings: tuple, after_a: bool = False) -> str | None:
+    """Remove the longest matching ending, None if nothing matched"""
+    for ending in endings:
+        if word.endswith(ending):
+            stem = word[: -len(ending)]
+            if after_a and not stem.endswith(("а", "я")):
+                continue
+            return stem
+    return None
+
+
+def _region(word: str, start: int = 0) -> int:
+    """Index after the first consonant that follows a vowel (R1/R2)"""
+    for i in range(start + 1, len(word)):
+        if word[i] not in VOWELS and word[i - 1] in VOWELS:
+            return i + 1
+    return len(word)
+
+
+def stem_ru(word: str) -> str:
+    """Snowball Russian stemmer, the same stems Postgres' `russian` config yields"""
+    word = word.replace("ё", "е")
+    rv_start = next((i + 1 for i, c in enumerate(word) if c in VOWELS), len(word))
+    r2 = _region(word, _region(word))
+    head, rv = word[:rv_start], word[rv_start:]
+
+    # Step 1
+    stem = _strip(rv, PERFECTIVE_GERUND_1, after_a=True)
+    if stem is None:
+        stem = _strip(rv, PERFECTIVE_GERUND_2)
+    if stem is None:
+        reflexive = _strip(rv, REFLEXIVE)
+        if reflexive is not None:
+            rv = reflexive
+        stem = _strip(rv, ADJECTIVE)
+        if stem is not None:
+            stem = (
+                _strip(stem, PARTICIPLE_1, after_a=True)
+                or _strip(stem, PARTICIPLE_2)
+                or stem
+            )
+        else:
+            stem = _strip(rv, VERB_1, after_a=True)
+            if stem is None:
+                stem = _strip(rv, VERB_2)
+            if stem is None:
+                stem = _strip(rv, NOUN)
+    rv = rv if stem is None else stem
+
+    # Step 2
+    if rv.endswith("и"):
+        rv = rv[:-1]
+
+    # Step 3
+    for ending in DERIVATIONAL:
+        if rv.endswith(ending) and rv_start + len(rv) - len(ending) >= r2:
+            rv = rv[: -len(ending)]
+            break
+
+    # Step 4
+    if rv.endswith("нн"):
+        rv = rv[:-1]
+    else:
+        superlative = _strip(rv, SUPERLATIVE)
+        if superlative is not None:
+            rv = superlative[:-1] if superlative.endswith("нн") else superlative
+        elif rv.endswith("ь"):
+            rv = rv[:-1]
+    return head + rv
+
+
+def stem(word: str) -> str:
+    if any("а" <= c <= "я" or c == "ё" for c in word):
+        return stem_ru(word)
+    # latin terms (tech names mostly) are only folded
+    return word[:-1] if len(word) > 3 and word.endswith("s") else word
+
+
+def tokenize(text: str | None) -> list[str]:
+    return WORD.findall(text.lower()) if text else []
+
+
+def trigrams(term: str) -> set[str]:
+    padded = f"  {term} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,78 @@
+"""Production server: WEB_WORKERS uvicorn processes on uvloop/httptools.
+
+    python main.py                          # WEB_WORKERS workers, default CPU count
+    python main.py --workers 4 --port 8000
+    python main.py --reload                 # development, one process
+"""
+import argparse
+import os
+from importlib.util import find_spec
+import uvicorn
+from src.utils.logging import get_logger, setup_logging
+from src.utils.settings import settings
+
+
+def main(argv: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default=settings.web_host)
+    parser.add_argument("--port", type=int, default=settings.web_port)
+    parser.add_argument("--workers", type=int, default=settings.web_workers)
+    parser.add_argument("--reload", action="store_true")
+    parser.add_argument("--access-log", action="store_true")
+    args = parser.parse_args(argv)
+    workers = 1 if args.reload else max(1, args.workers)
+
+    # workers read WEB_WORKERS to split DB_CONNECTION_BUDGET between them
+    os.environ["WEB_WORKERS"] = str(workers)
+    if workers > 1 and settings.response_cache_backend == "memory":
+        # per-process versions: a write would leave the other workers
+        # serving stale listings, under other ETags, for the whole TTL
+        setup_logging()
+        get_logger("Server").warning(
+            "Response cache off with %d workers, set RESPONSE_CACHE_BACKEND=redis "
+            "to share it",
+            workers,
+        )
+        os.environ["RESPONSE_CACHE_BACKEND"] = "off"
+    if workers > 1 and settings.events_backend == "memory":
+        # events published on one worker would never reach the streams of
+        # the others, and a resume landing elsewhere would get `reset`
+        from src.data.sql import database_url
+
+        setup_logging()
+        backend = "off"
+        if database_url(is_async=False).get_backend_name() == "postgresql":
+            backend = "postgres"
+        get_logger("Server").warning(
+            "Events backend %s with %d workers, set EVENTS_BACKEND=postgres",
+            backend,
+            workers,
+        )
+        os.environ["EVENTS_BACKEND"] = backend
+    if settings.db_schema == "migrations" and settings.db_migrate_on_startup:
+        # once here, instead of every worker racing to migrate
+        from src.data.migrations import heads, upgrade_database
+
+        setup_logging()
+        upgrade_database()
+        get_logger("Server").info("Database migrated to %s", sorted(heads()))
+        os.environ["DB_MIGRATE_ON_STARTUP"] = "false"
+
+    uvicorn.run(
+        "src.app:create_app",
+        factory=True,
+        host=args.host,
+        port=args.port,
+        workers=workers,
+        reload=args.reload,
+        loop="uvloop" if find_spec("uvloop") else "asyncio",
+        http="httptools" if find_spec("httptools") else "h11",
+        timeout_graceful_shutdown=settings.web_graceful_timeout,
+        access_log=args.access_log,
+        # records go through src.utils.logging like everything else
+        log_config=None,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,29 @@
+from datetime import datetime
+from pydantic import BaseModel, Field, ConfigDict
+
+
+class RegistrationDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    hackathon_id: int = Field(...)
+    user_id: int = Field(...)
+    team_id: int | None = Field(None)
+    registered_at: datetime = Field(...)
+
+
+class TeamCreate(BaseModel):
+    name: str = Field(..., min_length=1, max_length=50, example="Кокосы")
+
+
+class TeamDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(...)
+    hackathon_id: int = Field(...)
+    name: str = Field(..., example="Кокосы")
+    capacity: int = Field(..., example=5)
+    members_count: int = Field(..., example=3)
+
+
+class TeamDetails(TeamDto):
+    members: list[int] = Field(..., description="User ids", example=[1, 2, 3])
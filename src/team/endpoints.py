@@ -0,0 +1,79 @@
+from fastapi import APIRouter, Depends, Response, status
+from src.data.dependencies import get_current_user, get_team_repository
+from src.team.domain import RegistrationDto, TeamCreate, TeamDetails, TeamDto
+from src.team.repository import TeamRepository
+from src.user.domain import UserDto
+
+
+router = APIRouter(prefix="/hackathons", tags=["teams"])
+
+
+@router.post(
+    "/{hackathon_id}/registration",
+    response_model=RegistrationDto,
+    status_code=status.HTTP_201_CREATED,
+)
+async def register(
+    hackathon_id: int,
+    current_user: UserDto = Depends(get_current_user),
+    repository: TeamRepository = Depends(get_team_repository),
+) -> RegistrationDto:
+    """Open until the hackathon's registration_finish"""
+    return await repository.register(hackathon_id, current_user.id)
+
+
+@router.get(
+    "/{hackathon_id}/teams",
+    response_model=list[TeamDetails],
+    status_code=status.HTTP_200_OK,
+)
+async def list_teams(
+    hackathon_id: int,
+    current_user: UserDto = Depends(get_current_user),
+    repository: TeamRepository = Depends(get_team_repository),
+) -> list[TeamDetails]:
+    return await repository.get_all(hackathon_id)
+
+
+@router.post(
+    "/{hackathon_id}/teams",
+    response_model=TeamDto,
+    status_code=status.HTTP_201_CREATED,
+)
+async def create_team(
+    hackathon_id: int,
+    team: TeamCreate,
+    current_user: UserDto = Depends(get_current_user),
+    repository: TeamRepository = Depends(get_team_repository),
+) -> TeamDto:
+    """The creator joins the team, they must be registered and not in a team"""
+    return await repository.create(hackathon_id, current_user.id, team.name)
+
+
+@router.post(
+    "/{hackathon_id}/teams/{team_id}/members",
+    response_model=TeamDto,
+    status_code=status.HTTP_200_OK,
+)
+async def join_team(
+    hackathon_id: int,
+    team_id: int,
+    current_user: UserDto = Depends(get_current_user),
+    repository: TeamRepository = Depends(get_team_repository),
+) -> TeamDto:
+    """409 when the team is full, even with many students joining at once"""
+    return await repository.join(hackathon_id, team_id, current_user.id)
+
+
+@router.delete(
+    "/{hackathon_id}/teams/{team_id}/members/me",
+    status_code=status.HTTP_204_NO_CONTENT,
+)
+async def leave_team(
+    hackathon_id: int,
+    team_id: int,
+    current_user: UserDto = Depends(get_current_user),
+    repository: TeamRepository = Depends(get_team_repository),
+) -> Response:
+    await repository.leave(hackathon_id, team_id, current_user.id)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
@@ -0,0 +1,36 @@
+from fastapi import HTTPException, status
+
+
+HackathonNotFound = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Hackathon not found"
+)
+
+TeamNotFound = HTTPException(
+    status_code=status.HTTP_404_NOT_FOUND, detail="Team not found"
+)
+
+RegistrationClosed = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Registration is closed"
+)
+
+AlreadyRegistered = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Already registered"
+)
+
+NotRegistered = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Register for the hackathon first"
+)
+
+AlreadyInTeam = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Already in a team"
+)
+
+NotInTeam = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Not a member of this team"
+)
+
+TeamFull = HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Team is full")
+
+TeamNameTaken = HTTPException(
+    status_code=status.HTTP_409_CONFLICT, detail="Team name is already taken"
+)
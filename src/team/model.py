@@ -0,0 +1,62 @@
+from datetime import datetime
+from sqlalchemy import (
+    CheckConstraint,
+    DateTime,
+    ForeignKey,
+    Index,
+    Integer,
+    String,
+    UniqueConstraint,
+    func,
+)
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from src.data import Base
+
+
+class Team(Base):
+    __tablename__ = "teams"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    hackathon_id: Mapped[int] = mapped_column(
+        ForeignKey("hackathons.id", ondelete="CASCADE")
+    )
+    name: Mapped[str] = mapped_column(String(50))
+    # team_maximum_size of the hackathon when the team was created
+    capacity: Mapped[int] = mapped_column(Integer)
+    members_count: Mapped[int] = mapped_column(Integer, default=0)
+
+    registrations = relationship("Registration", back_populates="team")
+
+    __table_args__ = (
+        UniqueConstraint("hackathon_id", "name", name="uq_teams_hackathon_id_name"),
+        # last line of defence, the joins never get this far
+        CheckConstraint(
+            "members_count >= 0 AND members_count <= capacity",
+            name="ck_teams_members_count",
+        ),
+    )
+
+    @property
+    def members(self) -> list[int]:
+        return [registration.user_id for registration in self.registrations]
+
+
+class Registration(Base):
+    __tablename__ = "registrations"
+
+    hackathon_id: Mapped[int] = mapped_column(
+        ForeignKey("hackathons.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id: Mapped[int] = mapped_column(
+        ForeignKey("users.id", ondelete="CASCADE"), primary_key=True
+    )
+    team_id: Mapped[int] = mapped_column(
+        ForeignKey("teams.id", ondelete="SET NULL"), nullable=True
+    )
+    registered_at: Mapped[datetime] = mapped_column(
+        DateTime, server_default=func.now()
+    )
+
+    team = relationship("Team", back_populates="registrations")
+
+    __table_args__ = (Index("ix_registrations_team_id", "team_id"),)
@@ -0,0 +1,208 @@
+from datetime import datetime
+from fastapi import HTTPException
+from sqlalchemy import delete, insert, literal, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, selectinload
+from src.data.repository import BaseRepository, read_only
+from src.hackathon.model import Hackathon
+from src.monitoring.metrics import Counter
+from src.team import exceptions
+from src.team.model import Registration, Team
+from src.utils.logging import get_logger
+
+
+team_joins = Counter("team_joins_total", "Team join attempts by outcome")
+
+
+def _open(now: datetime):
+    return select(Hackathon.id).where(Hackathon.registration_finish > now)
+
+
+def _closed(session: Session, hackathon_id: int) -> HTTPException | None:
+    finish = session.scalar(
+        select(Hackathon.registration_finish).where(Hackathon.id == hackathon_id)
+    )
+    if finish is None:
+        return exceptions.HackathonNotFound
+    if finish <= datetime.now():
+        return exceptions.RegistrationClosed
+    return None
+
+
+def _take_place(session: Session, hackathon_id: int, user_id: int, team_id: int) -> None:
+    """Point the user's registration at the team unless it points at one already"""
+    taken = session.execute(
+        update(Registration)
+        .where(
+            Registration.hackathon_id == hackathon_id,
+            Registration.user_id == user_id,
+            Registration.team_id.is_(None),
+        )
+        .values(team_id=team_id)
+        .execution_options(synchronize_session=False)
+    ).rowcount
+    if not taken:
+        session.rollback()
+        registered = session.get(Registration, (hackathon_id, user_id))
+        raise exceptions.AlreadyInTeam if registered else exceptions.NotRegistered
+
+
+class TeamRepository(BaseRepository):
+    """Hackathon registrations and teams.
+
+    Each check is a condition of the statement that makes the change
+    (INSERT ... SELECT, UPDATE ... WHERE members_count < capacity), never
+    a read followed by a write: concurrent joins queue on the team row and
+    the ones arriving at a full team match nothing. Why a statement
+    matched nothing is only looked up on that failure path.
+    """
+
+    def __init__(self, session) -> None:
+        super().__init__(session)
+        self.logger = get_logger("TeamRepository")
+
+    async def register(self, hackathon_id: int, user_id: int) -> Registration:
+        return await self._run_sync(self._register, hackathon_id, user_id)
+
+    @staticmethod
+    def _register(session: Session, hackathon_id: int, user_id: int) -> Registration:
+        try:
+            registration = session.scalars(
+                insert(Registration)
+                .from_select(
+                    ["hackathon_id", "user_id"],
+                    select(Hackathon.id, literal(user_id)).where(
+                        Hackathon.id == hackathon_id,
+                        Hackathon.registration_finish > datetime.now(),
+                    ),
+                )
+                .returning(Registration)
+            ).first()
+        except IntegrityError as e:
+            session.rollback()
+            if session.get(Registration, (hackathon_id, user_id)) is None:
+                # a foreign key, the hackathon or the user was deleted meanwhile
+                raise _closed(session, hackathon_id) or e
+            raise exceptions.AlreadyRegistered
+        if registration is None:
+            session.rollback()
+            raise _closed(session, hackathon_id) or exceptions.RegistrationClosed
+        session.commit()
+        return registration
+
+    async def create(self, hackathon_id: int, user_id: int, name: str) -> Team:
+        """A team of the hackathon with the user as its first member"""
+        return await self._run_sync(self._create, hackathon_id, user_id, name)
+
+    @staticmethod
+    def _create(session: Session, hackathon_id: int, user_id: int, name: str) -> Team:
+        try:
+            team = session.scalars(
+                insert(Team)
+                .from_select(
+                    ["hackathon_id", "name", "capacity", "members_count"],
+                    select(
+                        Hackathon.id,
+                        literal(name),
+                        Hackathon.team_maximum_size,
+                        literal(1),
+                    ).where(
+                        Hackathon.id == hackathon_id,
+                        Hackathon.registration_finish > datetime.now(),
+                    ),
+                )
+                .returning(Team)
+            ).first()
+        except IntegrityError as e:
+            session.rollback()
+            taken = session.scalar(
+                select(Team.id).where(Team.hackathon_id == hackathon_id, Team.name == name)
+            )
+            if taken is None:
+                raise _closed(session, hackathon_id) or e
+            raise exceptions.TeamNameTaken
+        if team is None:
+            session.rollback()
+            raise _closed(session, hackathon_id) or exceptions.RegistrationClosed
+        _take_place(session, hackathon_id, user_id, team.id)
+        session.commit()
+        return team
+
+    async def join(self, hackathon_id: int, team_id: int, user_id: int) -> Team:
+        try:
+            team = await self._run_sync(self._join, hackathon_id, team_id, user_id)
+        except HTTPException as e:
+            team_joins.inc(outcome="full" if e is exceptions.TeamFull else "rejected")
+            raise
+        team_joins.inc(outcome="joined")
+        return team
+
+    @staticmethod
+    def _join(session: Session, hackathon_id: int, team_id: int, user_id: int) -> Team:
+        team = session.scalars(
+            update(Team)
+            .where(
+                Team.id == team_id,
+                Team.hackathon_id == hackathon_id,
+                Team.members_count < Team.capacity,
+                Team.hackathon_id.in_(_open(datetime.now())),
+            )
+            .values(members_count=Team.members_count + 1)
+            .returning(Team)
+            .execution_options(synchronize_session=False)
+        ).first()
+        if team is None:
+            session.rollback()
+            exists = session.scalar(
+                select(Team.id).where(Team.id == team_id, Team.hackathon_id == hackathon_id)
+            )
+            raise _closed(session, hackathon_id) or (
+                exceptions.TeamFull if exists else exceptions.TeamNotFound
+            )
+        _take_place(session, hackathon_id, user_id, team_id)
+        session.commit()
+        return team
+
+    async def leave(self, hackathon_id: int, team_id: int, user_id: int) -> None:
+        """The last member leaving deletes the team"""
+        await self._run_sync(self._leave, hackathon_id, team_id, user_id)
+
+    @staticmethod
+    def _leave(session: Session, hackathon_id: int, team_id: int, user_id: int) -> None:
+        # the team row first like in _join, a join and a leave of the same
+        # team would deadlock locking the two rows in opposite orders
+        session.execute(
+            update(Team)
+            .where(Team.id == team_id, Team.hackathon_id == hackathon_id)
+            .values(members_count=Team.members_count - 1)
+            .execution_options(synchronize_session=False)
+        )
+        left = session.execute(
+            update(Registration)
+            .where(
+                Registration.hackathon_id == hackathon_id,
+                Registration.user_id == user_id,
+                Registration.team_id == team_id,
+                Registration.hackathon_id.in_(_open(datetime.now())),
+            )
+            .values(team_id=None)
+            .execution_options(synchronize_session=False)
+        ).rowcount
+        if not left:
+            session.rollback()
+            raise _closed(session, hackathon_id) or exceptions.NotInTeam
+        session.execute(
+            delete(Team)
+            .where(Team.id == team_id, Team.members_count == 0)
+            .execution_options(synchronize_session=False)
+        )
+        session.commit()
+
+    @read_only
+    async def get_all(self, hackathon_id: int) -> list[Team]:
+        return await self._all(
+            select(Team)
+            .where(Team.hackathon_id == hackathon_id)
+            .options(selectinload(Team.registrations))
+            .order_by(Team.id)
+        )
@@ -1,5 +1,5 @@
 from enum import Enum
-from pydantic import BaseModel, Field, ConfigDict
+from pydantic import BaseModel, Field, ConfigDict, field_validator, model_validator
 
 
 class UserRole(str, Enum):
@@ -15,3 +15,112 @@ class UserDto(BaseModel):
     first_name: str = Field(..., min_length=1, max_length=50)
     last_name: str = Field(..., min_length=1, max_length=50)
     internal_role: UserRole = Field(..., min_length=1, max_length=50)
+
+
+class StudentInfoDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    graduation_year: int = Field(..., example=2026)
+    major: str = Field(..., example="Прикладная информатика")
+    faculty: str = Field(..., example="ИТКН")
+    portfolio_url: str | None = Field(None)
+    about: str | None = Field(None)
+
+
+class TgUserDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    tg_id: int = Field(..., example=123456789)
+    first_name: str = Field(..., example="Роберт")
+    last_name: str | None = Field(None)
+
+
+class SkillDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(...)
+    skill_name: str = Field(..., example="Python")
+
+
+class RoleDto(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(...)
+    role_name: str = Field(..., example="backend")
+
+
+class PublicProfile(BaseModel):
+    """What any logged-in user sees of another one, no contact details"""
+
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int = Field(...)
+    first_name: str = Field(..., min_length=1, max_length=50)
+    last_name: str = Field(..., min_length=1, max_length=50)
+    internal_role: UserRole = Field(..., min_length=1, max_length=50)
+    student_info: StudentInfoDto | None = Field(None)
+    skills: list[SkillDto] = Field(default_factory=list)
+    roles: list[RoleDto] = Field(default_factory=list)
+
+    @field_validator("student_info", "tg_user", mode="before", check_fields=False)
+    @classmethod
+    def first(cls, value):
+        """One-row relationships are mapped as lists on User"""
+        if isinstance(value, list):
+            return value[0] if value else None
+        return value
+
+
+class UserProfile(PublicProfile):
+    """Full profile, for the user themselves and admins"""
+
+    email: str = Field(..., min_length=1, max_length=50)
+    tg_user: TgUserDto | None = Field(None)
+
+
+BCRYPT_HASH = r"^\$2[aby]\$\d\d\$[./A-Za-z0-9]{53}$"
+
+
+class UserImport(BaseModel):
+    """One row of a bulk import, either `password` or an existing bcrypt `password_hash`"""
+
+    email: str = Field(..., example="test@test.com", min_length=5, max_length=50)
+    password: str | None = Field(None, example="test123456", min_length=8, max_length=256)
+    password_hash: str | None = Field(None, pattern=BCRYPT_HASH)
+    first_name: str = Field(..., example="Роберт", min_length=2, max_length=30)
+    last_name: str = Field(..., example="Ласурия", min_length=2, max_length=30)
+    internal_role: UserRole = Field(UserRole.student, example="student")
+
+    graduation_year: int | None = Field(None, example=2026)
+    major: str | None = Field(None, example="Прикладная информатика", max_length=30)
+    faculty: str | None = Field(None, example="ИТКН", max_length=30)
+    portfolio_url: str | None = Field(None)
+    about: str | None = Field(None)
+
+    tg_id: int | None = Field(None, example=123456789)
+    tg_first_name: str | None = Field(None, max_length=30)
+    tg_last_name: str | None = Field(None, max_length=30)
+
+    skills: list[str] = Field(default_factory=list, example=["Python", "SQL"])
+    roles: list[str] = Field(default_factory=list, example=["backend"])
+
+    @field_validator("skills", "roles", mode="before")
+    @classmethod
+    def split(cls, value):
+        """CSV cells hold lists as `Python;SQL`"""
+        if isinstance(value, str):
+            return [item.strip() for item in value.split(";") if item.strip()]
+        return value
+
+    @model_validator(mode="after")
+    def complete(self) -> "UserImport":
+        if (self.password is None) == (self.password_hash is None):
+            raise ValueError("exactly one of password and password_hash is required")
+        student = (self.graduation_year, self.major, self.faculty)
+        if any(value is not None for value in student) and None in student:
+            raise ValueError("graduation_year, major and faculty go together")
+        return self
+
+    @property
+    def is_student(self) -> bool:
+        return self.graduation_year is not None
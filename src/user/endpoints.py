@@ -1,11 +1,197 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from src.data.dependencies import get_current_user
-from src.user.domain import UserDto
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.exc import IntegrityError
+from src.auth.hashing import hasher
+from src.data.dependencies import (
+    get_current_admin,
+    get_current_user,
+    get_sql_manager,
+    get_user_repository,
+)
+from src.data.sql import SQLManager
+from src.monitoring.profiling import batched
+from src.user.domain import PublicProfile, UserDto, UserImport, UserProfile, UserRole
+from src.user.model import User
+from src.user.repository import UserRepository
+from src.utils.export import EXPORT_BATCH_SIZE, ExportFormat, export_response
+from src.utils.ndjson import ImportResult, RowError, iter_csv, iter_lines
 
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+IMPORT_BATCH_SIZE = 1000
+MAX_PROFILE_IDS = 100
+EXPORT_COLUMNS = [
+    "id", "email", "first_name", "last_name", "internal_role",
+    "graduation_year", "major", "faculty", "portfolio_url", "about",
+    "tg_id", "tg_first_name", "tg_last_name", "skills", "roles",
+]
+
 
 @router.get("/me", response_model=UserDto, status_code=status.HTTP_200_OK)
 async def me(current_user: UserDto = Depends(get_current_user)) -> UserDto:
     return current_user
+
+
+def _profile(user: User, current_user: UserDto) -> UserProfile | PublicProfile:
+    """Email and Telegram account only to the user themselves and admins"""
+    if current_user.internal_role == UserRole.admin or user.id == current_user.id:
+        return UserProfile.model_validate(user)
+    return PublicProfile.model_validate(user)
+
+
+@router.get(
+    "",
+    response_model=list[UserProfile | PublicProfile],
+    status_code=status.HTTP_200_OK,
+)
+async def list_profiles(
+    ids: str = Query(..., pattern=r"^\d+(,\d+)*$", example="1,2,3"),
+    repository: UserRepository = Depends(get_user_repository),
+    current_user: UserDto = Depends(get_current_user),
+) -> list[UserProfile | PublicProfile]:
+    """Profiles of the given users in request order, unknown ids are left out"""
+    user_ids = [int(user_id) for user_id in ids.split(",")]
+    if len(user_ids) > MAX_PROFILE_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"At most {MAX_PROFILE_IDS} ids per request",
+        )
+    return [_profile(user, current_user) for user in await repository.profiles(user_ids)]
+
+
+@router.get("/export", response_class=StreamingResponse)
+async def export_users(
+    request: Request,
+    format: ExportFormat = Query("csv"),
+    db: SQLManager = Depends(get_sql_manager),
+    current_user: UserDto = Depends(get_current_admin),
+) -> StreamingResponse:
+    """Every user in the columns of the import (without passwords), streamed"""
+    batched()
+
+    async def batches():
+        # own session, it has to outlive the endpoint while the body streams
+        async with db.session() as session:
+            async for users in UserRepository(session).export(EXPORT_BATCH_SIZE):
+                yield [_export_row(user) for user in users]
+
+    return export_response(request, "users", format, EXPORT_COLUMNS, batches())
+
+
+def _export_row(user: User) -> dict:
+    student = user.student_info[0] if user.student_info else None
+    tg_user = user.tg_user[0] if user.tg_user else None
+    return {
+        "id": user.id,
+        "email": user.email,
+        "first_name": user.first_name,
+        "last_name": user.last_name,
+        "internal_role": user.internal_role.value,
+        "graduation_year": student and student.graduation_year,
+        "major": student and student.major,
+        "faculty": student and student.faculty,
+        "portfolio_url": student and student.portfolio_url,
+        "about": student and student.about,
+        "tg_id": tg_user and tg_user.tg_id,
+        "tg_first_name": tg_user and tg_user.first_name,
+        "tg_last_name": tg_user and tg_user.last_name,
+        "skills": [skill.skill_name for skill in user.skills],
+        "roles": [role.role_name for role in user.roles],
+    }
+
+
+@router.get(
+    "/{user_id}/profile",
+    response_model=UserProfile | PublicProfile,
+    status_code=status.HTTP_200_OK,
+)
+async def profile(
+    user_id: int,
+    repository: UserRepository = Depends(get_user_repository),
+    current_user: UserDto = Depends(get_current_user),
+) -> UserProfile | PublicProfile:
+    users = await repository.profiles([user_id])
+    if not users:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return _profile(users[0], current_user)
+
+
+@router.post(
+    "/import", response_model=ImportResult, status_code=status.HTTP_201_CREATED
+)
+async def import_users(
+    request: Request,
+    repository: UserRepository = Depends(get_user_repository),
+    current_user: UserDto = Depends(get_current_admin),
+) -> ImportResult:
+    """Streamed upload of UserImport rows, CSV (text/csv, header line) or NDJSON.
+
+    skills and roles are `;`-separated in CSV cells. Each batch is checked
+    for taken emails and Telegram ids, its passwords hashed on the hasher
+    pool and inserted in one transaction. A line over 64 KiB is refused
+    with 413.
+    """
+    batched()
+    is_csv = request.headers.get("content-type", "").startswith("text/csv")
+    rows = iter_csv(request.stream()) if is_csv else iter_lines(request.stream())
+    result = ImportResult()
+    batch: list[tuple[int, UserImport]] = []
+    async for line_no, row in rows:
+        try:
+            if is_csv:
+                batch.append((line_no, UserImport.model_validate(row)))
+            else:
+                batch.append((line_no, UserImport.model_validate_json(row)))
+        except ValidationError as e:
+            # without the input values, rows carry passwords
+            error = "; ".join(
+                f"{'.'.join(map(str, detail['loc'])) or 'row'}: {detail['msg']}"
+                for detail in e.errors()
+            )
+            result.errors.append(RowError(line=line_no, error=error))
+            continue
+        if len(batch) >= IMPORT_BATCH_SIZE:
+            await _import_batch(repository, batch, result)
+            batch = []
+    if batch:
+        await _import_batch(repository, batch, result)
+    result.errors.sort(key=lambda error: error.line)
+    return result
+
+
+async def _import_batch(
+    repository: UserRepository, batch: list[tuple[int, UserImport]], result: ImportResult
+) -> None:
+    emails, tg_ids = await repository.taken(
+        [user.email for _, user in batch],
+        [user.tg_id for _, user in batch if user.tg_id is not None],
+    )
+    # hashing takes far longer than the inserts, don't hold a connection meanwhile
+    await repository.release()
+
+    accepted: list[tuple[int, UserImport]] = []
+    for line_no, user in batch:
+        if user.email in emails:
+            result.errors.append(RowError(line=line_no, error="email already registered"))
+        elif user.tg_id is not None and user.tg_id in tg_ids:
+            result.errors.append(RowError(line=line_no, error="tg_id already linked"))
+        else:
+            accepted.append((line_no, user))
+            emails.add(user.email)
+            tg_ids.add(user.tg_id)
+
+    plain = [user for _, user in accepted if user.password_hash is None]
+    hashes = await hasher.hash_many([user.password for user in plain])
+    for user, password_hash in zip(plain, hashes):
+        user.password, user.password_hash = None, password_hash
+
+    try:
+        result.imported += len(await repository.add_many([user for _, user in accepted]))
+    except IntegrityError as e:
+        # a signup or another import took one of the rows meanwhile
+        result.errors.extend(
+            RowError(line=line_no, error=f"batch rejected: {e.orig}")
+            for line_no, _ in accepted
+        )
@@ -2,6 +2,7 @@ from sqlalchemy import Integer, String, ForeignKey, Table, Column, Enum
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.data import Base
 from src.user.domain import UserRole
+from src.search.sql import fts_index, trigram_index
 
 
 class User(Base):
@@ -13,6 +14,8 @@ class User(Base):
     email: Mapped[str] = mapped_column(String(50), unique=True, index=True)
     internal_role: Mapped[str] = mapped_column(Enum(UserRole), default=UserRole.student)
     password: Mapped[str] = mapped_column(String)
+    # version of the user's access tokens, logging out everywhere bumps it
+    token_version: Mapped[int] = mapped_column(Integer, default=0, server_default="0")
 
     tg_user = relationship(
         "TgUser", primaryjoin="User.id == TgUser.user_id", back_populates="user"
@@ -100,3 +103,11 @@ class Role(Base):
         secondary="user_roles",
         back_populates="roles",
     )
+
+
+fts_index(
+    "ix_students_info_fts", StudentInfo.major, StudentInfo.faculty, StudentInfo.about
+)
+trigram_index("ix_students_info_major_trgm", StudentInfo.major)
+trigram_index("ix_students_info_faculty_trgm", StudentInfo.faculty)
+trigram_index("ix_skills_skill_name_trgm", Skill.skill_name)
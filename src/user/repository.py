@@ -1,54 +1,211 @@
-from src.data.repository import AbstractRepository
-from src.data.sql import SQLManager
+from typing import AsyncIterator
+from sqlalchemy import select, delete, insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, joinedload, selectinload
+from src.auth.cache import invalidate_user
+from src.data.repository import AbstractRepository, read_only
+from src.matching.repository import mark_user_changed
+from src.search.index import search_indexes
 from src.utils.logging import get_logger
-from src.user.model import User
+from src.user.domain import UserImport
+from src.user.model import Role, Skill, StudentInfo, TgUser, User, user_roles, user_skills
 from src.auth.domain import Signup
 
 
 class UserRepository(AbstractRepository):
-    instance = None
-
-    def __init__(self, db_manager: SQLManager) -> None:
-        super().__init__()
-        self.db = db_manager
+    def __init__(self, session) -> None:
+        super().__init__(session)
         self.logger = get_logger("UserRepository")
 
-    def __new__(cls, *args, **kwargs):
-        """Singleton pattern"""
-        if cls.instance is None:
-            cls.instance = super(UserRepository, cls).__new__(cls)
-        return cls.instance
-
-    def add(
+    async def add(
         self,
         user_data: Signup,
     ) -> User:
         user = User(**user_data.model_dump())
-        self.db.session.add(user)
-        self.db.session.commit()
+        self.session.add(user)
+        await self._commit()
+        mark_user_changed(user.id)
 
         return user
 
-    def get(self, user_id: int | None = None, email: str | None = None) -> User | None:
+    @read_only(retry_missing=True)
+    async def get(
+        self, user_id: int | None = None, email: str | None = None
+    ) -> User | None:
         if user_id:
-            return self.db.session.query(User).filter(User.id == user_id).first()
+            return await self._first(select(User).where(User.id == user_id))
         elif email:
-            return self.db.session.query(User).filter(User.email == email).first()
+            return await self._first(select(User).where(User.email == email))
         else:
             raise ValueError("user_id or email must be provided")
 
-    def update(self, user: User):
-        self.db.session.add(user)
-        self.db.session.commit()
+    async def update(self, user: User):
+        self.session.add(user)
+        await self._commit()
+        invalidate_user(user.id)
+        mark_user_changed(user.id)
+        search_indexes.invalidate("profiles")
 
-    def delete(self, user_id: int | None = None, email: str | None = None):
+    async def delete(self, user_id: int | None = None, email: str | None = None):
         if user_id:
-            self.db.session.query(User).filter(User.id == user_id).delete()
+            statement = delete(User).where(User.id == user_id)
         elif email:
-            self.db.session.query(User).filter(User.email == email).delete()
+            statement = delete(User).where(User.email == email)
         else:
             raise ValueError("user_id or email must be provided")
-        self.db.session.commit()
+        deleted = await self._all(statement.returning(User.id))
+        await self._commit()
+        for deleted_id in deleted:
+            invalidate_user(deleted_id)
+            mark_user_changed(deleted_id)
+        search_indexes.invalidate("profiles")
+
+    @read_only
+    async def get_all(self) -> list[User]:
+        return await self._all(select(User))
+
+    @read_only
+    async def profiles(self, user_ids: list[int]) -> list[User]:
+        """Users with all relationships in three queries, however many users.
+
+        The one-row tg_user/student_info are joined, the skills and roles
+        collections come from one IN query each instead of a join that
+        would multiply the rows.
+        """
+        statement = (
+            select(User)
+            .where(User.id.in_(user_ids))
+            .options(
+                joinedload(User.tg_user),
+                joinedload(User.student_info),
+                selectinload(User.skills),
+                selectinload(User.roles),
+            )
+        )
+        users = await self._run_sync(lambda s: s.scalars(statement).unique().all())
+        by_id = {user.id: user for user in users}
+        return [by_id[user_id] for user_id in dict.fromkeys(user_ids) if user_id in by_id]
+
+    @read_only
+    async def export(self, batch_size: int) -> AsyncIterator[list[User]]:
+        """All users with their relationships, streamed in batches.
+
+        yield_per rules out joined collections, each batch costs five queries.
+        """
+        statement = (
+            select(User)
+            .options(
+                selectinload(User.tg_user),
+                selectinload(User.student_info),
+                selectinload(User.skills),
+                selectinload(User.roles),
+            )
+            .order_by(User.id)
+        )
+        async for batch in self._stream(statement, batch_size):
+            yield batch
+
+    async def taken(
+        self, emails: list[str], tg_ids: list[int]
+    ) -> tuple[set[str], set[int]]:
+        """Emails and Telegram ids among these that already belong to a user.
+
+        Reads the primary, a lagging replica would let an import clash with
+        the batch before it.
+        """
+
+        def query(session: Session) -> tuple[set[str], set[int]]:
+            found_emails = session.scalars(
+                select(User.email).where(User.email.in_(emails))
+            ).all()
+            found_tg_ids = session.scalars(
+                select(TgUser.tg_id).where(TgUser.tg_id.in_(tg_ids))
+            ).all()
+            return set(found_emails), set(found_tg_ids)
+
+        return await self._run_sync(query)
+
+    async def add_many(self, users: list[UserImport]) -> list[int]:
+        """Insert users with hashed passwords in one transaction, returns their ids"""
+        if not users:
+            return []
+        try:
+            user_ids = await self._run_sync(self._bulk_insert, users)
+            await self._commit()
+        except IntegrityError:
+            await self._run_sync(lambda s: s.rollback())
+            raise
+        for user_id in user_ids:
+            mark_user_changed(user_id)
+        search_indexes.invalidate("profiles")
+        return user_ids
+
+    @staticmethod
+    def _bulk_insert(session: Session, users: list[UserImport]) -> list[int]:
+        """A fixed number of statements per batch, whatever its size"""
+        # ids matched by email, ordered RETURNING is row by row on SQLite
+        ids_by_email = dict(
+            session.execute(
+                insert(User).returning(User.email, User.id),
+                [
+                    user.model_dump(
+                        include={"email", "first_name", "last_name", "internal_role"}
+                    )
+                    | {"password": user.password_hash}
+                    for user in users
+                ],
+            ).all()
+        )
+        user_ids = [ids_by_email[user.email] for user in users]
+        pairs = list(zip(user_ids, users))
+
+        students = [
+            {"user_id": user_id}
+            | user.model_dump(
+                include={"graduation_year", "major", "faculty", "portfolio_url", "about"}
+            )
+            for user_id, user in pairs
+            if user.is_student
+        ]
+        if students:
+            session.execute(insert(StudentInfo), students)
+        tg_users = [
+            {
+                "user_id": user_id,
+                "tg_id": user.tg_id,
+                "first_name": user.tg_first_name or user.first_name,
+                "last_name": user.tg_last_name,
+            }
+            for user_id, user in pairs
+            if user.tg_id is not None
+        ]
+        if tg_users:
+            session.execute(insert(TgUser), tg_users)
 
-    def get_all(self) -> list[User]:
-        return self.db.session.query(User).all()
+        for model, column, table, key, attribute in (
+            (Skill, Skill.skill_name, user_skills, "skill_id", "skills"),
+            (Role, Role.role_name, user_roles, "role_id", "roles"),
+        ):
+            names = {name for user in users for name in getattr(user, attribute)}
+            if not names:
+                continue
+            # no unique constraint on the names, reuse what exists
+            ids = dict(
+                session.execute(select(column, model.id).where(column.in_(names))).all()
+            )
+            missing = sorted(names - ids.keys())
+            if missing:
+                created = session.scalars(
+                    insert(model).returning(model.id, sort_by_parameter_order=True),
+                    [{column.key: name} for name in missing],
+                ).all()
+                ids.update(zip(missing, created))
+            session.execute(
+                insert(table),
+                [
+                    {"user_id": user_id, key: ids[name]}
+                    for user_id, user in pairs
+                    for name in set(getattr(user, attribute))
+                ],
+            )
+        return user_ids
@@ -0,0 +1,74 @@
+import asyncio
+from src.monitoring.metrics import Counter, Gauge
+from src.utils.settings import settings
+
+
+admission_rejected = Counter(
+    "admission_rejected_total", "Requests shed with 503 because the worker was full"
+)
+
+# monitoring must keep working when the server is overloaded, event streams
+# sit idle for hours and are capped by EVENTS_MAX_SUBSCRIBERS instead
+EXEMPT_PATHS = frozenset({"/metrics", "/api/v1/hackathons/events"})
+
+
+class AdmissionMiddleware:
+    """Caps the requests a worker serves at once, sheds the rest with 503.
+
+    A request waits up to ADMISSION_MAX_WAIT seconds for a slot, enough to
+    absorb a burst. Past that more concurrency would only make every
+    request slower, the client is told to come back instead.
+    """
+
+    def __init__(
+        self,
+        app,
+        limit: int = settings.admission_max_concurrency,
+        max_wait: float = settings.admission_max_wait,
+    ) -> None:
+        self.app = app
+        self.limit = limit
+        self.max_wait = max_wait
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(limit)
+        Gauge("admission_in_flight", "Requests being served", lambda: self.in_flight)
+
+    async def _admit(self) -> bool:
+        if not self._slots.locked():
+            await self._slots.acquire()
+            return True
+        try:
+            await asyncio.wait_for(self._slots.acquire(), self.max_wait)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+        if not await self._admit():
+            admission_rejected.inc()
+            await send(
+                {
+                    "type": "http.response.start",
+                    "status": 503,
+                    "headers": [
+                        (b"content-type", b"application/json"),
+                        (b"retry-after", b"1"),
+                    ],
+                }
+            )
+            await send(
+                {
+                    "type": "http.response.body",
+                    "body": b'{"detail":"Server is busy, retry later"}',
+                }
+            )
+            return
+        self.in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
@@ -0,0 +1,344 @@
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import AsyncIterator, Callable, NamedTuple, Protocol
+from fastapi import HTTPException, status
+from fastapi.responses import StreamingResponse
+from src.monitoring.metrics import Counter, Gauge
+from src.utils.logging import get_logger
+from src.utils.settings import settings
+
+
+events_published = Counter("events_published_total", "Events fanned out by this worker")
+events_evicted = Counter(
+    "events_evicted_total", "Subscribers dropped because their queue was full"
+)
+
+log = get_logger("Broadcast")
+
+# one Postgres channel for all event channels, they are part of the payload
+PG_CHANNEL = "itam_events"
+
+# queue markers next to the events
+PING = object()
+EVICTED = object()
+
+SubscribersFull = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Too many event streams, retry later",
+    headers={"Retry-After": "5"},
+)
+StreamsOff = HTTPException(
+    status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+    detail="Event streams are off, they need EVENTS_BACKEND=postgres with several workers",
+)
+
+
+class Event(NamedTuple):
+    id: str
+    type: str
+    data: str
+
+    def encode(self) -> bytes:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {self.data}\n\n".encode()
+
+
+Deliver = Callable[[str], None]
+
+
+class BroadcastBackend(Protocol):
+    """Carries published payloads to `deliver` of every worker, the publisher's too"""
+
+    async def start(self, deliver: Deliver) -> None:
+        ...
+
+    async def publish(self, payload: str) -> None:
+        ...
+
+    async def stop(self) -> None:
+        ...
+
+
+class MemoryBackend:
+    """A single worker, publishing is delivering"""
+
+    def __init__(self) -> None:
+        self._deliver: Deliver | None = None
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+
+    async def publish(self, payload: str) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+    async def stop(self) -> None:
+        self._deliver = None
+
+
+class NullBackend:
+    """Events off: nothing is delivered and streams are refused"""
+
+    async def start(self, deliver: Deliver) -> None:
+        pass
+
+    async def publish(self, payload: str) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+
+class PostgresBackend:
+    """LISTEN/NOTIFY on a dedicated asyncpg connection per worker.
+
+    Postgres hands notifications to every listener in commit order, so
+    all workers keep the same history and any of them can resume a
+    stream. Events published while the connection is re-established are
+    missed by this worker.
+    """
+
+    def __init__(self, dsn: str) -> None:
+        self.dsn = dsn
+        self._connection = None
+        self._deliver: Deliver | None = None
+        self._lock = asyncio.Lock()
+        self._reconnect: asyncio.Task | None = None
+
+    async def _connect(self) -> None:
+        import asyncpg
+
+        connection = await asyncpg.connect(self.dsn)
+        await connection.add_listener(PG_CHANNEL, self._notified)
+        connection.add_termination_listener(self._terminated)
+        self._connection = connection
+
+    def _notified(self, connection, pid: int, channel: str, payload: str) -> None:
+        if self._deliver is not None:
+            self._deliver(payload)
+
+    def _terminated(self, connection) -> None:
+        self._connection = None
+        if self._deliver is not None:
+            log.warning("Event listener connection lost, reconnecting")
+            self._reconnect = asyncio.create_task(self._reconnecting())
+
+    async def _reconnecting(self) -> None:
+        delay = 1.0
+        while self._deliver is not None and self._connection is None:
+            try:
+                await self._connect()
+            except Exception as e:
+                log.warning("Event listener reconnect failed: %s", e)
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 30)
+
+    async def start(self, deliver: Deliver) -> None:
+        self._deliver = deliver
+        await self._connect()
+
+    async def publish(self, payload: str) -> None:
+        if self._connection is None:
+            raise ConnectionError("event listener is not connected")
+        # one query at a time on an asyncpg connection
+        async with self._lock:
+            await self._connection.execute("SELECT pg_notify($1, $2)", PG_CHANNEL, payload)
+
+    async def stop(self) -> None:
+        self._deliver = None
+        if self._reconnect is not None:
+            self._reconnect.cancel()
+            await asyncio.gather(self._reconnect, return_exceptions=True)
+        if self._connection is not None:
+            await self._connection.close()
+            self._connection = None
+
+
+class Subscription:
+    __slots__ = ("channel", "queue")
+
+    def __init__(self, channel: str, size: int) -> None:
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(size)
+
+
+class Broadcaster:
+    """Fans events out to the streams open on this worker.
+
+    Each subscriber gets a queue of `queue_size` items. One that lets it
+    fill up is evicted instead of buffering without bound or holding up
+    the others, its client reconnects with Last-Event-ID. The last
+    `history` events of every channel are kept to replay on resume.
+    Heartbeats go through the same queues, which is also how a stalled
+    idle stream is found.
+    """
+
+    def __init__(
+        self,
+        backend: BroadcastBackend,
+        queue_size: int,
+        history: int,
+        heartbeat: float,
+        max_subscribers: int,
+    ) -> None:
+        self.backend = backend
+        self.queue_size = queue_size
+        self.history_size = history
+        self.heartbeat = heartbeat
+        self.max_subscribers = max_subscribers
+        self.subscribers = 0
+        self._channels: dict[str, set[Subscription]] = {}
+        self._history: dict[str, deque[Event]] = {}
+        self._heartbeats: asyncio.Task | None = None
+        Gauge("events_subscribers", "Event streams open", lambda: self.subscribers)
+
+    @property
+    def full(self) -> bool:
+        return self.subscribers >= self.max_subscribers
+
+    async def start(self) -> None:
+        await self.backend.start(self._deliver)
+        self._heartbeats = asyncio.create_task(self._beat())
+
+    async def stop(self) -> None:
+        if self._heartbeats is not None:
+            self._heartbeats.cancel()
+            await asyncio.gather(self._heartbeats, return_exceptions=True)
+            self._heartbeats = None
+        await self.backend.stop()
+
+    async def publish(self, channel: str, type: str, data: dict) -> None:
+        """After the commit, a lost event must not fail the write that made it"""
+        payload = json.dumps(
+            {
+                "id": f"{time.time_ns()}-{os.getpid()}",
+                "channel": channel,
+                "type": type,
+                "data": json.dumps(data),
+            }
+        )
+        try:
+            await self.backend.publish(payload)
+        except Exception as e:
+            log.warning("Event %s/%s not published: %s", channel, type, e)
+
+    def _deliver(self, payload: str) -> None:
+        message = json.loads(payload)
+        channel = message["channel"]
+        event = Event(message["id"], message["type"], message["data"])
+        history = self._history.get(channel)
+        if history is None:
+            history = self._history[channel] = deque(maxlen=self.history_size)
+        history.append(event)
+        events_published.inc(channel=channel)
+        for subscription in list(self._channels.get(channel, ())):
+            self._put(subscription, event)
+
+    def _put(self, subscription: Subscription, item) -> None:
+        try:
+            subscription.queue.put_nowait(item)
+        except asyncio.QueueFull:
+            self._evict(subscription)
+
+    def _evict(self, subscription: Subscription) -> None:
+        self.unsubscribe(subscription)
+        events_evicted.inc(channel=subscription.channel)
+        queue = subscription.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(EVICTED)
+
+    async def _beat(self) -> None:
+        while True:
+            await asyncio.sleep(self.heartbeat)
+            for subscriptions in list(self._channels.values()):
+                for subscription in list(subscriptions):
+                    self._put(subscription, PING)
+
+    def subscribe(
+        self, channel: str, last_event_id: str | None = None
+    ) -> tuple[Subscription, list[Event] | None]:
+        """The subscription and the events after `last_event_id`, None when
+        that event is no longer (or was never) in the history"""
+        subscription = Subscription(channel, self.queue_size)
+        self._channels.setdefault(channel, set()).add(subscription)
+        self.subscribers += 1
+        if not last_event_id:
+            return subscription, []
+        history = list(self._history.get(channel, ()))
+        for position, event in enumerate(history):
+            if event.id == last_event_id:
+                return subscription, history[position + 1 :]
+        return subscription, None
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._channels.get(subscription.channel, set())
+        if subscription in subscriptions:
+            subscriptions.remove(subscription)
+            self.subscribers -= 1
+
+
+async def _stream(
+    broadcaster: Broadcaster, channel: str, last_event_id: str | None
+) -> AsyncIterator[bytes]:
+    subscription, replay = broadcaster.subscribe(channel, last_event_id)
+    try:
+        yield b"retry: 3000\n\n"
+        if replay is None:
+            yield b"event: reset\ndata: {}\n\n"
+            replay = []
+        for event in replay:
+            yield event.encode()
+        while True:
+            item = await subscription.queue.get()
+            if item is EVICTED:
+                return
+            yield b": ping\n\n" if item is PING else item.encode()
+    finally:
+        broadcaster.unsubscribe(subscription)
+
+
+def event_stream_response(
+    broadcaster: Broadcaster, channel: str, last_event_id: str | None
+) -> StreamingResponse:
+    """text/event-stream of `channel`, resumed after `last_event_id`.
+
+    A `reset` event tells the client the events it missed are gone and
+    it has to reload. On eviction the stream ends, browsers reconnect on
+    their own and resume.
+    """
+    if isinstance(broadcaster.backend, NullBackend):
+        raise StreamsOff
+    if broadcaster.full:
+        raise SubscribersFull
+    return StreamingResponse(
+        _stream(broadcaster, channel, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def create_backend() -> BroadcastBackend:
+    if settings.events_backend == "postgres":
+        from src.data.sql import database_url
+
+        url = database_url(is_async=False)
+        if url.get_backend_name() != "postgresql":
+            raise RuntimeError("EVENTS_BACKEND=postgres needs a Postgres database")
+        return PostgresBackend(
+            url.set(drivername="postgresql").render_as_string(hide_password=False)
+        )
+    if settings.events_backend == "off":
+        return NullBackend()
+    return MemoryBackend()
+
+
+broadcaster = Broadcaster(
+    create_backend(),
+    settings.events_queue_size,
+    settings.events_history,
+    settings.events_heartbeat,
+    settings.events_max_subscribers,
+)
@@ -0,0 +1,101 @@
+import asyncio
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Awaitable, Callable, Hashable
+from src.monitoring.metrics import Counter
+
+
+cache_requests = Counter("cache_requests_total", "In-process cache lookups")
+
+
+class TTLCache:
+    """Bounded LRU cache whose entries also expire after `ttl` seconds"""
+
+    def __init__(self, name: str, maxsize: int, ttl: float) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+        self._lock = Lock()
+        # key -> value being loaded by get_or_load
+        self._loading: dict[Hashable, asyncio.Future] = {}
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and entry[0] > time.monotonic():
+                self._data.move_to_end(key)
+                self.hits += 1
+                cache_requests.inc(cache=self.name, result="hit")
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+            self.misses += 1
+            cache_requests.inc(cache=self.name, result="miss")
+            return default
+
+    def set(self, key: Hashable, value: Any, ttl: float | None = None) -> None:
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        with self._lock:
+            self._data[key] = (time.monotonic() + ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    async def get_or_load(
+        self, key: Hashable, load: Callable[[], Awaitable[Any]]
+    ) -> Any:
+        """The cached value, or the one `load()` returns, cached.
+
+        Concurrent misses of a key wait for the first one's load instead
+        of each running it, and share its result or exception. When the
+        loading task is cancelled a waiter loads in its place. A load
+        that pop() invalidated mid-flight is returned but not cached.
+        """
+        while True:
+            value = self.get(key)
+            if value is not None:
+                return value
+            loading = self._loading.get(key)
+            if loading is None:
+                break
+            try:
+                return await asyncio.shield(loading)
+            except asyncio.CancelledError:
+                if not loading.cancelled():
+                    raise
+
+        future = asyncio.get_running_loop().create_future()
+        self._loading[key] = future
+        try:
+            value = await load()
+            if self._loading.get(key) is future:
+                self.set(key, value)
+            future.set_result(value)
+            return value
+        except Exception as e:
+            future.set_exception(e)
+            # retrieved, nobody may be waiting
+            future.exception()
+            raise
+        finally:
+            if self._loading.get(key) is future:
+                del self._loading[key]
+            if not future.done():
+                future.cancel()
+
+    def pop(self, key: Hashable) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+        self._loading.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+        self._loading.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
@@ -0,0 +1,76 @@
+import csv
+import io
+import json
+import zlib
+from typing import AsyncIterable, AsyncIterator, Literal
+from fastapi import Request
+from fastapi.responses import StreamingResponse
+
+
+EXPORT_BATCH_SIZE = 1000
+
+ExportFormat = Literal["csv", "ndjson"]
+
+
+async def ndjson_chunks(batches: AsyncIterable[list[dict]]) -> AsyncIterator[bytes]:
+    async for rows in batches:
+        yield "".join(
+            json.dumps(row, ensure_ascii=False, default=str) + "\n" for row in rows
+        ).encode()
+
+
+async def csv_chunks(
+    columns: list[str], batches: AsyncIterable[list[dict]]
+) -> AsyncIterator[bytes]:
+    """Lists become `;`-separated cells, the format the imports read"""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, columns, lineterminator="\n")
+    writer.writeheader()
+    async for rows in batches:
+        writer.writerows(
+            {
+                key: ";".join(map(str, value)) if isinstance(value, list) else value
+                for key, value in row.items()
+            }
+            for row in rows
+        )
+        yield buffer.getvalue().encode()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode()
+
+
+async def gzip_chunks(chunks: AsyncIterable[bytes]) -> AsyncIterator[bytes]:
+    compressor = zlib.compressobj(6, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def export_response(
+    request: Request,
+    name: str,
+    format: ExportFormat,
+    columns: list[str],
+    batches: AsyncIterable[list[dict]],
+) -> StreamingResponse:
+    """Stream batches of rows as a CSV or NDJSON download.
+
+    Compressed on the fly when the client accepts gzip, memory stays at
+    one batch whatever the size of the export.
+    """
+    if format == "csv":
+        chunks, media_type = csv_chunks(columns, batches), "text/csv"
+    else:
+        chunks, media_type = ndjson_chunks(batches), "application/x-ndjson"
+    headers = {
+        "Content-Disposition": f'attachment; filename="{name}.{format}"',
+        "Vary": "Accept-Encoding",
+    }
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        chunks = gzip_chunks(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=media_type, headers=headers)
@@ -1,11 +1,187 @@
+import atexit
+import json
 import logging
+import queue
+import random
+import re
+import sys
+import uuid
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import TextIO
+from src.monitoring.metrics import Counter
+from src.utils.settings import settings
 
-logging.basicConfig(
-    level=logging.DEBUG,
-    format="%(asctime)s %(levelname)s %(name)s %(message)s",
-    datefmt="%Y-%m-%d %H:%M:%S",
+
+request_id: ContextVar[str | None] = ContextVar("request_id", default=None)
+user_id: ContextVar[int | None] = ContextVar("user_id", default=None)
+
+# DEBUG of these is per statement/operation, never wanted next to ours
+# (pool subclasses log under their own module name)
+NOISY_LOGGERS = (
+    "sqlalchemy",
+    "aiosqlite",
+    "asyncio",
+    "httpx",
+    "httpcore",
+    "passlib",
+    "alembic",
+    "src.data.sql.TimedQueuePool",
+    "src.data.sql.TimedAsyncQueuePool",
+)
+
+# client request ids echoed and logged as is, anything else is replaced
+REQUEST_ID = re.compile(rb"[A-Za-z0-9._-]{1,64}")
+
+_listener: QueueListener | None = None
+dropped = Counter(
+    "log_records_dropped_total", "Log records dropped because the writer lagged"
 )
 
 
+class ContextFilter(logging.Filter):
+    """Stamp records with the request/user of the task that logged them"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id.get() or "-"
+        record.user_id = user_id.get()
+        return True
+
+
+class SamplingFilter(logging.Filter):
+    """Keep `rate` of DEBUG records, everything above DEBUG passes"""
+
+    def __init__(self, rate: float) -> None:
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.levelno > logging.DEBUG or random.random() < self.rate
+
+
+class DroppingQueueHandler(QueueHandler):
+    """Never blocks the caller, records are dropped when the writer lags"""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # QueueHandler formats here, on the caller's thread, so that records
+        # survive pickling to another process. The listener is a thread of
+        # this process: the record keeps its msg and args (by reference) and
+        # the message, traceback included, is built by the writer.
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            dropped.inc()
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if getattr(record, "request_id", "-") != "-":
+            entry["request_id"] = record.request_id
+        if getattr(record, "user_id", None) is not None:
+            entry["user_id"] = record.user_id
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        if record.stack_info:
+            entry["stack_info"] = self.formatStack(record.stack_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+def setup_logging(
+    level: str | None = None,
+    stream: TextIO | None = None,
+    sample_rate: float | None = None,
+) -> None:
+    """Route all records through a bounded queue to a background writer.
+
+    Formatting and I/O happen on the listener thread, the event loop
+    only pays for the filters and a put_nowait. Safe to call again,
+    the previous listener is flushed and replaced.
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+
+    level = level or settings.log_level
+    writer = logging.StreamHandler(stream or sys.stderr)
+    if settings.log_format == "json":
+        writer.setFormatter(JsonFormatter())
+    else:
+        writer.setFormatter(
+            logging.Formatter(
+                "%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        )
+
+    handler = DroppingQueueHandler(queue.Queue(settings.log_queue_size))
+    handler.addFilter(SamplingFilter(
+        settings.log_debug_sample_rate if sample_rate is None else sample_rate
+    ))
+    handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    for old in root.handlers[:]:
+        root.removeHandler(old)
+    root.addHandler(handler)
+    root.setLevel(level)
+    for name in NOISY_LOGGERS:
+        logging.getLogger(name).setLevel(max(logging.WARNING, root.level))
+
+    _listener = QueueListener(handler.queue, writer)
+    _listener.start()
+
+
+def shutdown_logging() -> None:
+    """Flush queued records, called at exit"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+class RequestIdMiddleware:
+    """Takes X-Request-ID from the client or generates one, echoes it back.
+
+    A client id that isn't 1-64 of [A-Za-z0-9._-] is replaced: it ends up
+    in every log line and response of the request.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        value = dict(scope["headers"]).get(b"x-request-id", b"")
+        value = value.decode() if REQUEST_ID.fullmatch(value) else uuid.uuid4().hex
+        token = request_id.set(value)
+
+        async def send_with_id(message) -> None:
+            if message["type"] == "http.response.start":
+                message.setdefault("headers", []).append(
+                    (b"x-request-id", value.encode())
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            request_id.reset(token)
+
+
 def get_logger(name: str) -> logging.Logger:
     return logging.getLogger(name)
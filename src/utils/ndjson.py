@@ -0,0 +1,71 @@
+import csv
+from typing import AsyncIterable, AsyncIterator
+from fastapi import HTTPException, status
+from pydantic import BaseModel, Field
+
+
+# longest line buffered, an import row is a few hundred bytes
+MAX_LINE = 64 * 1024
+
+
+class RowError(BaseModel):
+    line: int = Field(..., example=3)
+    error: str = Field(..., example="title: Field required")
+
+
+class ImportResult(BaseModel):
+    imported: int = Field(0, example=1000)
+    errors: list[RowError] = Field(default_factory=list)
+
+
+def _too_long(line_no: int, max_line: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"Line {line_no} is longer than {max_line} bytes",
+    )
+
+
+async def iter_lines(
+    chunks: AsyncIterable[bytes], max_line: int = MAX_LINE
+) -> AsyncIterator[tuple[int, bytes]]:
+    """Yield (line number, line) from a streamed body, blank lines skipped.
+
+    A line longer than `max_line` bytes ends the upload with 413 as soon
+    as that many bytes of it arrived, batches committed before it stay.
+    """
+    buffer = b""
+    line_no = 0
+    async for chunk in chunks:
+        *lines, rest = chunk.split(b"\n")
+        if lines:
+            lines[0] = buffer + lines[0]
+            buffer = rest
+        else:
+            buffer += rest
+        for line in lines:
+            line_no += 1
+            if len(line) > max_line:
+                raise _too_long(line_no, max_line)
+            if line.strip():
+                yield line_no, line
+        if len(buffer) > max_line:
+            raise _too_long(line_no + 1, max_line)
+    if buffer.strip():
+        yield line_no + 1, buffer
+
+
+async def iter_csv(
+    chunks: AsyncIterable[bytes],
+) -> AsyncIterator[tuple[int, dict[str, str]]]:
+    """Yield (line number, row) from a streamed CSV with a header line.
+
+    One record per line (no newlines inside quoted cells), empty cells
+    are left out of the row.
+    """
+    header = None
+    async for line_no, line in iter_lines(chunks):
+        (values,) = csv.reader([line.decode("utf-8-sig", errors="replace")])
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        yield line_no, {name: value for name, value in zip(header, values) if value}
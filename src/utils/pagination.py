@@ -0,0 +1,20 @@
+import base64
+import json
+from typing import Any
+
+
+def encode_cursor(*values: Any) -> str:
+    """Opaque keyset cursor from the sort key of the last returned row"""
+    raw = json.dumps(values, default=str, separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> list:
+    """Raises ValueError on anything encode_cursor didn't produce"""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, UnicodeDecodeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if not isinstance(values, list):
+        raise ValueError("Malformed cursor")
+    return values
@@ -0,0 +1,120 @@
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, NamedTuple, Protocol
+from fastapi import HTTPException, Request, status
+from src.monitoring.metrics import Counter
+from src.utils.settings import settings
+
+
+rate_limited = Counter("rate_limited_total", "Requests rejected by a rate limit")
+
+
+class Limit(NamedTuple):
+    name: str
+    burst: int
+    per_second: float
+
+
+class BucketStore(Protocol):
+    """Token buckets, `take` returns 0 when allowed or the seconds until it would be"""
+
+    async def take(self, key: str, limit: Limit) -> float:
+        ...
+
+
+class MemoryBucketStore:
+    """Process-local buckets, every worker enforces the limits on its own.
+
+    The least recently used buckets are dropped beyond `maxsize` keys,
+    which is the same as refilling them.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+        self._lock = Lock()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated = self._buckets.pop(key, (limit.burst, now))
+            tokens = min(limit.burst, tokens + (now - updated) * limit.per_second)
+            retry_after = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                retry_after = (1 - tokens) / limit.per_second
+            self._buckets[key] = (tokens, now)
+            while len(self._buckets) > self.maxsize:
+                self._buckets.popitem(last=False)
+        return retry_after
+
+
+# KEYS[1] bucket, ARGV: burst, tokens per second, now; returns the wait in ms
+TAKE_SCRIPT = """
+local burst, rate, now = tonumber(ARGV[1]), tonumber(ARGV[2]), tonumber(ARGV[3])
+local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(bucket[1]) or burst
+local updated = tonumber(bucket[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= 1 then tokens = tokens - 1 else wait = (1 - tokens) / rate end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated', now)
+redis.call('EXPIRE', KEYS[1], math.ceil(burst / rate) + 1)
+return math.ceil(wait * 1000)
+"""
+
+
+class RedisBucketStore:
+    """Buckets shared by all workers, updated atomically by a Lua script"""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    async def take(self, key: str, limit: Limit) -> float:
+        wait_ms = await self.client.eval(
+            TAKE_SCRIPT, 1, f"rate:{key}", limit.burst, limit.per_second, time.time()
+        )
+        return int(wait_ms) / 1000
+
+
+class RateLimiter:
+    def __init__(self, store: BucketStore) -> None:
+        self.store = store
+
+    async def check(self, limit: Limit, value: str) -> None:
+        """Take a token from the bucket of `value`, 429 with Retry-After when empty"""
+        retry_after = await self.store.take(f"{limit.name}:{value}", limit)
+        if retry_after > 0:
+            rate_limited.inc(limit=limit.name)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests, retry later",
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+
+
+def create_bucket_store() -> BucketStore:
+    if settings.rate_limit_backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RATE_LIMIT_BACKEND=redis needs the redis package") from e
+        return RedisBucketStore(redis.from_url(settings.redis_url))
+    return MemoryBucketStore(settings.rate_limit_size)
+
+
+rate_limiter = RateLimiter(create_bucket_store())
+
+auth_ip_limit = Limit(
+    "auth_ip", settings.auth_ip_burst, settings.auth_ip_per_minute / 60
+)
+auth_email_limit = Limit(
+    "auth_email", settings.auth_email_burst, settings.auth_email_per_minute / 60
+)
+
+
+async def limit_auth_ip(request: Request) -> None:
+    """Dependency of the auth routes, every attempt costs a bcrypt computation"""
+    await rate_limiter.check(auth_ip_limit, request.client.host if request.client else "-")
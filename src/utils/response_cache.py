@@ -0,0 +1,182 @@
+import hashlib
+from typing import Any, NamedTuple, Protocol
+from fastapi import Request, Response, status
+from src.monitoring.metrics import Counter, Gauge
+from src.utils.cache import TTLCache
+from src.utils.settings import settings
+
+
+response_cache_requests = Counter(
+    "response_cache_requests_total", "Serialized response cache lookups"
+)
+
+
+class CacheStore(Protocol):
+    """The subset of the Redis command set the response cache relies on"""
+
+    async def get(self, key: str) -> bytes | None:
+        ...
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> Any:
+        ...
+
+    async def incr(self, key: str) -> int:
+        ...
+
+
+class NullStore:
+    """Caches nothing, every ETag is of version 0"""
+
+    async def get(self, key: str) -> bytes | None:
+        return None
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        pass
+
+    async def incr(self, key: str) -> int:
+        return 0
+
+
+class MemoryStore:
+    """Process-local store, versions are not shared between workers.
+
+    Only right for a single worker: a write on one worker would leave the
+    others serving the old responses, under other ETags, for the whole TTL.
+    """
+
+    def __init__(self, maxsize: int, ttl: float) -> None:
+        self.values = TTLCache("response_store", maxsize, ttl)
+        self.counters: dict[str, int] = {}
+
+    async def get(self, key: str) -> bytes | None:
+        if key in self.counters:
+            return str(self.counters[key]).encode()
+        return self.values.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        self.values.set(key, value, ttl=ex)
+
+    async def incr(self, key: str) -> int:
+        self.counters[key] = self.counters.get(key, 0) + 1
+        return self.counters[key]
+
+
+class RedisStore:
+    """Any redis.asyncio-compatible client (or a fake with the same methods)"""
+
+    def __init__(self, client: Any) -> None:
+        self.client = client
+
+    async def get(self, key: str) -> bytes | None:
+        return await self.client.get(key)
+
+    async def set(self, key: str, value: bytes, ex: int | None = None) -> None:
+        await self.client.set(key, value, ex=ex)
+
+    async def incr(self, key: str) -> int:
+        return await self.client.incr(key)
+
+
+class CacheKey(NamedTuple):
+    namespace: str
+    version: str
+    key: str
+
+
+def etag_matches(if_none_match: str, etag: str) -> bool:
+    """If-None-Match lists the client's tags: `*` or one equal to `etag`,
+    compared weakly (a `W/` prefix is ignored)"""
+    etag = etag.removeprefix("W/")
+    for tag in if_none_match.split(","):
+        tag = tag.strip()
+        if tag == "*" or tag.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class CachedResponse:
+    def __init__(self, etag: str, body: bytes) -> None:
+        self.etag = etag
+        self.body = body
+
+    def encode(self) -> bytes:
+        return self.etag.encode() + b"\n" + self.body
+
+    @classmethod
+    def decode(cls, raw: bytes) -> "CachedResponse":
+        etag, body = raw.split(b"\n", 1)
+        return cls(etag.decode(), body)
+
+    def response(self, request: Request, max_age: int) -> Response:
+        """200 with the cached body, or 304 if the client already has it"""
+        headers = {"ETag": self.etag, "Cache-Control": f"public, max-age={max_age}"}
+        if etag_matches(request.headers.get("if-none-match", ""), self.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+class ResponseCache:
+    """Serialized JSON keyed by namespace version + query string.
+
+    Writes bump the namespace version, entries of older versions are
+    never read again and age out of the store.
+    """
+
+    def __init__(self, store: CacheStore, ttl: int) -> None:
+        self.store = store
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        Gauge("response_cache_hit_ratio", "Response cache hit ratio", self.hit_ratio)
+
+    def hit_ratio(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    async def key(self, namespace: str, request: Request) -> CacheKey:
+        """Read the version before querying, a write racing the query then
+        stores its result under a version nobody reads anymore"""
+        version = (await self.store.get(f"{namespace}:version") or b"0").decode()
+        query = "&".join(sorted(request.url.query.split("&")))
+        return CacheKey(
+            namespace, version, f"{namespace}:{version}:{request.url.path}?{query}"
+        )
+
+    async def get(self, key: CacheKey) -> CachedResponse | None:
+        raw = await self.store.get(key.key)
+        if raw is None:
+            self.misses += 1
+            response_cache_requests.inc(namespace=key.namespace, result="miss")
+            return None
+        self.hits += 1
+        response_cache_requests.inc(namespace=key.namespace, result="hit")
+        return CachedResponse.decode(raw)
+
+    async def set(
+        self, key: CacheKey, body: bytes, ttl: int | None = None
+    ) -> CachedResponse:
+        """Store for `ttl` seconds (capped at the cache's), not at all for 0"""
+        digest = hashlib.blake2b(body, digest_size=8).hexdigest()
+        cached = CachedResponse(f'"{key.version}-{digest}"', body)
+        ttl = self.ttl if ttl is None else min(ttl, self.ttl)
+        if ttl > 0:
+            await self.store.set(key.key, cached.encode(), ex=ttl)
+        return cached
+
+    async def bump(self, namespace: str) -> None:
+        await self.store.incr(f"{namespace}:version")
+
+
+def create_store() -> CacheStore:
+    if settings.response_cache_backend == "redis":
+        try:
+            import redis.asyncio as redis
+        except ImportError as e:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the redis package") from e
+        return RedisStore(redis.from_url(settings.redis_url))
+    if settings.response_cache_backend == "off":
+        return NullStore()
+    return MemoryStore(settings.response_cache_size, settings.response_cache_ttl)
+
+
+response_cache = ResponseCache(create_store(), settings.response_cache_ttl)
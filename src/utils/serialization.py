@@ -0,0 +1,90 @@
+import asyncio
+import functools
+from inspect import isclass
+from typing import Any, Callable, get_args, get_origin
+from fastapi import FastAPI, Response
+from fastapi.routing import APIRoute, request_response
+from pydantic import BaseModel, TypeAdapter
+from src.monitoring.profiling import span
+
+
+def _is_validated(value: Any, annotation: Any) -> bool:
+    """Already an instance of the response model (or a list of them)"""
+    if get_origin(annotation) is list:
+        (item,) = get_args(annotation)
+        return (
+            isclass(item)
+            and issubclass(item, BaseModel)
+            and isinstance(value, list)
+            and all(isinstance(element, item) for element in value)
+        )
+    return isclass(annotation) and issubclass(annotation, BaseModel) and isinstance(
+        value, annotation
+    )
+
+
+def _render(
+    value: Any, annotation: Any, adapter: TypeAdapter, kwargs: dict, status_code: int
+) -> Any:
+    if isinstance(value, Response):
+        return value
+    with span("serialize"):
+        if not _is_validated(value, annotation):
+            # ORM objects and plain dicts still go through the response model once
+            value = adapter.validate_python(value, from_attributes=True)
+        body = adapter.dump_json(value, by_alias=True)
+    response = Response(body, status_code=status_code, media_type="application/json")
+    # an endpoint's own `response: Response` parameter, as FastAPI merges it
+    for argument in kwargs.values():
+        if isinstance(argument, Response):
+            if argument.status_code:
+                response.status_code = argument.status_code
+            response.headers.raw.extend(argument.headers.raw)
+    return response
+
+
+def _fast_call(route: APIRoute) -> Callable:
+    call = route.dependant.call
+    annotation = route.response_model
+    adapter = TypeAdapter(annotation)
+    status_code = route.status_code or 200
+
+    if asyncio.iscoroutinefunction(call):
+
+        @functools.wraps(call)
+        async def fast(**kwargs):
+            result = await call(**kwargs)
+            return _render(result, annotation, adapter, kwargs, status_code)
+
+    else:
+
+        @functools.wraps(call)
+        def fast(**kwargs):
+            return _render(call(**kwargs), annotation, adapter, kwargs, status_code)
+
+    return fast
+
+
+def use_fast_serialization(app: FastAPI) -> None:
+    """Serialize response models straight to JSON bytes.
+
+    FastAPI re-validates every returned value against `response_model`,
+    dumps it to python objects and then json.dumps them. Here each route
+    gets a TypeAdapter built once, values that already are response model
+    instances skip validation and are dumped by pydantic-core directly.
+    Routes with include/exclude options keep the default path.
+    """
+    for route in app.routes:
+        if (
+            not isinstance(route, APIRoute)
+            or route.response_model is None
+            or route.response_model_include is not None
+            or route.response_model_exclude is not None
+            or route.response_model_exclude_unset
+            or route.response_model_exclude_defaults
+            or route.response_model_exclude_none
+            or not route.response_model_by_alias
+        ):
+            continue
+        route.dependant.call = _fast_call(route)
+        route.app = request_response(route.get_route_handler())
@@ -1,3 +1,5 @@
+import os
+from typing import Literal, Optional
 from pydantic import Field
 from pydantic_settings import BaseSettings
 
@@ -9,14 +11,330 @@ class Settings(BaseSettings):
     postgres_port_number: int = Field(5432, env="POSTGRES_PORT_NUMBER")
     postgres_db: str = Field(..., env="POSTGRES_DB")
 
+    database_url: Optional[str] = Field(
+        None,
+        description="Overrides postgres_* settings, e.g. sqlite:///./dev.db",
+        alias="DATABASE_URL",
+    )
+    database_replica_urls: str = Field(
+        "",
+        description="Comma separated read replica urls, read-only repository methods use them",
+        alias="DATABASE_REPLICA_URLS",
+    )
+    db_replica_check_interval: float = Field(
+        5, description="Seconds between replica health checks", alias="DB_REPLICA_CHECK_INTERVAL"
+    )
+    db_replica_max_lag: float = Field(
+        10,
+        description="Seconds of replication lag after which a replica gets no reads",
+        alias="DB_REPLICA_MAX_LAG",
+    )
+    db_replica_sticky_seconds: float = Field(
+        10,
+        description="Seconds a client reads from the primary after committing a write "
+        "(a signed cookie, per worker for clients without cookies)",
+        alias="DB_REPLICA_STICKY_SECONDS",
+    )
+    db_async: bool = Field(
+        True,
+        description="Use AsyncEngine/AsyncSession instead of the sync driver",
+        alias="DB_ASYNC",
+    )
+    db_schema: Literal["migrations", "create_all"] = Field(
+        "migrations",
+        description="migrations: check (or apply) alembic revisions, create_all: dev/tests",
+        alias="DB_SCHEMA",
+    )
+    db_migrate_on_startup: bool = Field(
+        False,
+        description="Apply pending migrations at startup instead of refusing to start",
+        alias="DB_MIGRATE_ON_STARTUP",
+    )
+    db_connect_timeout: float = Field(
+        30, description="Seconds startup waits for the database", alias="DB_CONNECT_TIMEOUT"
+    )
+    db_pool_prefill: int = Field(
+        2, ge=0, description="Connections opened at startup", alias="DB_POOL_PREFILL"
+    )
+    db_connection_budget: Optional[int] = Field(
+        None,
+        ge=1,
+        description="Connections all workers may open together, overrides pool size/overflow",
+        alias="DB_CONNECTION_BUDGET",
+    )
+    db_pool_size: int = Field(10, ge=1, alias="DB_POOL_SIZE")
+    db_max_overflow: int = Field(10, ge=0, alias="DB_MAX_OVERFLOW")
+    db_pool_recycle: int = Field(
+        1800,
+        description="Seconds after which a pooled connection is replaced",
+        alias="DB_POOL_RECYCLE",
+    )
+    db_pool_timeout: float = Field(
+        10,
+        description="Seconds a request waits for a free connection",
+        alias="DB_POOL_TIMEOUT",
+    )
+
     access_token_expire_minutes: int = Field(
-        60 * 60 * 24,
-        description="Access token expire time",
+        15,
+        ge=1,
+        description="Access token expire time, clients renew it with the refresh token",
         alias="ACCESS_TOKEN_EXPIRE_MINUTES",
     )
+    refresh_token_expire_days: int = Field(
+        30, ge=1, description="Refresh token expire time", alias="REFRESH_TOKEN_EXPIRE_DAYS"
+    )
+    revocation_sync_interval: float = Field(
+        2,
+        gt=0,
+        description="Seconds before a token revoked on another worker is refused here",
+        alias="REVOCATION_SYNC_INTERVAL",
+    )
+
+    bcrypt_rounds: int = Field(
+        12,
+        ge=4,
+        le=31,
+        description="bcrypt cost, hashes with another cost are upgraded on login",
+        alias="BCRYPT_ROUNDS",
+    )
+    password_hash_executor: Literal["thread", "process"] = Field(
+        "thread", alias="PASSWORD_HASH_EXECUTOR"
+    )
+    password_hash_workers: int = Field(
+        os.cpu_count() or 1, ge=1, alias="PASSWORD_HASH_WORKERS"
+    )
+    password_hash_queue_size: int = Field(
+        64,
+        ge=0,
+        description="Hashing jobs allowed to wait for a worker before 429",
+        alias="PASSWORD_HASH_QUEUE_SIZE",
+    )
+
+    auth_cache_size: int = Field(
+        10_000, ge=1, description="Users/tokens kept in memory", alias="AUTH_CACHE_SIZE"
+    )
+    auth_cache_ttl: float = Field(
+        60,
+        description="Seconds a cached user may be served without the database",
+        alias="AUTH_CACHE_TTL",
+    )
+
+    rate_limit_backend: Literal["memory", "redis"] = Field(
+        "memory",
+        description="redis shares the buckets between workers",
+        alias="RATE_LIMIT_BACKEND",
+    )
+    rate_limit_size: int = Field(
+        100_000, ge=1, description="Buckets kept in memory", alias="RATE_LIMIT_SIZE"
+    )
+    auth_ip_burst: int = Field(20, ge=1, alias="AUTH_IP_BURST")
+    auth_ip_per_minute: float = Field(
+        20, gt=0, description="Signups/logins per client address", alias="AUTH_IP_PER_MINUTE"
+    )
+    auth_email_burst: int = Field(5, ge=1, alias="AUTH_EMAIL_BURST")
+    auth_email_per_minute: float = Field(
+        5, gt=0, description="Login attempts per email", alias="AUTH_EMAIL_PER_MINUTE"
+    )
+    admission_max_concurrency: int = Field(
+        256,
+        ge=1,
+        description="Requests a worker serves at once",
+        alias="ADMISSION_MAX_CONCURRENCY",
+    )
+    admission_max_wait: float = Field(
+        0.5,
+        ge=0,
+        description="Seconds a request waits for a slot before 503",
+        alias="ADMISSION_MAX_WAIT",
+    )
+
+    search_index_ttl: float = Field(
+        300,
+        description="Seconds before the in-process (non-Postgres) search index is rebuilt",
+        alias="SEARCH_INDEX_TTL",
+    )
+
+    matching_refresh_ttl: float = Field(
+        600,
+        description="Seconds before the teammate matching matrix is rebuilt from scratch",
+        alias="MATCHING_REFRESH_TTL",
+    )
+
+    response_cache_backend: Literal["memory", "redis", "off"] = Field(
+        "memory",
+        description="redis shares cached responses and versions between workers, "
+        "memory is per process and turned off when running several workers",
+        alias="RESPONSE_CACHE_BACKEND",
+    )
+    redis_url: str = Field("redis://localhost:6379/0", alias="REDIS_URL")
+    response_cache_size: int = Field(
+        10_000, ge=1, description="Responses kept in memory", alias="RESPONSE_CACHE_SIZE"
+    )
+    response_cache_ttl: int = Field(
+        300,
+        ge=1,
+        description="Seconds a serialized response is kept by the server",
+        alias="RESPONSE_CACHE_TTL",
+    )
+    hackathon_cache_max_age: int = Field(
+        30,
+        ge=0,
+        description="Cache-Control max-age of public hackathon reads",
+        alias="HACKATHON_CACHE_MAX_AGE",
+    )
+
+    events_backend: Literal["memory", "postgres", "off"] = Field(
+        "memory",
+        description="postgres delivers events to the streams of every worker via "
+        "LISTEN/NOTIFY, memory to those of one, off refuses streams",
+        alias="EVENTS_BACKEND",
+    )
+    events_queue_size: int = Field(
+        64,
+        ge=1,
+        description="Events a stream may fall behind before it is dropped",
+        alias="EVENTS_QUEUE_SIZE",
+    )
+    events_history: int = Field(
+        1000, ge=0, description="Recent events kept to resume streams", alias="EVENTS_HISTORY"
+    )
+    events_heartbeat: float = Field(
+        15, gt=0, description="Seconds between keep-alive comments", alias="EVENTS_HEARTBEAT"
+    )
+    events_max_subscribers: int = Field(
+        20_000,
+        ge=1,
+        description="Event streams a worker keeps open",
+        alias="EVENTS_MAX_SUBSCRIBERS",
+    )
+
+    idempotency_ttl: float = Field(
+        24 * 60 * 60,
+        gt=0,
+        description="Seconds a response is replayed for retries with the same Idempotency-Key",
+        alias="IDEMPOTENCY_TTL",
+    )
+    idempotency_lock_timeout: float = Field(
+        60,
+        gt=0,
+        description="Seconds after which a key whose request never finished can be reused",
+        alias="IDEMPOTENCY_LOCK_TIMEOUT",
+    )
+    idempotency_wait: float = Field(
+        10,
+        ge=0,
+        description="Seconds a duplicate waits for the first request before 409",
+        alias="IDEMPOTENCY_WAIT",
+    )
+    idempotency_max_body: int = Field(
+        1024 * 1024,
+        ge=0,
+        description="Bytes of body buffered for a request with an Idempotency-Key",
+        alias="IDEMPOTENCY_MAX_BODY",
+    )
+    idempotency_cleanup_interval: float = Field(
+        600,
+        gt=0,
+        description="Seconds between deletions of expired idempotency keys",
+        alias="IDEMPOTENCY_CLEANUP_INTERVAL",
+    )
+
+    fast_json: bool = Field(
+        False,
+        description="orjson responses, response models dumped without re-validation",
+        alias="FAST_JSON",
+    )
+
+    server_timing: bool = Field(
+        True,
+        description="Send per-stage timings in the Server-Timing response header",
+        alias="SERVER_TIMING",
+    )
+    n_plus_one_threshold: int = Field(
+        10,
+        ge=1,
+        description="Warn when a request repeats one statement more often",
+        alias="N_PLUS_ONE_THRESHOLD",
+    )
+
+    telegram_bot_token: Optional[str] = Field(
+        None, description="Bot sending the notifications", alias="TELEGRAM_BOT_TOKEN"
+    )
+    telegram_api_url: str = Field(
+        "https://api.telegram.org", alias="TELEGRAM_API_URL"
+    )
+    notify_reminder_hours: str = Field(
+        "24,1",
+        description="Comma separated hours before registration_finish to remind at",
+        alias="NOTIFY_REMINDER_HOURS",
+    )
+    notify_concurrency: int = Field(
+        100, ge=1, description="Messages in flight to Telegram", alias="NOTIFY_CONCURRENCY"
+    )
+    notify_batch_size: int = Field(
+        100,
+        ge=1,
+        description="Outbox rows claimed at once, at most this many are resent after a crash",
+        alias="NOTIFY_BATCH_SIZE",
+    )
+    notify_rate: float = Field(
+        30, gt=0, description="Messages per second for the whole bot", alias="NOTIFY_RATE"
+    )
+    notify_chat_rate: float = Field(
+        1, gt=0, description="Messages per second to one chat", alias="NOTIFY_CHAT_RATE"
+    )
+    notify_max_attempts: int = Field(8, ge=1, alias="NOTIFY_MAX_ATTEMPTS")
+    notify_lease: float = Field(
+        60,
+        gt=0,
+        description="Seconds a claimed message stays invisible to other workers",
+        alias="NOTIFY_LEASE",
+    )
+    notify_rescan_interval: float = Field(
+        60,
+        gt=0,
+        description="Seconds between reloads of the upcoming registration deadlines",
+        alias="NOTIFY_RESCAN_INTERVAL",
+    )
+    notify_metrics_port: int = Field(
+        9100,
+        ge=0,
+        description="Port of the notification worker's /metrics, 0 turns it off",
+        alias="NOTIFY_METRICS_PORT",
+    )
+
+    log_level: Literal["DEBUG", "INFO", "WARNING", "ERROR"] = Field(
+        "INFO", alias="LOG_LEVEL"
+    )
+    log_format: Literal["json", "text"] = Field("json", alias="LOG_FORMAT")
+    log_debug_sample_rate: float = Field(
+        0.1,
+        ge=0,
+        le=1,
+        description="Share of DEBUG records written, higher levels are never sampled",
+        alias="LOG_DEBUG_SAMPLE_RATE",
+    )
+    log_queue_size: int = Field(
+        10_000,
+        ge=1,
+        description="Records buffered for the writer thread before new ones are dropped",
+        alias="LOG_QUEUE_SIZE",
+    )
+
+    web_host: str = Field("0.0.0.0", alias="WEB_HOST")
+    web_port: int = Field(9999, alias="WEB_PORT")
+    web_workers: int = Field(
+        os.cpu_count() or 1, ge=1, description="Server processes", alias="WEB_WORKERS"
+    )
+    web_graceful_timeout: float = Field(
+        30,
+        description="Seconds in-flight requests get to finish on shutdown",
+        alias="WEB_GRACEFUL_TIMEOUT",
+    )
 
     secret_key: str = Field(..., alias="SECRET_KEY")
     algorithm: str = Field("HS256", alias="ALGORITHM")
 
 
-settings = Settings(_env_file=".env")
\ No newline at end of file
+settings = Settings(_env_file=".env")
@@ -0,0 +1,118 @@
+"""The app runs in-process against a throwaway SQLite database.
+
+Settings are read from the environment when `src` is first imported,
+so they are set here before anything else.
+"""
+import os
+import tempfile
+
+DB_PATH = os.path.join(tempfile.mkdtemp(prefix="itam-tests-"), "tests.db")
+
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{DB_PATH}?timeout=60")
+os.environ.setdefault("POSTGRES_USER", "tests")
+os.environ.setdefault("POSTGRES_PASSWORD", "tests")
+os.environ.setdefault("POSTGRES_DB", "tests")
+os.environ.setdefault("SECRET_KEY", "tests-secret")
+os.environ.setdefault("DB_SCHEMA", "create_all")
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+os.environ.setdefault("AUTH_IP_BURST", "1000000000")
+os.environ.setdefault("AUTH_EMAIL_BURST", "1000000000")
+
+import uuid  # noqa: E402
+from datetime import datetime, timedelta  # noqa: E402
+
+import httpx  # noqa: E402
+import pytest  # noqa: E402
+from src.app import create_app  # noqa: E402
+from src.auth.jwt import create_access_jwt, get_password_hash  # noqa: E402
+from sqlalchemy import select  # noqa: E402
+from src.data.sql import SQLManager  # noqa: E402
+from src.hackathon.domain import HackathonCreate, PrizeType  # noqa: E402
+from src.hackathon.model import Hackathon  # noqa: E402
+from src.hackathon.repository import HackathonRepository  # noqa: E402
+from src.user.domain import UserImport  # noqa: E402
+from src.user.repository import UserRepository  # noqa: E402
+
+PASSWORD = "tests123456"
+
+
+@pytest.fixture(scope="session")
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture
+async def client():
+    """In-process client, the app's lifespan runs around it like under uvicorn"""
+    app = create_app()
+    async with app.router.lifespan_context(app):
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://tests"
+        ) as http:
+            yield http
+
+
+@pytest.fixture(scope="session")
+def password_hash() -> str:
+    return get_password_hash(PASSWORD)
+
+
+@pytest.fixture
+def make_users(client, password_hash):
+    """Creates users with student info, skills and a Telegram account, returns their ids"""
+
+    async def make(count: int, role: str = "student", **fields) -> list[int]:
+        prefix = uuid.uuid4().hex[:8]
+        rows = [
+            UserImport(
+                email=f"{prefix}{i}@tests.test",
+                password_hash=password_hash,
+                first_name="Имя",
+                last_name="Фамилия",
+                internal_role=role,
+                graduation_year=2026,
+                major="Математика",
+                faculty="ИТКН",
+                tg_id=abs(hash(prefix)) % 10**9 * 1000 + i,
+                tg_first_name="Имя",
+                skills=["Python", "SQL"],
+                roles=["backend"],
+                **fields,
+            )
+            for i in range(count)
+        ]
+        async with SQLManager().session() as session:
+            return await UserRepository(session).add_many(rows)
+
+    return make
+
+
+@pytest.fixture
+def make_hackathon(client):
+    """Creates a hackathon open for registration, returns its id"""
+
+    async def make(
+        team_maximum_size: int = 5,
+        registration_finish: datetime | None = None,
+        tag: str = "tests",
+    ) -> int:
+        title = uuid.uuid4().hex
+        hackathon = HackathonCreate(
+            title=title,
+            registration_finish=registration_finish or datetime.now() + timedelta(days=1),
+            team_minimum_size=1,
+            team_maximum_size=team_maximum_size,
+            prize_type=PrizeType.money,
+            money_prize=1000,
+            tags=[{"tag": tag}],
+        )
+        async with SQLManager().session() as session:
+            repository = HackathonRepository(session)
+            await repository.add([hackathon])
+            return await repository._first(select(Hackathon.id).where(Hackathon.title == title))
+
+    return make
+
+
+def auth(user_id: int) -> dict:
+    return {"Authorization": f"Bearer {create_access_jwt(user_id)}"}
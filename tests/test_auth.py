@@ -0,0 +1,146 @@
+import time
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+from sqlalchemy import update
+from src.auth.jwt import create_access_jwt
+from src.auth.model import RefreshToken
+from src.auth.repository import refresh_reused
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.utils.settings import settings
+from tests.conftest import PASSWORD
+
+pytestmark = pytest.mark.anyio
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def forged(user_id: int, issued_at: float, version: int) -> str:
+    """A validly signed token whose issue time comes from another clock"""
+    claims = {
+        "sub": str(user_id),
+        "jti": uuid.uuid4().hex,
+        "iat": issued_at,
+        "exp": time.time() + 600,
+        "ver": version,
+    }
+    return jwt.encode(claims, settings.secret_key, algorithm=settings.algorithm)
+
+
+async def signup(client) -> tuple[dict, dict]:
+    """Credentials and tokens of a new user"""
+    credentials = {"email": f"{uuid.uuid4().hex[:8]}@tests.test", "password": PASSWORD}
+    response = await client.post(
+        "/auth/signup", json={**credentials, "first_name": "Имя", "last_name": "Фамилия"}
+    )
+    assert response.status_code == 201
+    return credentials, response.json()
+
+
+async def refresh(client, token: str):
+    return await client.post("/auth/refresh", json={"refresh_token": token})
+
+
+async def test_logout_everywhere_goes_by_version_not_clock(client):
+    credentials, tokens = await signup(client)
+    me = await client.get("/api/v1/users/me", headers=bearer(tokens["access_token"]))
+    assert me.status_code == 200
+    user_id = me.json()["id"]
+
+    response = await client.post("/auth/logout/all", headers=bearer(tokens["access_token"]))
+    assert response.status_code == 204
+    for token in (
+        tokens["access_token"],
+        # issued by a worker whose clock runs ahead
+        forged(user_id, time.time() + 3600, version=0),
+        create_access_jwt(user_id),
+    ):
+        response = await client.get("/api/v1/users/me", headers=bearer(token))
+        assert response.status_code == 401
+    refresh = await client.post("/auth/refresh", json={"refresh_token": tokens["refresh_token"]})
+    assert refresh.status_code == 401
+
+    login = await client.post("/auth/login", json=credentials)
+    assert login.status_code == 200
+    for token in (
+        login.json()["access_token"],
+        # issued after the logout by a worker whose clock runs behind
+        forged(user_id, time.time() - 3600, version=1),
+    ):
+        response = await client.get("/api/v1/users/me", headers=bearer(token))
+        assert response.status_code == 200
+
+
+async def test_refresh_tokens_are_single_use(client):
+    credentials, tokens = await signup(client)
+    other = (await client.post("/auth/login", json=credentials)).json()
+
+    rotated = await refresh(client, tokens["refresh_token"])
+    assert rotated.status_code == 200
+    assert rotated.headers["cache-control"] == "no-store"
+    rotated = rotated.json()
+    assert rotated["refresh_token"] != tokens["refresh_token"]
+    response = await client.get("/api/v1/users/me", headers=bearer(rotated["access_token"]))
+    assert response.status_code == 200
+
+    # a spent token presented again is taken as stolen: its family goes
+    reused = refresh_reused.values.get((), 0)
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+    assert refresh_reused.values[()] == reused + 1
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 401
+    # the user's other sessions stay
+    assert (await refresh(client, other["refresh_token"])).status_code == 200
+
+
+async def test_invalid_refresh_tokens(client):
+    _, tokens = await signup(client)
+    token_id, _, secret = tokens["refresh_token"].partition(".")
+    for token in ("garbage", f"{uuid.uuid4().hex}.{secret}", f"{token_id}.{'0' * len(secret)}"):
+        assert (await refresh(client, token)).status_code == 401
+    # wrong secrets don't spend nor revoke the token
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 200
+
+    _, tokens = await signup(client)
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        await repository._execute(
+            update(RefreshToken)
+            .where(RefreshToken.id == tokens["refresh_token"].partition(".")[0])
+            .values(expires_at=datetime.utcnow() - timedelta(seconds=1))
+        )
+        await repository._commit()
+    assert (await refresh(client, tokens["refresh_token"])).status_code == 401
+
+
+async def test_logout_revokes_access_and_refresh_family(client):
+    credentials, tokens = await signup(client)
+    other = (await client.post("/auth/login", json=credentials)).json()
+    rotated = (await refresh(client, tokens["refresh_token"])).json()
+    _, stranger = await signup(client)
+
+    response = await client.post(
+        "/auth/logout",
+        headers=bearer(rotated["access_token"]),
+        json={"refresh_token": rotated["refresh_token"]},
+    )
+    assert response.status_code == 204
+    response = await client.get("/api/v1/users/me", headers=bearer(rotated["access_token"]))
+    assert response.status_code == 401
+    assert (await refresh(client, rotated["refresh_token"])).status_code == 401
+    response = await client.get("/api/v1/users/me", headers=bearer(other["access_token"]))
+    assert response.status_code == 200
+    assert (await refresh(client, other["refresh_token"])).status_code == 200
+
+    # another user's refresh token is not theirs to revoke
+    response = await client.post(
+        "/auth/logout",
+        headers=bearer(other["access_token"]),
+        json={"refresh_token": stranger["refresh_token"]},
+    )
+    assert response.status_code == 204
+    assert (await refresh(client, stranger["refresh_token"])).status_code == 200
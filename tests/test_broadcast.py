@@ -0,0 +1,90 @@
+import pytest
+from src.utils.broadcast import (
+    EVICTED,
+    Broadcaster,
+    MemoryBackend,
+    NullBackend,
+    StreamsOff,
+    SubscribersFull,
+    _stream,
+    event_stream_response,
+    events_evicted,
+)
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def broadcaster():
+    broadcaster = Broadcaster(
+        MemoryBackend(), queue_size=2, history=3, heartbeat=3600, max_subscribers=3
+    )
+    await broadcaster.start()
+    yield broadcaster
+    await broadcaster.stop()
+
+
+async def publish(broadcaster: Broadcaster, count: int) -> list[str]:
+    """Publishes `count` events, returns their ids"""
+    listener, _ = broadcaster.subscribe("tests")
+    ids = []
+    for i in range(count):
+        await broadcaster.publish("tests", "created", {"ids": [i]})
+        ids.append(listener.queue.get_nowait().id)
+    broadcaster.unsubscribe(listener)
+    return ids
+
+
+async def test_full_queue_is_evicted(broadcaster):
+    stalled, _ = broadcaster.subscribe("tests")
+    reading, _ = broadcaster.subscribe("tests")
+    evicted = events_evicted.values.get((("channel", "tests"),), 0)
+    for i in range(3):
+        await broadcaster.publish("tests", "created", {"ids": [i]})
+        reading.queue.get_nowait()
+
+    assert stalled.queue.get_nowait() is EVICTED
+    assert stalled.queue.empty()
+    assert broadcaster.subscribers == 1
+    assert events_evicted.values[(("channel", "tests"),)] == evicted + 1
+    await broadcaster.publish("tests", "created", {"ids": [3]})
+    assert stalled.queue.empty()
+    assert reading.queue.get_nowait().data == '{"ids": [3]}'
+
+
+async def test_resume_after_last_event_id(broadcaster):
+    ids = await publish(broadcaster, 3)
+    subscription, replay = broadcaster.subscribe("tests", ids[0])
+    assert [event.id for event in replay] == ids[1:]
+    broadcaster.unsubscribe(subscription)
+    subscription, replay = broadcaster.subscribe("tests", ids[-1])
+    assert replay == []
+    broadcaster.unsubscribe(subscription)
+
+
+async def test_resume_from_a_lost_event_resets(broadcaster):
+    ids = await publish(broadcaster, 5)
+    for last_event_id in (ids[0], "unknown"):
+        subscription, replay = broadcaster.subscribe("tests", last_event_id)
+        assert replay is None
+        broadcaster.unsubscribe(subscription)
+
+    stream = _stream(broadcaster, "tests", ids[1])
+    assert await stream.__anext__() == b"retry: 3000\n\n"
+    assert await stream.__anext__() == b"event: reset\ndata: {}\n\n"
+    await stream.aclose()
+    assert broadcaster.subscribers == 0
+
+
+async def test_streams_refused(broadcaster):
+    subscriptions = [broadcaster.subscribe("tests")[0] for _ in range(3)]
+    with pytest.raises(type(SubscribersFull)) as e:
+        event_stream_response(broadcaster, "tests", None)
+    assert e.value is SubscribersFull
+    for subscription in subscriptions:
+        broadcaster.unsubscribe(subscription)
+
+    off = Broadcaster(NullBackend(), 2, 3, 3600, 3)
+    with pytest.raises(type(StreamsOff)) as e:
+        event_stream_response(off, "tests", None)
+    assert e.value is StreamsOff
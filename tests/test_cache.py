@@ -0,0 +1,95 @@
+import asyncio
+
+import pytest
+from src.utils.cache import TTLCache
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+class Loader:
+    def __init__(self, value="value", error: Exception | None = None) -> None:
+        self.value = value
+        self.error = error
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self):
+        self.calls += 1
+        await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+async def settle() -> None:
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+async def test_concurrent_misses_share_one_load():
+    cache = TTLCache("tests", 10, 60)
+    load = Loader()
+    gets = [asyncio.create_task(cache.get_or_load(1, load)) for _ in range(20)]
+    await settle()
+    load.release.set()
+    assert await asyncio.gather(*gets) == ["value"] * 20
+    assert load.calls == 1
+    assert cache.get(1) == "value"
+
+
+async def test_load_error_reaches_every_waiter():
+    cache = TTLCache("tests", 10, 60)
+    load = Loader(error=LookupError("gone"))
+    gets = [asyncio.create_task(cache.get_or_load(1, load)) for _ in range(3)]
+    await settle()
+    load.release.set()
+    results = await asyncio.gather(*gets, return_exceptions=True)
+    assert all(isinstance(result, LookupError) for result in results)
+    assert load.calls == 1
+    assert cache.get(1) is None
+
+
+async def test_waiter_loads_when_the_loader_is_cancelled():
+    cache = TTLCache("tests", 10, 60)
+    load = Loader()
+    first = asyncio.create_task(cache.get_or_load(1, load))
+    await settle()
+    second = asyncio.create_task(cache.get_or_load(1, load))
+    await settle()
+    first.cancel()
+    await settle()
+    load.release.set()
+    assert await second == "value"
+    assert load.calls == 2
+
+
+async def test_invalidated_load_is_not_cached():
+    cache = TTLCache("tests", 10, 60)
+    load = Loader()
+    get = asyncio.create_task(cache.get_or_load(1, load))
+    await settle()
+    cache.pop(1)
+    load.release.set()
+    assert await get == "value"
+    assert cache.get(1) is None
+
+
+async def test_current_user_burst_queries_once(client, make_users, monkeypatch):
+    from src.user.repository import UserRepository
+
+    (user_id,) = await make_users(1)
+    calls = []
+    get = UserRepository.get
+
+    async def counted(self, **kwargs):
+        calls.append(kwargs)
+        return await get(self, **kwargs)
+
+    monkeypatch.setattr(UserRepository, "get", counted)
+    headers = auth(user_id)
+    responses = await asyncio.gather(
+        *(client.get("/api/v1/users/me", headers=headers) for _ in range(10))
+    )
+    assert {response.status_code for response in responses} == {200}
+    assert calls == [{"user_id": user_id}]
@@ -0,0 +1,81 @@
+import csv
+import gzip
+import io
+import json
+import uuid
+
+import pytest
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def raw(client, url: str, headers: dict) -> bytes:
+    """The body as sent, httpx would undo the gzip of response.content"""
+    async with client.stream("GET", url, headers=headers) as response:
+        assert response.status_code == 200
+        return b"".join([chunk async for chunk in response.aiter_raw()])
+
+
+async def export(client, url: str, headers: dict) -> bytes:
+    plain = await raw(client, url, headers)
+    compressed = await raw(client, url, {**headers, "Accept-Encoding": "gzip"})
+    assert compressed[:2] == b"\x1f\x8b"
+    assert gzip.decompress(compressed) == plain
+    return plain
+
+
+def csv_rows(body: bytes) -> tuple[list[str], dict[str, dict]]:
+    reader = csv.DictReader(io.StringIO(body.decode()))
+    return reader.fieldnames, {row["id"]: row for row in reader}
+
+
+async def test_export_users(client, make_users):
+    students = await make_users(2)
+    (admin,) = await make_users(1, "admin")
+    response = await client.get("/api/v1/users/export", headers=auth(students[0]))
+    assert response.status_code == 403
+    headers = {**auth(admin), "Accept-Encoding": "identity"}
+
+    columns, rows = csv_rows(await export(client, "/api/v1/users/export", headers))
+    assert columns[:3] == ["id", "email", "first_name"]
+    assert columns[-2:] == ["skills", "roles"]
+    for student in students:
+        row = rows[str(student)]
+        assert row["internal_role"] == "student"
+        assert row["major"] == "Математика"
+        assert sorted(row["skills"].split(";")) == ["Python", "SQL"]
+        assert row["roles"] == "backend"
+        assert row["tg_id"]
+
+    body = await export(client, "/api/v1/users/export?format=ndjson", headers)
+    rows = {row["id"]: row for row in map(json.loads, body.decode().splitlines())}
+    for student in students:
+        assert sorted(rows[student]["skills"]) == ["Python", "SQL"]
+        assert rows[student]["roles"] == ["backend"]
+
+
+async def test_export_hackathons(client, make_users, make_hackathon):
+    (student,) = await make_users(1)
+    (admin,) = await make_users(1, "admin")
+    tag = uuid.uuid4().hex[:8]
+    hackathons = [await make_hackathon(tag=tag) for _ in range(2)]
+    response = await client.get("/api/v1/hackathons/export", headers=auth(student))
+    assert response.status_code == 403
+    headers = {**auth(admin), "Accept-Encoding": "identity"}
+
+    columns, rows = csv_rows(await export(client, "/api/v1/hackathons/export", headers))
+    assert columns == [
+        "id", "title", "registration_finish", "team_minimum_size",
+        "team_maximum_size", "prize_type", "money_prize", "tags",
+    ]
+    for hackathon in hackathons:
+        row = rows[str(hackathon)]
+        assert row["tags"] == tag
+        assert row["team_maximum_size"] == "5"
+        assert row["money_prize"] == "1000"
+
+    body = await export(client, "/api/v1/hackathons/export?format=ndjson", headers)
+    rows = {row["id"]: row for row in map(json.loads, body.decode().splitlines())}
+    for hackathon in hackathons:
+        assert rows[hackathon]["tags"] == [tag]
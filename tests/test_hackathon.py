@@ -0,0 +1,88 @@
+import asyncio
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from starlette.requests import Request
+from src.utils.ndjson import MAX_LINE
+from src.utils.response_cache import NullStore, ResponseCache, etag_matches
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_open_registration_page_expires_with_the_deadline(client, make_hackathon):
+    tag = uuid.uuid4().hex[:8]
+    closing = await make_hackathon(
+        registration_finish=datetime.now() + timedelta(seconds=1), tag=tag
+    )
+    later = await make_hackathon(tag=tag)
+    url = f"/api/v1/hackathons?tag={tag}&registration_open=true"
+    page = (await client.get(url)).json()
+    assert [item["id"] for item in page["items"]] == [closing, later]
+    await asyncio.sleep(1.2)
+    page = (await client.get(url)).json()
+    assert [item["id"] for item in page["items"]] == [later]
+
+    url = f"/api/v1/hackathons?tag={tag}&registration_open=false"
+    page = (await client.get(url)).json()
+    assert [item["id"] for item in page["items"]] == [closing]
+
+
+async def test_uncached_etags_depend_on_the_body_only():
+    cache = ResponseCache(NullStore(), 300)
+    request = Request({"type": "http", "path": "/x", "query_string": b"a=1", "headers": []})
+    key = await cache.key("hackathons", request)
+    first = await cache.set(key, b"[]")
+    await cache.bump("hackathons")
+    key = await cache.key("hackathons", request)
+    assert await cache.get(key) is None
+    assert (await cache.set(key, b"[]")).etag == first.etag
+
+
+@pytest.mark.parametrize(
+    "header, match",
+    [
+        ('"1-abc"', True),
+        ('W/"1-abc"', True),
+        ('"0-x", "1-abc" ,W/"2-y"', True),
+        ("*", True),
+        ("", False),
+        ('"1-abcd"', False),
+        ('"x1-abc"', False),
+        ('"1-abc", ', True),
+        ("1-abc", False),
+    ],
+)
+def test_if_none_match_compares_each_tag(header, match):
+    assert etag_matches(header, '"1-abc"') is match
+
+
+async def test_not_modified_only_for_the_current_etag(client, make_hackathon):
+    tag = uuid.uuid4().hex[:8]
+    await make_hackathon(tag=tag)
+    url = f"/api/v1/hackathons?tag={tag}"
+    etag = (await client.get(url)).headers["etag"]
+    for header, status in (
+        (etag, 304),
+        (f'"stale", W/{etag}', 304),
+        ("*", 304),
+        (f'"x{etag[1:]}', 200),
+        (etag[:-2] + '"', 200),
+    ):
+        response = await client.get(url, headers={"If-None-Match": header})
+        assert response.status_code == status
+
+
+async def test_import_refuses_overlong_lines(client, make_users):
+    (admin,) = await make_users(1, "admin")
+
+    async def body():
+        yield b'{"title": "x"}\n'
+        yield b'{"title": "' + b"x" * MAX_LINE + b'"}\n'
+
+    response = await client.post(
+        "/api/v1/hackathons/import", content=body(), headers=auth(admin)
+    )
+    assert response.status_code == 413
+    assert response.json()["detail"] == f"Line 2 is longer than {MAX_LINE} bytes"
@@ -0,0 +1,91 @@
+import uuid
+
+import pytest
+from sqlalchemy import select
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.idempotency.middleware import IdempotencyMiddleware
+from src.idempotency.model import IdempotencyKey
+from tests.conftest import PASSWORD, auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def stored_bodies() -> list[bytes]:
+    async with SQLManager().session() as session:
+        return await BaseRepository(session)._all(
+            select(IdempotencyKey.body).where(IdempotencyKey.body.is_not(None))
+        )
+
+
+async def test_token_responses_are_not_stored(client):
+    signup = {
+        "email": f"{uuid.uuid4().hex[:8]}@tests.test",
+        "password": PASSWORD,
+        "first_name": "Имя",
+        "last_name": "Фамилия",
+    }
+    headers = {"Idempotency-Key": uuid.uuid4().hex}
+    response = await client.post("/auth/signup", json=signup, headers=headers)
+    assert response.status_code == 201
+    assert response.headers["cache-control"] == "no-store"
+    login = {"email": signup["email"], "password": PASSWORD}
+    response = await client.post("/auth/login", json=login, headers=headers)
+    assert response.status_code == 200
+    assert not any(b"refresh_token" in body for body in await stored_bodies())
+
+    # the retry runs again instead of replaying the tokens
+    response = await client.post("/auth/login", json=login, headers=headers)
+    assert response.status_code == 200
+    assert "idempotent-replayed" not in response.headers
+
+
+async def test_other_responses_are_replayed(client, make_users):
+    (admin,) = await make_users(1, "admin")
+    headers = {**auth(admin), "Idempotency-Key": uuid.uuid4().hex}
+    hackathon = {
+        "title": "Replayed",
+        "registration_finish": "2030-01-01T00:00:00",
+        "team_minimum_size": 1,
+        "team_maximum_size": 5,
+        "prize_type": 0,
+        "tags": [{"tag": "tests"}],
+    }
+    first = await client.post("/api/v1/hackathons/create", json=[hackathon], headers=headers)
+    retry = await client.post("/api/v1/hackathons/create", json=[hackathon], headers=headers)
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["idempotent-replayed"] == "true"
+    hackathon["title"] = "Other"
+    reused = await client.post("/api/v1/hackathons/create", json=[hackathon], headers=headers)
+    assert reused.status_code == 422
+
+
+async def test_disconnect_before_the_whole_body_runs_nothing():
+    calls = []
+
+    async def app(scope, receive, send) -> None:
+        calls.append(scope)
+
+    messages = iter(
+        [
+            {"type": "http.request", "body": b'{"title": "cut', "more_body": True},
+            {"type": "http.disconnect"},
+        ]
+    )
+    sent = []
+
+    async def receive():
+        return next(messages)
+
+    async def send(message) -> None:
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/api/v1/hackathons/create",
+        "query_string": b"",
+        "headers": [(b"idempotency-key", b"cut")],
+    }
+    await IdempotencyMiddleware(app)(scope, receive, send)
+    assert calls == [] and sent == []
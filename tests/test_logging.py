@@ -0,0 +1,83 @@
+import io
+import json
+import logging
+import queue
+import threading
+
+import httpx
+import pytest
+from src.monitoring.metrics import registry
+from src.utils.logging import (
+    REQUEST_ID,
+    DroppingQueueHandler,
+    dropped,
+    get_logger,
+    setup_logging,
+    shutdown_logging,
+)
+
+
+class Formatted:
+    """Remembers the thread that turned it into text"""
+
+    thread: threading.Thread | None = None
+
+    def __str__(self) -> str:
+        Formatted.thread = threading.current_thread()
+        return "formatted"
+
+
+@pytest.fixture
+def stream():
+    stream = io.StringIO()
+    setup_logging("INFO", stream)
+    yield stream
+    setup_logging()
+
+
+def records(stream: io.StringIO) -> list[dict]:
+    shutdown_logging()
+    return [json.loads(line) for line in stream.getvalue().splitlines()]
+
+
+def test_records_are_formatted_by_the_writer(stream):
+    log = get_logger("tests")
+    log.info("value %s", Formatted())
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        log.exception("failed")
+
+    first, second = records(stream)
+    assert first["message"] == "value formatted"
+    assert Formatted.thread is not None
+    assert Formatted.thread is not threading.current_thread()
+    assert second["message"] == "failed"
+    assert "ValueError: boom" in second["exc_info"]
+
+
+def test_dropped_records_are_counted():
+    handler = DroppingQueueHandler(queue.Queue(1))
+    record = logging.LogRecord("tests", logging.INFO, __file__, 1, "full", None, None)
+    before = dropped.values.get((), 0)
+    handler.handle(record)
+    handler.handle(record)
+    assert dropped.values[()] == before + 1
+    assert "log_records_dropped_total " in registry.render()
+
+
+@pytest.mark.anyio
+@pytest.mark.parametrize("value", [b"\xff\xfe", b"a b", b"x" * 65, b"id\r\nforged"])
+async def test_invalid_request_ids_are_replaced(client, value):
+    response = await client.get(
+        "/metrics", headers=httpx.Headers([(b"x-request-id", value)])
+    )
+    assert response.status_code == 200
+    echoed = response.headers["x-request-id"].encode()
+    assert echoed != value and REQUEST_ID.fullmatch(echoed)
+
+
+@pytest.mark.anyio
+async def test_client_request_id_is_kept(client):
+    response = await client.get("/metrics", headers={"X-Request-ID": "abc-1.2_3"})
+    assert response.headers["x-request-id"] == "abc-1.2_3"
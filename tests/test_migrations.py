@@ -0,0 +1,127 @@
+from alembic import command
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Enum,
+    ForeignKey,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    create_engine,
+    text,
+)
+from src.data import migrations
+from src.hackathon.domain import PrizeType
+from src.user.domain import UserRole
+
+
+def create_all_schema(conn) -> None:
+    """Tables as create_all made them before the first migration"""
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("first_name", String(30), nullable=False),
+        Column("last_name", String(30), nullable=False),
+        Column("email", String(50), nullable=False, unique=True, index=True),
+        Column("internal_role", Enum(UserRole), nullable=False),
+        Column("password", String, nullable=False),
+    )
+    Table(
+        "tg_users",
+        metadata,
+        Column("user_id", ForeignKey("users.id"), primary_key=True),
+        Column("first_name", String(30), nullable=False),
+        Column("tg_id", Integer, nullable=False, unique=True, index=True),
+        Column("last_name", String(30), nullable=True),
+    )
+    Table(
+        "students_info",
+        metadata,
+        Column("user_id", ForeignKey("users.id"), primary_key=True),
+        Column("graduation_year", Integer, nullable=False),
+        Column("major", String(30), nullable=False),
+        Column("faculty", String(30), nullable=False),
+        Column("portfolio_url", String, nullable=True),
+        Column("about", String, nullable=True),
+    )
+    for name, target, column in (("skills", "skill", "skill_name"), ("roles", "role", "role_name")):
+        Table(
+            name,
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column(column, String(80), nullable=False, index=True),
+        )
+        Table(
+            f"user_{name}",
+            metadata,
+            Column("user_id", Integer, ForeignKey("users.id")),
+            Column(f"{target}_id", Integer, ForeignKey(f"{name}.id")),
+        )
+    Table(
+        "hackathons",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("title", String(80), nullable=False),
+        Column("registration_finish", DateTime, nullable=False),
+        Column("team_minimum_size", Integer, nullable=False),
+        Column("team_maximum_size", Integer, nullable=False),
+        Column("prize_type", Enum(PrizeType), nullable=False),
+        Column("money_prize", Integer, nullable=True),
+    )
+    Table(
+        "hackathon_tags",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("tag", String(50), nullable=False),
+    )
+    Table(
+        "hackathons_to_tags",
+        metadata,
+        Column("hackathon_id", Integer, ForeignKey("hackathons.id")),
+        Column("tag_id", Integer, ForeignKey("hackathon_tags.id")),
+    )
+    metadata.create_all(conn)
+
+
+def test_upgrade_adopts_create_all_schema(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'create_all.db'}")
+    with engine.begin() as conn:
+        create_all_schema(conn)
+        conn.execute(
+            text(
+                "INSERT INTO hackathons VALUES"
+                " (1, 'a', '2030-01-01', 1, 5, 'money', 100),"
+                " (2, 'b', '2030-01-01', 1, 5, 'other', NULL)"
+            )
+        )
+        conn.execute(text("INSERT INTO hackathon_tags VALUES (1, 'ml'), (2, 'ml'), (3, 'web')"))
+        conn.execute(
+            text(
+                "INSERT INTO hackathons_to_tags VALUES"
+                " (1, 1), (1, 2), (2, 2), (2, 3), (2, 3), (NULL, 3)"
+            )
+        )
+
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+        migrations.check(conn)
+        # nothing left between the upgraded tables and the models
+        command.check(migrations._config(conn))
+        tags = conn.execute(text("SELECT id, tag FROM hackathon_tags ORDER BY id")).all()
+        links = conn.execute(
+            text("SELECT hackathon_id, tag_id FROM hackathons_to_tags ORDER BY 1, 2")
+        ).all()
+    engine.dispose()
+    assert tags == [(1, "ml"), (3, "web")]
+    assert links == [(1, 1), (2, 1), (2, 3)]
+
+
+def test_upgrade_creates_empty_database(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'empty.db'}")
+    with engine.begin() as conn:
+        migrations.upgrade(conn)
+        command.check(migrations._config(conn))
+    engine.dispose()
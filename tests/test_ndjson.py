@@ -0,0 +1,37 @@
+import pytest
+from fastapi import HTTPException
+from src.utils.ndjson import iter_lines
+
+pytestmark = pytest.mark.anyio
+
+
+async def stream(*chunks: bytes):
+    for chunk in chunks:
+        yield chunk
+
+
+async def lines(chunks, max_line: int = 16) -> list[tuple[int, bytes]]:
+    return [line async for line in iter_lines(chunks, max_line)]
+
+
+async def test_lines_split_across_chunks():
+    chunks = stream(b'{"a"', b': 1}\n\n{"b": 2}', b"\n", b'{"c": 3}')
+    assert await lines(chunks) == [(1, b'{"a": 1}'), (3, b'{"b": 2}'), (4, b'{"c": 3}')]
+
+
+async def test_long_line_is_refused_before_it_ends():
+    async def endless():
+        yield b"{}\n"
+        while True:
+            yield b"x" * 10
+
+    with pytest.raises(HTTPException) as e:
+        await lines(endless())
+    assert e.value.status_code == 413
+    assert e.value.detail == "Line 2 is longer than 16 bytes"
+
+
+async def test_long_line_in_one_chunk_is_refused():
+    with pytest.raises(HTTPException) as e:
+        await lines(stream(b"{}\n" + b"x" * 17 + b"\n{}\n"))
+    assert e.value.detail == "Line 2 is longer than 16 bytes"
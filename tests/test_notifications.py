@@ -0,0 +1,165 @@
+import uuid
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from benchmarks.fake_telegram import FakeTelegram
+from sqlalchemy import delete, select, update
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.notifications.domain import NotificationStatus
+from src.notifications.model import Notification
+from src.notifications.sender import TelegramSender
+from src.notifications.worker import NotificationWorker, metrics_app, notifications
+from src.user.model import TgUser
+from src.utils.rate_limit import Limit, MemoryBucketStore
+from src.utils.settings import settings
+
+pytestmark = pytest.mark.anyio
+
+TEXT = "Регистрация закрывается"
+
+
+@pytest.fixture
+async def telegram():
+    fake = FakeTelegram(latency=0)
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=fake.app), base_url="http://telegram"
+    ) as http:
+        sender = TelegramSender(
+            http,
+            "tests",
+            10,
+            MemoryBucketStore(1000),
+            Limit("telegram", 1000, 1000),
+            Limit("telegram_chat", 1000, 1000),
+        )
+        yield fake, NotificationWorker(SQLManager(), sender)
+
+
+@pytest.fixture
+async def outbox(make_users):
+    """Writes a due message to a new student's chat, returns its chat id"""
+    kind = uuid.uuid4().hex[:20]
+
+    async def write(attempts: int = 0) -> int:
+        (user_id,) = await make_users(1)
+        async with SQLManager().session() as session:
+            repository = BaseRepository(session)
+            chat_id = await repository._first(
+                select(TgUser.tg_id).where(TgUser.user_id == user_id)
+            )
+            session.add(
+                Notification(
+                    kind=kind,
+                    user_id=user_id,
+                    chat_id=chat_id,
+                    text=TEXT,
+                    attempts=attempts,
+                    send_at=datetime.now() - timedelta(seconds=1),
+                )
+            )
+            await repository._commit()
+        return chat_id
+
+    yield write
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        await repository._execute(delete(Notification).where(Notification.kind == kind))
+        await repository._commit()
+
+
+async def message(chat_id: int) -> Notification:
+    async with SQLManager().session() as session:
+        return await BaseRepository(session)._first(
+            select(Notification).where(Notification.chat_id == chat_id)
+        )
+
+
+async def make_due(chat_id: int) -> None:
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        await repository._execute(
+            update(Notification)
+            .where(Notification.chat_id == chat_id)
+            .values(send_at=datetime.now() - timedelta(seconds=1))
+        )
+        await repository._commit()
+
+
+def sent(outcome: str) -> float:
+    return notifications.values.get((("outcome", outcome),), 0)
+
+
+async def test_transient_error_is_retried(client, telegram, outbox):
+    fake, worker = telegram
+    chat_id = await outbox()
+    fake.error_rate = 1.0
+    retries = sent("retry")
+
+    assert await worker.dispatch_once() == 1
+    row = await message(chat_id)
+    assert row.status == NotificationStatus.pending
+    assert row.attempts == 1
+    assert row.last_error == "500 Internal Server Error"
+    assert row.locked_until is None
+    assert sent("retry") == retries + 1
+
+    fake.error_rate = 0.0
+    await make_due(chat_id)
+    assert await worker.dispatch_once() == 1
+    row = await message(chat_id)
+    assert row.status == NotificationStatus.sent
+    assert row.attempts == 2
+    assert fake.delivered[chat_id] == [TEXT]
+
+
+async def test_throttled_message_waits_retry_after(client, telegram, outbox):
+    fake, worker = telegram
+    chat_id = await outbox()
+    fake.throttle_rate = 1.0
+
+    before = datetime.now()
+    assert await worker.dispatch_once() == 1
+    row = await message(chat_id)
+    assert row.status == NotificationStatus.pending
+    assert row.last_error.startswith("429")
+    assert row.send_at >= before + timedelta(seconds=1)
+    # not due before retry_after
+    assert await worker.dispatch_once() == 0
+    assert fake.calls == 1
+
+
+async def test_permanent_failure_is_not_retried(client, telegram, outbox):
+    fake, worker = telegram
+    blocked = await outbox()
+    exhausted = await outbox(attempts=settings.notify_max_attempts - 1)
+    fake.blocked.add(blocked)
+    fake.error_rate = 1.0
+    failures = sent("failed")
+
+    assert await worker.dispatch_once() == 2
+    row = await message(blocked)
+    assert row.status == NotificationStatus.failed
+    assert row.attempts == 1
+    assert row.last_error.startswith("403")
+    row = await message(exhausted)
+    assert row.status == NotificationStatus.failed
+    assert row.attempts == settings.notify_max_attempts
+    assert sent("failed") == failures + 2
+    assert await worker.dispatch_once() == 0
+
+
+async def test_worker_metrics(client, telegram, outbox):
+    fake, worker = telegram
+    await outbox()
+    await worker.measure()
+    assert worker.lag() >= 1
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=metrics_app()), base_url="http://worker"
+    ) as http:
+        response = await http.get("/metrics")
+    assert response.status_code == 200
+    assert "notifications_outbox_pending 1\n" in response.text
+    assert "notifications_outbox_lag_seconds " in response.text
+    assert "notifications_total" in response.text
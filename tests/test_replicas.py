@@ -0,0 +1,39 @@
+import httpx
+import pytest
+from src.data.replicas import StickyPrimaryMiddleware, _pinned_to_primary, sticky
+
+pytestmark = pytest.mark.anyio
+
+
+async def app(scope, receive, send) -> None:
+    """Writes on POST, answers whether reads would go to the primary"""
+    if scope["method"] == "POST":
+        sticky.get().wrote = True
+    body = b"primary" if _pinned_to_primary() else b"replica"
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": body})
+
+
+async def test_writes_pin_the_client_to_the_primary_on_every_worker():
+    # two workers, the cookie is all they share
+    workers = [
+        httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=StickyPrimaryMiddleware(app)),
+            base_url="http://tests",
+        )
+        for _ in range(2)
+    ]
+    response = await workers[0].get("/")
+    assert response.text == "replica" and "set-cookie" not in response.headers
+
+    response = await workers[0].post("/")
+    cookie = response.cookies["db_primary_until"]
+    response = await workers[1].get("/", cookies={"db_primary_until": cookie})
+    assert response.text == "primary"
+
+    until, signature = cookie.rsplit(".", 1)
+    forged = f"{float(until) + 3600}.{signature}"
+    response = await workers[1].get("/", cookies={"db_primary_until": forged})
+    assert response.text == "replica"
+    for worker in workers:
+        await worker.aclose()
@@ -0,0 +1,18 @@
+import pytest
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_profile_search_needs_login(client, make_users):
+    (user_id,) = await make_users(1)
+    response = await client.get("/api/v1/search/profiles?q=python")
+    assert response.status_code == 401
+    response = await client.get("/api/v1/search/profiles?q=python", headers=auth(user_id))
+    assert response.status_code == 200
+    assert any(hit["user_id"] == user_id for hit in response.json())
+
+
+async def test_hackathon_search_is_public(client):
+    response = await client.get("/api/v1/search/hackathons?q=hack")
+    assert response.status_code == 200
@@ -0,0 +1,62 @@
+import asyncio
+
+import pytest
+from sqlalchemy import func, select
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.team.model import Registration, Team
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def members(team_id: int) -> tuple[int, int, int]:
+    """capacity, members_count and the registrations pointing at the team"""
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        team = await repository._first(select(Team).where(Team.id == team_id))
+        registered = await repository._first(
+            select(func.count()).select_from(Registration).where(Registration.team_id == team_id)
+        )
+    return team.capacity, team.members_count, registered
+
+
+async def test_concurrent_joins_and_leaves_never_exceed_capacity(client, make_users, make_hackathon):
+    hackathon_id = await make_hackathon(team_maximum_size=3)
+    captain, *students = await make_users(21)
+    base = f"/api/v1/hackathons/{hackathon_id}"
+    for user_id in (captain, *students):
+        response = await client.post(f"{base}/registration", headers=auth(user_id))
+        assert response.status_code == 201
+    team = await client.post(f"{base}/teams", json={"name": "Кокосы"}, headers=auth(captain))
+    team_id = team.json()["id"]
+
+    joins = await asyncio.gather(
+        *(client.post(f"{base}/teams/{team_id}/members", headers=auth(u)) for u in students)
+    )
+    joined = [u for u, response in zip(students, joins) if response.status_code == 200]
+    assert len(joined) == 2
+    assert {response.status_code for response in joins} == {200, 409}
+    assert await members(team_id) == (3, 3, 3)
+
+    # the members leaving race the others joining into the freed places
+    waiting = [u for u in students if u not in joined]
+    results = await asyncio.gather(
+        *(client.delete(f"{base}/teams/{team_id}/members/me", headers=auth(u)) for u in joined),
+        *(client.post(f"{base}/teams/{team_id}/members", headers=auth(u)) for u in waiting),
+    )
+    assert all(response.status_code in (200, 204, 409) for response in results)
+    capacity, count, registered = await members(team_id)
+    assert count == registered <= capacity
+
+
+async def test_registration_errors(client, make_users, make_hackathon):
+    hackathon_id = await make_hackathon()
+    (user_id,) = await make_users(1)
+    response = await client.post("/api/v1/hackathons/999999/registration", headers=auth(user_id))
+    assert response.status_code == 404
+    base = f"/api/v1/hackathons/{hackathon_id}"
+    assert (await client.post(f"{base}/registration", headers=auth(user_id))).status_code == 201
+    response = await client.post(f"{base}/registration", headers=auth(user_id))
+    assert response.status_code == 409
+    assert response.json()["detail"] == "Already registered"
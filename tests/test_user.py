@@ -0,0 +1,180 @@
+import json
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from src.data.repository import BaseRepository
+from src.data.sql import SQLManager
+from src.monitoring.profiling import RequestProfile, current_profile
+from src.user.model import Role, Skill, TgUser, User, user_roles, user_skills
+from src.user.repository import UserRepository
+from src.utils.ndjson import MAX_LINE
+from tests.conftest import auth
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_profiles_of_others_have_no_contact_details(client, make_users):
+    me, other = await make_users(2)
+    response = await client.get(f"/api/v1/users?ids={me},{other}", headers=auth(me))
+    assert response.status_code == 200
+    mine, theirs = response.json()
+    assert mine["email"] and mine["tg_user"]["tg_id"]
+    assert "email" not in theirs and "tg_user" not in theirs
+    assert theirs["student_info"]["faculty"] == "ИТКН"
+
+    response = await client.get(f"/api/v1/users/{other}/profile", headers=auth(me))
+    assert response.status_code == 200
+    assert "email" not in response.json() and "tg_user" not in response.json()
+    response = await client.get(f"/api/v1/users/{me}/profile", headers=auth(me))
+    assert response.json()["email"]
+
+
+async def test_admins_see_full_profiles(client, make_users):
+    (admin,) = await make_users(1, "admin")
+    (student,) = await make_users(1)
+    response = await client.get(f"/api/v1/users/{student}/profile", headers=auth(admin))
+    assert response.json()["email"] and response.json()["tg_user"]
+    response = await client.get(f"/api/v1/users?ids={student}", headers=auth(admin))
+    assert response.json()[0]["email"]
+
+
+async def test_profiles_query_count_does_not_grow(client, make_users):
+    user_ids = await make_users(50)
+    queries = []
+    for size in (1, 10, 50):
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+        try:
+            async with SQLManager().session() as session:
+                users = await UserRepository(session).profiles(user_ids[:size])
+        finally:
+            current_profile.reset(token)
+        assert len(users) == size
+        queries.append(profile.queries)
+    assert queries[0] == queries[1] == queries[2]
+
+
+async def test_import_refuses_overlong_lines(client, make_users):
+    (admin,) = await make_users(1, "admin")
+    body = b"email,password\n" + b"x" * (MAX_LINE + 1) + b"\n"
+    headers = {**auth(admin), "Content-Type": "text/csv"}
+    response = await client.post("/api/v1/users/import", content=body, headers=headers)
+    assert response.status_code == 413
+
+
+async def existing(user_id: int) -> tuple[str, int]:
+    """Email and Telegram id of a user"""
+    async with SQLManager().session() as session:
+        result = await BaseRepository(session)._execute(
+            select(User.email, TgUser.tg_id)
+            .join(TgUser, TgUser.user_id == User.id)
+            .where(User.id == user_id)
+        )
+        return tuple(result.one())
+
+
+async def imported(emails: list[str]) -> dict[str, tuple[list[str], list[str]]]:
+    """email -> (skills, roles) of imported users, read from the link tables"""
+    async with SQLManager().session() as session:
+        repository = BaseRepository(session)
+        skills = await repository._execute(
+            select(User.email, Skill.skill_name)
+            .join(user_skills, user_skills.c.user_id == User.id)
+            .join(Skill, Skill.id == user_skills.c.skill_id)
+            .where(User.email.in_(emails))
+        )
+        roles = await repository._execute(
+            select(User.email, Role.role_name)
+            .join(user_roles, user_roles.c.user_id == User.id)
+            .join(Role, Role.id == user_roles.c.role_id)
+            .where(User.email.in_(emails))
+        )
+        users = {email: ([], []) for email in emails}
+        for email, name in skills.all():
+            users[email][0].append(name)
+        for email, name in roles.all():
+            users[email][1].append(name)
+        return {email: (sorted(s), sorted(r)) for email, (s, r) in users.items()}
+
+
+async def names_count(column, name: str) -> int:
+    async with SQLManager().session() as session:
+        return await BaseRepository(session)._first(
+            select(func.count()).where(column == name)
+        )
+
+
+async def test_import_csv(client, make_users):
+    admin, taken = await make_users(2, "admin")
+    taken_email, taken_tg_id = await existing(taken)
+    prefix = uuid.uuid4().hex[:8]
+    new_skill = f"skill-{prefix}"
+    first, second = f"{prefix}a@tests.test", f"{prefix}b@tests.test"
+    body = "\n".join(
+        [
+            "email,password,first_name,last_name,graduation_year,major,faculty,tg_id,skills,roles",
+            f"{first},secret123456,Имя,Фамилия,2026,Математика,ИТКН,,Python; {new_skill},backend",
+            f"{first},secret123456,Имя,Фамилия,,,,,,",
+            f"{taken_email},secret123456,Имя,Фамилия,,,,,,",
+            f"{prefix}c@tests.test,secret123456,Имя,Фамилия,,,,{taken_tg_id},,",
+            "",
+            f"{prefix}d@tests.test,short,Имя,Фамилия,,,,,,",
+            f"{second},secret123456,Имя,Фамилия,,,,,SQL,backend;frontend",
+        ]
+    )
+    headers = {**auth(admin), "Content-Type": "text/csv"}
+    response = await client.post("/api/v1/users/import", content=body, headers=headers)
+    assert response.status_code == 201
+    result = response.json()
+    assert result["imported"] == 2
+    errors = {error["line"]: error["error"] for error in result["errors"]}
+    assert sorted(errors) == [3, 4, 5, 7]
+    assert errors[3] == errors[4] == "email already registered"
+    assert errors[5] == "tg_id already linked"
+    assert errors[7].startswith("password:") and "short" not in errors[7]
+
+    assert await imported([first, second]) == {
+        first: (sorted(["Python", new_skill]), ["backend"]),
+        second: (["SQL"], ["backend", "frontend"]),
+    }
+    # existing names are linked, not inserted again
+    assert await names_count(Skill.skill_name, "Python") == 1
+    assert await names_count(Role.role_name, "backend") == 1
+    login = await client.post(
+        "/auth/login", json={"email": second, "password": "secret123456"}
+    )
+    assert login.status_code == 200
+
+
+async def test_import_ndjson(client, make_users, password_hash):
+    (admin,) = await make_users(1, "admin")
+    prefix = uuid.uuid4().hex[:8]
+    first, second = f"{prefix}a@tests.test", f"{prefix}b@tests.test"
+    rows = [
+        {
+            "email": first,
+            "password_hash": password_hash,
+            "first_name": "Имя",
+            "last_name": "Фамилия",
+            "tg_id": int(uuid.uuid4().int % 10**12),
+            "skills": ["Python", "SQL"],
+            "roles": ["backend"],
+        },
+        {"email": f"{prefix}c@tests.test", "first_name": "Имя", "last_name": "Фамилия"},
+        {"email": first, "password": "secret123456", "first_name": "Имя", "last_name": "Фамилия"},
+        {"email": second, "password": "secret123456", "first_name": "Имя", "last_name": "Фамилия"},
+    ]
+    body = "\n".join(json.dumps(row) for row in rows) + "\nnot json\n"
+    response = await client.post(
+        "/api/v1/users/import", content=body, headers=auth(admin)
+    )
+    assert response.status_code == 201
+    result = response.json()
+    assert result["imported"] == 2
+    assert [error["line"] for error in result["errors"]] == [2, 3, 5]
+    assert result["errors"][1]["error"] == "email already registered"
+    assert await imported([first, second]) == {
+        first: (["Python", "SQL"], ["backend"]),
+        second: ([], []),
+    }